@@ -0,0 +1,2 @@
+# Benchmarks do dashboard. Execute a partir de streamlit_app/, por exemplo:
+#   python -m benchmarks.bench_portfolio_analytics
@@ -0,0 +1,22 @@
+# streamlit_app/benchmarks/app_pagina.py
+# Script executado pelo AppTest em bench_paginas: roda uma única página
+# ("módulo:função" em BENCH_PAGINA) contra o banco de BENCH_DATABASE_URL.
+
+import os
+import sys
+from pathlib import Path
+
+import streamlit as st
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.dados_sinteticos import criar_engine  # noqa: E402
+from paginas import load_page  # noqa: E402
+
+
+@st.cache_resource
+def _engine(url):
+    return criar_engine(url)
+
+
+load_page(os.environ["BENCH_PAGINA"])(engine=_engine(os.environ["BENCH_DATABASE_URL"]))
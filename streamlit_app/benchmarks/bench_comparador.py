@@ -0,0 +1,52 @@
+# streamlit_app/benchmarks/bench_comparador.py
+# Custo de montar a comparação de N empresas a frio: uma consulta e um pivot
+# por empresa (como na página Dados Históricos) contra `get_many` (uma
+# consulta e um pivot para todas), sobre dados sintéticos em SQLite.
+#
+#   python -m benchmarks.bench_comparador [--escala 10]
+
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.dados_sinteticos import carregar, criar_engine, gerar
+from comparador import montar_comparacao
+from demonstracoes_cache import DemonstracoesCache
+
+
+class _SemWatcher:
+    def fingerprints(self, engine, tabelas):
+        return {t: None for t in tabelas}
+
+
+def _ms(fn):
+    inicio = time.perf_counter()
+    resultado = fn()
+    return (time.perf_counter() - inicio) * 1000, resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Comparação de N empresas: N consultas contra uma.")
+    parser.add_argument("--escala", type=float, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as raiz:
+        engine = criar_engine(f"sqlite:///{os.path.join(raiz, 'bench.db')}")
+        tabelas = gerar(args.escala)
+        carregar(engine, tabelas)
+        empresas = tabelas["dim_empresas"]["denom_cia"].tolist()
+
+        print(f"{'empresas':>8} {'uma a uma (ms)':>15} {'get_many (ms)':>14} {'repetida (ms)':>14}")
+        for n in (1, 5, 20):
+            alvo = empresas[:n]
+            individual = DemonstracoesCache(_SemWatcher())
+            ms_um, _ = _ms(lambda: montar_comparacao({e: individual.get(engine, e, "ANUAL") for e in alvo}))
+            lote = DemonstracoesCache(_SemWatcher())
+            ms_lote, _ = _ms(lambda: montar_comparacao(lote.get_many(engine, alvo, "ANUAL")))
+            ms_quente, _ = _ms(lambda: montar_comparacao(lote.get_many(engine, alvo, "ANUAL")))
+            print(f"{n:>8} {ms_um:>15.1f} {ms_lote:>14.1f} {ms_quente:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+# streamlit_app/benchmarks/bench_curva_juros.py
+# Interpolação flat forward da curva DI: um np.interp por data (laço) contra
+# uma chamada vetorizada para todas as datas e prazos (curva_juros).
+#
+#   python -m benchmarks.bench_curva_juros
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from curva_juros import DIAS_ANO, dias_uteis, interpolar_flat_forward
+
+PRAZOS = [30, 60, 90, 120, 180, 360, 720, 1080, 1800, 3600]
+
+
+def _por_data(du_vertices, taxas, du_alvo):
+    resultado = np.empty((len(du_vertices), len(du_alvo)))
+    for i, (x, r) in enumerate(zip(du_vertices, taxas)):
+        x = np.concatenate([[0], x])
+        y = np.concatenate([[0], x[1:] / DIAS_ANO * np.log1p(r / 100)])
+        # Extrapolação pela taxa a termo do último trecho, como na versão vetorizada
+        inclinacao = (y[-1] - y[-2]) / (x[-1] - x[-2])
+        log_fator = np.where(du_alvo > x[-1], y[-1] + inclinacao * (du_alvo - x[-1]), np.interp(du_alvo, x, y))
+        resultado[i] = np.expm1(log_fator * DIAS_ANO / du_alvo) * 100
+    return resultado
+
+
+def _ms(fn, repeticoes=3):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = fn()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return float(np.median(tempos)), resultado
+
+
+def main():
+    rng = np.random.default_rng(0)
+    print(f"{'datas':>6} {'prazos':>7} {'por data (ms)':>14} {'vetorizado (ms)':>16}")
+    # Curvas de comparação (poucas datas × grade diária), histórico (todas as datas × poucos prazos) e extremos
+    for n_datas, n_prazos in ((3, 2520), (1300, 4), (5000, 4), (1300, 252), (5000, 2520)):
+        datas = pd.bdate_range(end="2026-10-16", periods=n_datas)
+        du_vertices = dias_uteis(datas, PRAZOS)
+        taxas = 10 + np.cumsum(rng.normal(0, 0.03, n_datas))[:, None] + np.sqrt(np.asarray(PRAZOS) / 360)
+        du_alvo = np.linspace(1, du_vertices.max(), n_prazos).round()
+        ms_laco, esperado = _ms(lambda: _por_data(du_vertices, taxas, du_alvo))
+        ms_vetor, obtido = _ms(lambda: interpolar_flat_forward(du_vertices, taxas, du_alvo))
+        assert np.allclose(esperado, obtido)
+        print(f"{n_datas:>6} {n_prazos:>7} {ms_laco:>14.1f} {ms_vetor:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
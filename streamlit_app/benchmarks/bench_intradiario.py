@@ -0,0 +1,60 @@
+# streamlit_app/benchmarks/bench_intradiario.py
+# Série intradiária de um pregão inteiro com cotações a cada 5 s: guardar
+# todas as cotações e recalcular a carteira em cada instante ao desenhar
+# (replay) contra o anel de SerieIntradiaria, que guarda um ponto por
+# intervalo no momento do cálculo e só é lido depois.
+#
+#   python -m benchmarks.bench_intradiario
+
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from intradiario import SerieIntradiaria
+from portfolio_analytics import compute_portfolio
+
+PREGAO = 8 * 3600
+TICK = 5
+
+
+def main():
+    rng = np.random.default_rng(0)
+    inicio = datetime(2026, 10, 16, 10, 0)
+    n_ticks = PREGAO // TICK
+    print(f"{'ativos':>6} {'replay (ms)':>12} {'cotações (MB)':>14} {'registrar (µs)':>15} {'serie (ms)':>11} {'anel (MB)':>10}")
+    for n_ativos in (20, 100, 500):
+        quantidade = rng.integers(-500, 5000, n_ativos).astype(float)
+        fechamento = rng.uniform(5, 100, n_ativos)
+        alvo = np.full(n_ativos, 1 / n_ativos)
+        precos = fechamento * np.cumprod(np.exp(rng.normal(0, 0.0005, (n_ticks, n_ativos))), axis=0)
+        tickers = [f"T{i:03d}" for i in range(n_ativos)]
+
+        # Replay: todas as cotações do dia em memória, recalculadas a cada desenho
+        t = time.perf_counter()
+        replay = compute_portfolio(quantidade, precos, fechamento, alvo, 1e6, 1e5, 1.0)
+        ms_replay = (time.perf_counter() - t) * 1000
+        mb_cotacoes = precos.nbytes / 2**20
+
+        with tempfile.TemporaryDirectory() as raiz:
+            serie = SerieIntradiaria(intervalo=60, root=raiz, gravar_a_cada=300)
+            custo = 0.0
+            for i in range(n_ticks):
+                resultado = compute_portfolio(quantidade, precos[i], fechamento, alvo, 1e6, 1e5, 1.0)
+                t = time.perf_counter()
+                serie.registrar(resultado, tickers, inicio + timedelta(seconds=i * TICK))
+                custo += time.perf_counter() - t
+            t = time.perf_counter()
+            intradiario = serie.serie(inicio.date())
+            ms_serie = (time.perf_counter() - t) * 1000
+            mb_anel = sum(a.nbytes for a in (intradiario.instantes, intradiario.valores, intradiario.contribuicoes)) / 2**20
+            # O último ponto de cada minuto é o cálculo mais recente dentro dele
+            ultimos = replay.cota_atual[60 // TICK - 1::60 // TICK]
+            assert np.allclose(intradiario.campo("cota_atual"), ultimos)
+
+        print(f"{n_ativos:>6} {ms_replay:>12.1f} {mb_cotacoes:>14.2f} {custo / n_ticks * 1e6:>15.1f} {ms_serie:>11.2f} {mb_anel:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# streamlit_app/benchmarks/bench_l2_cache.py
+# N instâncias (processos) pedindo a mesma consulta ao mesmo tempo, como
+# depois de um scale-out do App Runner: sem cache L2 cada uma vai ao banco;
+# com o L2 (backend em arquivo, no lugar do Redis) só uma consulta e as
+# outras esperam o valor. Mostra também o tamanho do valor em Arrow e em pickle.
+#
+#   python -m benchmarks.bench_l2_cache [--escala 10] [--instancias 8]
+
+import argparse
+import multiprocessing as mp
+import os
+import pickle
+import tempfile
+import time
+
+from benchmarks.dados_sinteticos import carregar, criar_engine, gerar
+
+QUERY = "SELECT * FROM cvm_dados_financeiros WHERE periodo = 'ANUAL'"
+
+
+def _instancia(url, raiz_l2, barreira, leituras, tempos):
+    from db import _read_sql
+    from l2_cache import FileBackend, L2Cache
+
+    engine = criar_engine(url)
+
+    def consultar():
+        with leituras.get_lock():
+            leituras.value += 1
+        return _read_sql("bench", QUERY, engine, {})
+
+    l2 = L2Cache(FileBackend(raiz_l2)) if raiz_l2 else None
+    barreira.wait()
+    inicio = time.perf_counter()
+    if l2 is None:
+        consultar()
+    else:
+        l2.get_or_compute(l2.chave("bench", QUERY), 600, consultar, nome="bench")
+    tempos.append((time.perf_counter() - inicio) * 1000)
+
+
+def _rodada(url, raiz_l2, instancias):
+    """(leituras do banco, ms da instância mais lenta)."""
+    ctx = mp.get_context("spawn")
+    with ctx.Manager() as manager:
+        barreira, tempos = manager.Barrier(instancias), manager.list()
+        leituras = ctx.Value("i", 0)
+        processos = [ctx.Process(target=_instancia, args=(url, raiz_l2, barreira, leituras, tempos))
+                     for _ in range(instancias)]
+        for p in processos:
+            p.start()
+        for p in processos:
+            p.join()
+        return leituras.value, max(tempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scale-out com e sem cache L2 compartilhado.")
+    parser.add_argument("--escala", type=float, default=10)
+    parser.add_argument("--instancias", type=int, default=8)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as raiz:
+        url = f"sqlite:///{os.path.join(raiz, 'bench.db')}"
+        engine = criar_engine(url)
+        carregar(engine, gerar(args.escala))
+        raiz_l2 = os.path.join(raiz, "l2")
+
+        print(f"{'cenário':<10} {'leituras':>9} {'mais lenta (ms)':>16}")
+        for cenario, l2 in (("sem L2", None), ("L2 frio", raiz_l2), ("L2 quente", raiz_l2)):
+            leituras, ms = _rodada(url, l2, args.instancias)
+            print(f"{cenario:<10} {leituras:>9} {ms:>16.1f}")
+
+        from db import _read_sql
+        from l2_cache import serializar
+        df = _read_sql("bench", QUERY, engine, {})
+        print(f"\n{len(df)} linhas: arrow {len(serializar(df)) / 2**20:.2f} MB, "
+              f"pickle {len(pickle.dumps(df)) / 2**20:.2f} MB")
+
+
+if __name__ == "__main__":
+    main()
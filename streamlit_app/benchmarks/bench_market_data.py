@@ -0,0 +1,46 @@
+# streamlit_app/benchmarks/bench_market_data.py
+# Compara a busca direta ao provedor com o armazenamento local de dados de mercado,
+# usando o provedor offline com latência de rede simulada.
+#
+#   python -m benchmarks.bench_market_data
+
+import tempfile
+import time
+
+from market_data import FixtureProvider, MarketDataStore
+
+LATENCIA = 0.3  # segundos por chamada ao provedor
+
+
+def _ms(fn):
+    inicio = time.perf_counter()
+    fn()
+    return (time.perf_counter() - inicio) * 1000
+
+
+def main():
+    provider = FixtureProvider(latency=LATENCIA)
+    tickers = [f"T{i:03d}.SA" for i in range(50)]
+
+    t_direto = _ms(lambda: [(provider.info(t), provider.history([t], "2024-01-01")) for t in tickers[:5]])
+    print(f"Sem cache, 5 cliques (info + histórico): {t_direto:.0f} ms")
+
+    with tempfile.TemporaryDirectory() as root:
+        store = MarketDataStore(provider, root=root)
+        provider.calls = {"info": 0, "history": 0}
+        t_prefetch = _ms(lambda: store.prefetch(tickers))
+        print(f"Prefetch de {len(tickers)} tickers: {t_prefetch:.0f} ms ({provider.calls['history']} chamada)")
+
+        t_primeiro = _ms(lambda: [(store.info(t), store.history(t)) for t in tickers[:5]])
+        t_segundo = _ms(lambda: [(store.info(t), store.history(t)) for t in tickers[:5]])
+        print(f"Armazenamento local, 5 cliques (1ª vez, só info pendente): {t_primeiro:.0f} ms")
+        print(f"Armazenamento local, 5 cliques (repetidos): {t_segundo:.1f} ms")
+
+        reaberto = MarketDataStore(provider, root=root)
+        t_reaberto = _ms(lambda: [(reaberto.info(t), reaberto.history(t)) for t in tickers[:5]])
+        print(f"Após reiniciar o processo (lendo do disco): {t_reaberto:.1f} ms")
+        print(f"Chamadas ao provedor: {provider.calls}")
+
+
+if __name__ == "__main__":
+    main()
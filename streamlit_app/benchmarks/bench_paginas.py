@@ -0,0 +1,163 @@
+# streamlit_app/benchmarks/bench_paginas.py
+# Latência e pico de memória de cada página do dashboard sobre dados
+# sintéticos em escalas crescentes, executando as páginas sem navegador
+# (streamlit.testing.v1.AppTest) e com o provedor de mercado offline.
+#
+#   python -m benchmarks.bench_paginas [--escalas 1,10,100] [--repeticoes 3]
+#       [--url postgresql+psycopg2://localhost/dashaws_bench] [--paginas rtd_portfolio,screening]
+#
+# Sem --url, cada escala usa um arquivo SQLite temporário (veja as limitações
+# em dados_sinteticos). Com --url, as tabelas do banco são RECRIADAS: use um
+# banco dedicado aos benchmarks.
+#
+# Para cada página: "frio" é a primeira execução com os caches do processo e
+# dos stores em disco vazios; "quente", a mediana das execuções seguintes,
+# depois de concluída a sincronização em segundo plano que a fria agendou;
+# "pico" é o maior volume alocado pelo Python (tracemalloc) numa execução a
+# frio à parte, para que o rastreamento não distorça as latências.
+
+import argparse
+import logging
+import os
+import shutil
+import statistics
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+SCRIPT = str(Path(__file__).resolve().parent / "app_pagina.py")
+
+PAGINAS = {
+    "Carteira em Tempo Real": "rtd_portfolio:rtd_portfolio_page",
+    "Risco da Carteira": "risco:risco_carteira_page",
+    "Visão Geral da Empresa": "visao_geral:visao_geral_empresa_page",
+    "Dados Históricos": "dados_historicos:dados_historicos_page",
+    "Documentos CVM": "documentos:documentos_cvm_page",
+    "Screening Fundamentalista": "screening:screening_fundamentalista_page",
+    "Radar de Insiders": "radar_insiders:radar_insiders_page",
+    "Comparador de Empresas": "comparador:comparador_empresas_page",
+    "Dados Macro": "dados_macro:dados_macro_page",
+    "Curva de Juros": "curva_juros:curva_juros_page",
+    "Assistentes de IA": "assistentes_ia:assistentes_ia_page",
+}
+
+# Diretórios dos stores persistidos, apagados antes de cada execução a frio
+DIRETORIOS = ("MARKET_DATA_DIR", "MACRO_DATA_DIR", "INDICADORES_DIR", "INSIDERS_DIR", "RISCO_DIR", "INTRADIARIO_DIR", "DOCUMENT_CACHE_DIR")
+
+
+def _configurar_ambiente(raiz):
+    # Precisa acontecer antes de importar os módulos do app, que leem o ambiente na importação
+    os.environ["MARKET_DATA_PROVIDER"] = "fixture"
+    os.environ["MACRO_DATA_PROVIDER"] = "fixture"
+    os.environ.setdefault("PERF_LOG_LEVEL", "WARNING")
+    # Os links sintéticos não existem: as falhas da pré-busca de PDFs só poluiriam a saída
+    logging.getLogger("dashaws.document_cache").setLevel(logging.CRITICAL)
+    for nome in DIRETORIOS:
+        os.environ[nome] = os.path.join(raiz, nome.lower())
+
+
+def _esfriar():
+    import streamlit as st
+    from document_cache import get_document_prefetcher
+    from intradiario import get_serie_intradiaria
+    from macro_data import get_macro_store
+    from market_data import get_market_data_store
+    # O trabalho em segundo plano dos stores atuais termina antes de os diretórios sumirem
+    # (um sync do SQLite no meio do rmtree falha com "readonly database")
+    for store in (get_macro_store(), get_market_data_store(), get_document_prefetcher()):
+        store._executor.shutdown(wait=True)
+    get_serie_intradiaria().gravar()  # nada pendente para o atexit gravar num diretório apagado
+    st.cache_resource.clear()
+    st.cache_data.clear()
+    for nome in DIRETORIOS:
+        shutil.rmtree(os.environ[nome], ignore_errors=True)
+        os.makedirs(os.environ[nome], exist_ok=True)
+
+
+def _aguardar_segundo_plano():
+    # As páginas macro só leem o armazenamento local: sem esperar, as execuções quentes
+    # também mediriam as séries vazias
+    from macro_data import get_macro_store
+    store = get_macro_store()
+    while store.sincronizando():
+        time.sleep(0.05)
+
+
+def _executar(spec):
+    """(ms, erros) de uma execução da página."""
+    from streamlit.testing.v1 import AppTest
+    os.environ["BENCH_PAGINA"] = spec
+    at = AppTest.from_file(SCRIPT, default_timeout=600)
+    inicio = time.perf_counter()
+    at.run()
+    ms = (time.perf_counter() - inicio) * 1000
+    erros = [str(e.value) for e in at.exception] + [str(e.value) for e in at.error]
+    return ms, erros
+
+
+def medir_pagina(spec, repeticoes):
+    from instrumentation import metrics
+
+    _esfriar()
+    metrics.reset()
+    frio, erros = _executar(spec)
+    _aguardar_segundo_plano()
+    leituras = metrics.latencias()
+    leituras = leituras[leituras["tipo"] == "read_sql"] if not leituras.empty else leituras
+    quente = statistics.median(_executar(spec)[0] for _ in range(repeticoes)) if repeticoes else float("nan")
+
+    _esfriar()
+    tracemalloc.start()
+    try:
+        _executar(spec)
+        pico = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {
+        "frio_ms": frio, "quente_ms": quente, "pico_mb": pico / 2**20,
+        "leituras": int(leituras["n"].sum()) if not leituras.empty else 0,
+        "linhas": int(leituras["linhas"].sum()) if not leituras.empty else 0,
+        "erros": erros,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latência e memória por página sobre dados sintéticos.")
+    parser.add_argument("--escalas", default="1,10,100")
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--url", default=None, help="banco dedicado (tabelas recriadas); padrão: SQLite temporário")
+    parser.add_argument("--paginas", default=None, help="módulos de paginas/ separados por vírgula")
+    args = parser.parse_args()
+
+    raiz = tempfile.mkdtemp(prefix="dashaws_bench_")
+    _configurar_ambiente(raiz)
+    from benchmarks.dados_sinteticos import carregar, criar_engine, gerar
+
+    paginas = PAGINAS
+    if args.paginas:
+        filtro = set(args.paginas.split(","))
+        paginas = {nome: spec for nome, spec in PAGINAS.items() if spec.split(":")[0] in filtro}
+
+    try:
+        for escala in (float(e) for e in args.escalas.split(",")):
+            url = args.url or f"sqlite:///{os.path.join(raiz, f'escala_{escala:g}.db')}"
+            inicio = time.perf_counter()
+            tabelas = gerar(escala)
+            carregar(criar_engine(url), tabelas)
+            total = sum(len(df) for df in tabelas.values())
+            print(f"\n=== Escala {escala:g}x: {total:,} linhas carregadas em {time.perf_counter() - inicio:.1f} s ===")
+            print(f"{'página':<28} {'frio (ms)':>10} {'quente (ms)':>12} {'pico (MB)':>10} {'leituras':>9} {'linhas':>10}")
+            os.environ["BENCH_DATABASE_URL"] = url
+            for nome, spec in paginas.items():
+                r = medir_pagina(spec, args.repeticoes)
+                print(f"{nome:<28} {r['frio_ms']:>10.0f} {r['quente_ms']:>12.0f} {r['pico_mb']:>10.1f} {r['leituras']:>9} {r['linhas']:>10,}")
+                for erro in r["erros"]:
+                    print(f"    ! {erro.splitlines()[0][:150]}")
+    finally:
+        _esfriar()
+        shutil.rmtree(raiz, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
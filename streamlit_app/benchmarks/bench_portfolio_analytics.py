@@ -0,0 +1,80 @@
+# streamlit_app/benchmarks/bench_portfolio_analytics.py
+# Mede o motor vetorizado da carteira contra a lógica pandas que ficava na página RTD.
+#
+#   python -m benchmarks.bench_portfolio_analytics
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from portfolio_analytics import compute_portfolio
+
+
+def _carteira_sintetica(n, rng):
+    last = rng.uniform(5, 100, n)
+    return pd.DataFrame({
+        'ticker': [f"T{i:05d}" for i in range(n)],
+        'quantidade': rng.integers(-5_000, 20_000, n).astype(float),
+        'posicao_alvo': rng.dirichlet(np.ones(n)),
+        'last_price': last,
+        'previous_close': last * rng.normal(1, 0.02, n),
+    })
+
+
+def _referencia_pandas(df, caixa_liquido, qtd_cotas):
+    """Cálculo equivalente ao que era feito inline na página, métrica a métrica."""
+    df = df.copy()
+    df['posicao_rs'] = df['quantidade'] * df['last_price']
+    pl = df['posicao_rs'].sum() + caixa_liquido
+    df['posicao_rs_d1'] = df['quantidade'] * df['previous_close']
+    pl_d1 = df['posicao_rs_d1'].sum() + caixa_liquido
+    df['var_dia_perc'] = (df['last_price'] / df['previous_close'] - 1) * 100
+    df['contrib_rs'] = (df['last_price'] - df['previous_close']) * df['quantidade']
+    df['posicao_perc'] = df['posicao_rs'] / pl * 100
+    df['contrib_perc'] = df['contrib_rs'] / pl_d1 * 100
+    df['posicao_alvo_perc'] = df['posicao_alvo'] * 100
+    df['diferenca_perc'] = df['posicao_perc'] - df['posicao_alvo_perc']
+    df['ajuste_qtd'] = ((df['posicao_alvo'] * pl - df['posicao_rs']) / df['last_price']).fillna(0)
+    comprada = df[df['posicao_rs'] > 0]['posicao_rs'].sum() / pl
+    vendida = df[df['posicao_rs'] < 0]['posicao_rs'].sum() / pl
+    return df, comprada + vendida, comprada - vendida, pl / qtd_cotas
+
+
+def _tempo(fn, repeticoes=5):
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        fn()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor * 1000
+
+
+def main():
+    rng = np.random.default_rng(42)
+    caixa, cotas = 1_000_000.0, 100_000.0
+
+    print(f"{'posições':>10} {'pandas (ms)':>12} {'motor (ms)':>11}")
+    for n in (10, 100, 1_000, 10_000, 100_000):
+        df = _carteira_sintetica(n, rng)
+        arrays = [df[c].to_numpy() for c in ('quantidade', 'last_price', 'previous_close', 'posicao_alvo')]
+        t_pandas = _tempo(lambda: _referencia_pandas(df, caixa, cotas))
+        t_motor = _tempo(lambda: compute_portfolio(*arrays, caixa_liquido=caixa, qtd_cotas=cotas))
+        print(f"{n:>10} {t_pandas:>12.3f} {t_motor:>11.3f}")
+
+    # Cenários de preço em lote: uma chamada para todos os choques
+    n, cenarios = 2_000, 1_000
+    df = _carteira_sintetica(n, rng)
+    choques = rng.normal(1, 0.05, (cenarios, n))
+    precos = df['last_price'].to_numpy() * choques
+    t_lote = _tempo(lambda: compute_portfolio(
+        df['quantidade'].to_numpy(), precos, df['previous_close'].to_numpy(),
+        df['posicao_alvo'].to_numpy(), caixa_liquido=caixa, qtd_cotas=cotas,
+    ))
+    t_loop = _tempo(lambda: [_referencia_pandas(df.assign(last_price=p), caixa, cotas) for p in precos[:50]], 1)
+    print(f"\n{cenarios} cenários x {n} posições em lote: {t_lote:.1f} ms")
+    print(f"pandas, um cenário por vez (estimado p/ {cenarios}): {t_loop * cenarios / 50:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+# streamlit_app/benchmarks/bench_rebalanceamento.py
+# Rebalanceamento em lotes com limite de caixa: uma chamada de `rebalancear`
+# para todos os cenários (choque de mercado × alvo de um ativo) contra uma
+# chamada por cenário. Confere que as ordens são múltiplas do lote, que as
+# compras respeitam o caixa mínimo e que o lote bate com o laço.
+#
+#   python -m benchmarks.bench_rebalanceamento
+
+import time
+
+import numpy as np
+
+from portfolio_analytics import rebalancear
+
+LOTE = 100
+
+
+def _carteira(n, rng):
+    preco = rng.uniform(5, 80, n)
+    alvo = rng.dirichlet(np.ones(n)) * 0.97
+    quantidade = np.round(alvo * 5e6 / preco * rng.uniform(0.7, 1.3, n) / LOTE) * LOTE
+    return quantidade, preco, alvo
+
+
+def _cenarios(preco, alvo, n_cenarios):
+    # Grade quadrada: choque de mercado de -20% a +20% × alvo do primeiro ativo de 0 a 15%
+    lado = int(np.sqrt(n_cenarios))
+    choques, pesos = np.meshgrid(np.linspace(-0.2, 0.2, lado), np.linspace(0, 0.15, lado))
+    precos = preco * (1 + choques.reshape(-1, 1))
+    alvos = np.tile(alvo, (lado * lado, 1))
+    alvos[:, 0] = pesos.ravel()
+    return precos, alvos
+
+
+def main():
+    rng = np.random.default_rng(0)
+    caixa = 150_000.0
+    print(f"{'ativos':>6} {'cenários':>9} {'por cenário (ms)':>17} {'lote (ms)':>10}")
+    for n in (30, 100):
+        quantidade, preco, alvo = _carteira(n, rng)
+        for n_cenarios in (1, 100, 1_024, 10_000):
+            precos, alvos = _cenarios(preco, alvo, n_cenarios)
+            minimo = 0.03 * ((quantidade * precos).sum(axis=-1) + caixa)
+
+            inicio = time.perf_counter()
+            r = rebalancear(quantidade, precos, alvos, caixa, LOTE, minimo, custo=0.0005)
+            ms_lote = (time.perf_counter() - inicio) * 1000
+
+            amostra = range(0, len(precos), max(1, len(precos) // 50))
+            inicio = time.perf_counter()
+            laco = [rebalancear(quantidade, precos[k], alvos[k], caixa, LOTE, minimo[k], custo=0.0005) for k in amostra]
+            ms_laco = (time.perf_counter() - inicio) * 1000 * len(precos) / len(amostra)
+
+            assert np.all(r.ordem % LOTE == 0)
+            compras = (r.ordem > 0).any(axis=-1)
+            assert np.all(r.caixa_final[compras] >= minimo[compras] - 1e-6)
+            assert all(np.array_equal(x.ordem, r.ordem[k]) for x, k in zip(laco, amostra))
+            print(f"{n:>6} {len(precos):>9} {ms_laco:>17.1f} {ms_lote:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+# streamlit_app/benchmarks/bench_retorno_acumulado.py
+# Tamanho do payload do gráfico Cota vs. Ibovespa e tempo de montagem,
+# com e sem a redução por LTTB, para históricos de 1 a 40 anos.
+#
+#   python -m benchmarks.bench_retorno_acumulado
+
+import time
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from retorno_acumulado import RetornoAcumuladoCache, reduzir
+
+PONTOS = 600
+
+
+def _serie(n):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "data": pd.bdate_range("1990-01-01", periods=n),
+        "cota": np.cumprod(1 + rng.normal(0, 0.01, n)),
+        "ibov": np.cumprod(1 + rng.normal(0, 0.012, n)),
+    })
+    return RetornoAcumuladoCache._montar(df)
+
+
+def _figura(serie, pontos):
+    fig = go.Figure()
+    for valores in (serie.cota_return, serie.ibov_return):
+        x, y = reduzir(serie.datas, valores, pontos)
+        fig.add_trace(go.Scatter(x=x, y=y, mode='lines'))
+    return fig.to_json()
+
+
+def main():
+    for anos in (1, 5, 10, 20, 40):
+        serie = _serie(anos * 252)
+        for rotulo, pontos in (("completo", len(serie)), ("LTTB", PONTOS)):
+            inicio = time.perf_counter()
+            payload = _figura(serie, pontos)
+            ms = (time.perf_counter() - inicio) * 1000
+            print(f"{anos:>2} anos ({len(serie):>6} pts) {rotulo:>8}: {len(payload) / 1024:8.1f} KB em {ms:6.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
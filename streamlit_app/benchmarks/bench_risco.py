@@ -0,0 +1,71 @@
+# streamlit_app/benchmarks/bench_risco.py
+# Métricas de risco (4 janelas) sobre décadas de dados diários sintéticos:
+# rolling do pandas janela a janela contra o cálculo vetorizado (risco), e o
+# custo de cada linha nova pela atualização em O(1), que não cresce com o histórico.
+#
+#   python -m benchmarks.bench_risco
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from risco import DIAS_ANO, JANELAS, calcular_risco
+
+
+def _serie(n):
+    rng = np.random.default_rng(0)
+    datas = pd.bdate_range("1950-01-02", periods=n).to_numpy(dtype="datetime64[ns]")
+    ibov = np.cumprod(1 + rng.normal(0.0003, 0.012, n))
+    cota = ibov * np.cumprod(1 + rng.normal(0.0001, 0.006, n))
+    return datas, cota, ibov, np.full(n, 0.0004)
+
+
+def _pandas(cota, ibov, rf):
+    r = pd.Series(cota).pct_change()
+    ri = pd.Series(ibov).pct_change()
+    excesso = r - pd.Series(rf)
+    resultado = {}
+    for w in JANELAS:
+        desvio = r.rolling(w).std()
+        resultado[w] = (
+            desvio * np.sqrt(DIAS_ANO), r.rolling(w).cov(ri) / ri.rolling(w).var(), r.rolling(w).corr(ri),
+            excesso.rolling(w).mean() / desvio * np.sqrt(DIAS_ANO),
+        )
+    pico = np.maximum.accumulate(cota)
+    return resultado, cota / pico - 1
+
+
+def _ms(fn, repeticoes=3):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = fn()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return float(np.median(tempos)), resultado
+
+
+def main():
+    print(f"{'anos':>5} {'linhas':>7} {'pandas (ms)':>12} {'vetorizado (ms)':>16} {'linha nova (µs)':>16}")
+    for anos in (10, 40, 100):
+        n = anos * DIAS_ANO
+        datas, cota, ibov, rf = _serie(n + DIAS_ANO)
+        ms_pandas, (esperado, _) = _ms(lambda: _pandas(cota[:n], ibov[:n], rf[:n]))
+        ms_vetor, (historico, estado, _) = _ms(lambda: calcular_risco(datas[:n], cota[:n], ibov[:n], rf[:n]))
+        valores = historico.risco(estado.max_drawdown).valores
+        for k, w in enumerate(JANELAS):
+            assert np.allclose(np.column_stack(esperado[w]), valores[:, k], equal_nan=True, atol=1e-8)
+
+        # Um ano de linhas novas, uma a uma, sobre o estado da carga completa
+        inicio = time.perf_counter()
+        for i in range(n, n + DIAS_ANO):
+            estado.atualizar(datas[i], cota[i], ibov[i], rf[i])
+        us_linha = (time.perf_counter() - inicio) / DIAS_ANO * 1e6
+        _, completo, _ = calcular_risco(datas, cota, ibov, rf)
+        assert np.allclose(estado.somas, completo.somas, atol=1e-9) and estado.max_drawdown == completo.max_drawdown
+
+        print(f"{anos:>5} {n:>7} {ms_pandas:>12.1f} {ms_vetor:>16.1f} {us_linha:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+# streamlit_app/benchmarks/bench_startup.py
+# Mede o tempo de importação a frio (processo novo, como no cold start do
+# App Runner) do script principal e de cada módulo de página.
+#
+#   python -m benchmarks.bench_startup [--max-ms 1500] [--repeticoes 5]
+#
+# Com --max-ms, termina com código 1 se as importações do script principal
+# passarem do limite, para pegar regressões de cold start.
+
+import argparse
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+
+# O que o app_aws.py importa antes de executar qualquer página
+PRINCIPAL = ("streamlit", "db", "paginas", "paginas.comum", "instrumentation")
+
+PAGINAS = (
+    "paginas.rtd_portfolio",
+    "paginas.risco",
+    "paginas.visao_geral",
+    "paginas.dados_historicos",
+    "paginas.documentos",
+    "paginas.screening",
+    "paginas.radar_insiders",
+    "paginas.comparador",
+    "paginas.dados_macro",
+    "paginas.curva_juros",
+    "paginas.assistentes_ia",
+)
+
+# Dependências pesadas que não podem voltar ao caminho do script principal
+# (plotly fica de fora: o próprio streamlit já o importa)
+PESADAS = ("yfinance", "bcb", "boto3", "requests", "pyarrow.parquet", "redis")
+
+_MEDIR = """
+import sys, time
+inicio = time.perf_counter()
+for nome in {modulos!r}:
+    __import__(nome)
+print((time.perf_counter() - inicio) * 1000)
+print(",".join(m for m in {pesadas!r} if m in sys.modules))
+"""
+
+
+def importar_a_frio(modulos):
+    """(ms, dependências pesadas carregadas) da importação de `modulos` num processo novo."""
+    codigo = _MEDIR.format(modulos=tuple(modulos), pesadas=PESADAS)
+    saida = subprocess.run([sys.executable, "-c", codigo], cwd=RAIZ, capture_output=True, text=True, check=True)
+    ms, pesadas = saida.stdout.split("\n")[:2]
+    return float(ms), [p for p in pesadas.split(",") if p]
+
+
+def medir(modulos, repeticoes):
+    tempos, pesadas = [], []
+    for _ in range(repeticoes):
+        ms, pesadas = importar_a_frio(modulos)
+        tempos.append(ms)
+    return statistics.median(tempos), pesadas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--max-ms", type=float, default=None)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args()
+
+    ms_streamlit, _ = medir(("streamlit",), args.repeticoes)
+    ms_principal, pesadas = medir(PRINCIPAL, args.repeticoes)
+    print(f"streamlit sozinho: {ms_streamlit:.0f} ms")
+    print(f"Script principal: {ms_principal:.0f} ms (pesadas carregadas: {', '.join(pesadas) or 'nenhuma'})")
+    for pagina in PAGINAS:
+        ms, pesadas_pagina = medir(PRINCIPAL + (pagina,), args.repeticoes)
+        print(f"  + {pagina}: +{ms - ms_principal:.0f} ms ({', '.join(pesadas_pagina) or '-'})")
+
+    falhou = False
+    if pesadas:
+        print(f"ERRO: o script principal importa dependências pesadas: {', '.join(pesadas)}")
+        falhou = True
+    if args.max_ms is not None and ms_principal > args.max_ms:
+        print(f"ERRO: importação do script principal acima do limite de {args.max_ms:.0f} ms")
+        falhou = True
+    sys.exit(1 if falhou else 0)
+
+
+if __name__ == "__main__":
+    main()
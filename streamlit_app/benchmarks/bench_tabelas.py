@@ -0,0 +1,91 @@
+# streamlit_app/benchmarks/bench_tabelas.py
+# Tempo de servidor e tamanho da mensagem enviada ao navegador para a tabela
+# da carteira e para uma demonstração financeira: Styler com callback por
+# célula (como era) contra column_config (paginas.tabelas).
+# As funções de cada caso rodam como scripts do AppTest: importam o que usam.
+#
+#   python -m benchmarks.bench_tabelas
+
+import time
+
+import numpy as np
+import pandas as pd
+from streamlit.testing.v1 import AppTest
+
+from paginas.comum import FORMATOS_CARTEIRA
+
+
+def _carteira(n):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(rng.normal(size=(n, len(FORMATOS_CARTEIRA))) * 100, columns=list(FORMATOS_CARTEIRA))
+    df.insert(0, 'Ativo', [f"ATV{i:04d}" for i in range(n)])
+    return df
+
+
+def _demonstrativo(contas, datas):
+    rng = np.random.default_rng(0)
+    return pd.DataFrame(
+        rng.lognormal(15, 2, (contas, datas)),
+        index=pd.Index([f"Conta {i}" for i in range(contas)], name="ds_conta"),
+        columns=pd.date_range("1990-12-31", periods=datas, freq="YE"),
+    )
+
+
+def _carteira_antes(df):
+    import streamlit as st
+
+    def color_negative_red(val):
+        if isinstance(val, (int, float)):
+            return f"color: {'#ef4444' if val < 0 else '#22c55e'}"
+        return ''
+    format_dict = {
+        'Cotação': 'R$ {:,.2f}', 'Var. Dia (%)': '{:,.2f}%', 'Contrib. (%)': '{:,.2f}%',
+        'Quantidade': '{:,.0f}', 'Posição (R$)': 'R$ {:,.2f}', 'Posição (%)': '{:,.2f}%',
+        'Posição % Alvo': '{:,.2f}%', 'Diferença': '{:,.2f}%', 'Ajuste (Qtd.)': '{:,.0f}'
+    }
+    st.dataframe(df.style.format(format_dict, na_rep="").map(
+        color_negative_red, subset=['Var. Dia (%)', 'Contrib. (%)', 'Diferença', 'Ajuste (Qtd.)']
+    ), hide_index=True)
+
+
+def _carteira_depois(df):
+    from paginas.comum import tabela_carteira
+    tabela_carteira(df, hide_index=True)
+
+
+def _demonstrativo_antes(df):
+    import streamlit as st
+    st.dataframe(df.style.format("{:,.0f}"))
+
+
+def _demonstrativo_depois(df):
+    from paginas.tabelas import demonstrativo
+    demonstrativo(df)
+
+
+def _medir(funcao, df, repeticoes=3):
+    """(ms medianos do script, bytes da mensagem do dataframe)."""
+    tempos = []
+    for _ in range(repeticoes):
+        at = AppTest.from_function(funcao, args=(df,))
+        inicio = time.perf_counter()
+        at.run()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return float(np.median(tempos)), at.dataframe[0].proto.ByteSize()
+
+
+def main():
+    casos = [(f"carteira {n} ativos", _carteira(n), _carteira_antes, _carteira_depois) for n in (15, 150, 1500)]
+    casos += [
+        (f"demonstrativo {c}x{d}", _demonstrativo(c, d), _demonstrativo_antes, _demonstrativo_depois)
+        for c, d in ((40, 5), (80, 20), (200, 60))
+    ]
+    print(f"{'tabela':<26} {'Styler (ms)':>12} {'KB':>8} {'novo (ms)':>10} {'KB':>8}")
+    for nome, df, antes, depois in casos:
+        ms_a, b_a = _medir(antes, df)
+        ms_d, b_d = _medir(depois, df)
+        print(f"{nome:<26} {ms_a:>12.0f} {b_a / 1024:>8.1f} {ms_d:>10.0f} {b_d / 1024:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+# streamlit_app/benchmarks/dados_sinteticos.py
+# Gerador de dados sintéticos (determinísticos) para as tabelas lidas pelo
+# dashboard, em escala configurável, e carga num Postgres local ou num
+# arquivo SQLite.
+#
+#   python -m benchmarks.dados_sinteticos --url postgresql+psycopg2://localhost/dashaws_bench --escala 10
+#
+# A escala multiplica o número de empresas, ativos da carteira, dias de
+# histórico, documentos e transações de insiders de BASE.
+#
+# No SQLite não há `= ANY(:lista)`, pg_stat_user_tables nem arrays: `criar_engine`
+# reescreve o ANY como IN expandido, os stores não detectam mudanças (toda
+# leitura conta como tabela alterada) e cada empresa tem um só ticker. Para
+# números comparáveis com produção, use Postgres.
+
+import argparse
+import re
+import time
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import bindparam, create_engine, event, text
+from sqlalchemy.sql.elements import TextClause
+
+from indicadores import CONTAS
+
+# Tamanhos da escala 1
+BASE = {
+    "empresas": 40,
+    "ativos": 15,
+    "dias_historico": 756,
+    "documentos": 2000,
+    "transacoes": 2000,
+}
+ANOS_FINANCEIROS = 5
+TRIMESTRES = 12
+CONTAS_POR_TIPO = 10
+
+CATEGORIAS_DOCUMENTOS = ["Fato Relevante", "Comunicado ao Mercado", "Aviso aos Acionistas", "Assembleia", "Calendário de Eventos Corporativos"]
+DESCRICOES_INSIDERS = ["Compra à vista", "Venda à vista", "Subscrição", "Alienação", "Aquisição por exercício de opção", "Doação"]
+CATEGORIAS_INSIDERS = ["Controlador", "Diretoria", "Conselho de Administração", "Conselho Fiscal", "Pessoas Vinculadas"]
+METRICAS = {"quantidade_cotas": 100000.0, "caixa_bruto": 250000.0, "outros": 0.0, "outras_despesas": -5000.0, "cota_d1": 1.0}
+
+_RE_ANY = re.compile(r"=\s*ANY\(:(\w+)\)", re.IGNORECASE)
+
+
+def tamanhos(escala):
+    """Número de linhas de cada dimensão na `escala` dada."""
+    t = {nome: int(valor * escala) for nome, valor in BASE.items()}
+    t["ativos"] = min(t["ativos"], t["empresas"])
+    return t
+
+
+def _raiz(i):
+    """Quatro letras distintas por empresa, como nos tickers da B3 (AAAA, AAAB, ...)."""
+    letras = ""
+    for _ in range(4):
+        i, resto = divmod(i, 26)
+        letras = chr(65 + resto) + letras
+    return letras
+
+
+def _empresas(rng, n):
+    nomes = [f"EMPRESA {i:05d} S.A." for i in range(n)]
+    raizes = [_raiz(i) for i in range(n)]
+    # Um terço das empresas tem ações ON e PN
+    tickers = [[f"{r}3", f"{r}4"] if rng.random() < 1 / 3 else [f"{r}3"] for r in raizes]
+    return pd.DataFrame({"denom_cia": nomes, "tickers": tickers})
+
+
+def _contas():
+    """(tipo, cd_conta, ds_conta): as contas dos indicadores e outras genéricas até CONTAS_POR_TIPO por tipo."""
+    contas = [(tipo, cd, nome.replace("_", " ").title()) for nome, (tipo, cd) in CONTAS.items()]
+    raiz = {"DRE": "3", "BPA": "1", "BPP": "2", "DFC": "6"}
+    for tipo, prefixo in raiz.items():
+        existentes = sum(1 for c in contas if c[0] == tipo)
+        contas += [(tipo, f"{prefixo}.{90 + i:02d}", f"Conta {tipo} {i + 1}") for i in range(CONTAS_POR_TIPO - existentes)]
+    return contas
+
+
+def _financeiros(rng, empresas, hoje):
+    contas = _contas()
+    anual = [pd.Timestamp(hoje.year - 1 - i, 12, 31) for i in range(ANOS_FINANCEIROS)]
+    trimestral = list(pd.date_range(end=pd.Timestamp(hoje), periods=TRIMESTRES + 1, freq="QE")[:-1])
+    datas = [("ANUAL", d) for d in anual] + [("TRIMESTRAL", d) for d in trimestral]
+    n_e, n_c, n_d = len(empresas), len(contas), len(datas)
+    # Produto cartesiano empresa × conta × data com um nível por empresa e conta
+    i_e = np.repeat(np.arange(n_e), n_c * n_d)
+    i_c = np.tile(np.repeat(np.arange(n_c), n_d), n_e)
+    i_d = np.tile(np.arange(n_d), n_e * n_c)
+    nivel = rng.lognormal(20, 1.5, n_e)[i_e] * rng.uniform(0.05, 1, n_c)[i_c]
+    valores = nivel * rng.normal(1, 0.15, len(i_e))
+    tipos, codigos, descricoes = (np.array(c, dtype=object) for c in zip(*contas))
+    periodos, fins = (np.array(c, dtype=object) for c in zip(*datas))
+    return pd.DataFrame({
+        "denom_cia": empresas["denom_cia"].to_numpy()[i_e],
+        "periodo": periodos[i_d],
+        "tipo_demonstracao": tipos[i_c],
+        "cd_conta": codigos[i_c],
+        "ds_conta": descricoes[i_c],
+        "dt_fim_exerc": pd.to_datetime(fins[i_d]),
+        "vl_conta": valores.round(2),
+    })
+
+
+def gerar(escala=1, seed=0, hoje=None):
+    """{tabela: DataFrame} com os dados sintéticos da `escala`."""
+    hoje = hoje or date.today()
+    rng = np.random.default_rng(seed)
+    t = tamanhos(escala)
+    empresas = _empresas(rng, t["empresas"])
+    primeiro_ticker = empresas["tickers"].str[0]
+
+    carteira = rng.choice(len(empresas), t["ativos"], replace=False)
+    tickers = primeiro_ticker.to_numpy()[carteira]
+    pesos = rng.dirichlet(np.ones(t["ativos"])) * 0.95
+    fechamento = rng.uniform(5, 120, t["ativos"]).round(2)
+    quantidade = np.maximum((pesos * 10_000_000 / fechamento) // 100 * 100, 100)
+
+    dias = pd.bdate_range(end=pd.Timestamp(hoje), periods=t["dias_historico"])
+    retornos = rng.normal(0.0004, 0.011, (len(dias), 2))
+    historico = pd.DataFrame({"data": dias.date, "cota": np.cumprod(1 + retornos[:, 0]), "ibov": 100000 * np.cumprod(1 + retornos[:, 1])})
+
+    inicio = pd.Timestamp(hoje) - pd.Timedelta(days=730)
+    segundos = rng.integers(0, 730 * 86400, t["documentos"])
+    entrega = (inicio + pd.to_timedelta(np.sort(segundos), unit="s")).floor("s")
+    documentos = pd.DataFrame({
+        "id": np.arange(1, t["documentos"] + 1),
+        "data_entrega": entrega,
+        "nome_companhia": empresas["denom_cia"].to_numpy()[rng.integers(0, len(empresas), t["documentos"])],
+        "categoria": rng.choice(CATEGORIAS_DOCUMENTOS, t["documentos"]),
+        "assunto": [f"Documento {i}" for i in range(t["documentos"])],
+        "link_download": [f"https://example.invalid/cvm/{i}.pdf" for i in range(t["documentos"])],
+    })
+
+    # Nomes como a CVM publica nas transações: nem sempre iguais aos de dim_empresas
+    sufixos = rng.choice([" S.A.", " SA", " S/A"], len(empresas))
+    nomes_transacoes = np.array([nome.replace(" S.A.", s) for nome, s in zip(empresas["denom_cia"], sufixos)], dtype=object)
+    transacoes = pd.DataFrame({
+        "nome_companhia": nomes_transacoes[rng.integers(0, len(empresas), t["transacoes"])],
+        "data": (pd.Timestamp(hoje) - pd.to_timedelta(rng.integers(0, 730, t["transacoes"]), unit="D")).date,
+        "descricao": rng.choice(DESCRICOES_INSIDERS, t["transacoes"]),
+        "categoria": rng.choice(CATEGORIAS_INSIDERS, t["transacoes"]),
+        "valor": rng.lognormal(12, 1.5, t["transacoes"]).round(2),
+    })
+
+    return {
+        "dim_empresas": empresas,
+        "portfolio_config": pd.DataFrame({
+            "id": np.arange(1, t["ativos"] + 1), "ticker": tickers,
+            "quantidade": quantidade, "posicao_alvo": (pesos / pesos.sum() * 0.95).round(4),
+        }),
+        "realtime_quotes": pd.DataFrame({
+            "ticker": tickers, "last_price": (fechamento * rng.normal(1, 0.01, t["ativos"])).round(2),
+            "previous_close": fechamento, "updated_at": datetime.now(),
+        }),
+        "portfolio_metrics": pd.DataFrame({"metric_key": list(METRICAS), "metric_value": list(METRICAS.values())}),
+        "portfolio_history": historico,
+        "cvm_dados_financeiros": _financeiros(rng, empresas, hoje),
+        "cvm_documentos_ipe": documentos,
+        "transacoes": transacoes,
+    }
+
+
+def criar_engine(url):
+    """Engine para `url`; no SQLite, `coluna = ANY(:lista)` vira `coluna IN (...)`."""
+    engine = create_engine(url)
+    if engine.dialect.name == "sqlite":
+        @event.listens_for(engine, "before_execute", retval=True)
+        def _any_para_in(conn, clause, multiparams, params, execution_options):
+            if isinstance(clause, TextClause) and _RE_ANY.search(clause.text):
+                nomes = _RE_ANY.findall(clause.text)
+                clause = text(_RE_ANY.sub(r"IN :\1", clause.text)).bindparams(
+                    *(bindparam(nome, expanding=True) for nome in nomes)
+                )
+            return clause, multiparams, params
+    return engine
+
+
+def carregar(engine, tabelas, chunksize=10_000):
+    """Recria as tabelas no banco. Retorna {tabela: segundos}."""
+    tempos = {}
+    for nome, df in tabelas.items():
+        inicio = time.perf_counter()
+        if nome == "dim_empresas" and engine.dialect.name != "postgresql":
+            df = df.assign(tickers=df["tickers"].str[0])
+        dtype = None
+        if nome == "dim_empresas" and engine.dialect.name == "postgresql":
+            from sqlalchemy import Text
+            from sqlalchemy.dialects.postgresql import ARRAY
+            dtype = {"tickers": ARRAY(Text)}
+        df.to_sql(nome, engine, if_exists="replace", index=False, chunksize=chunksize, dtype=dtype,
+                  method="multi" if engine.dialect.name == "postgresql" else None)
+        tempos[nome] = time.perf_counter() - inicio
+    with engine.begin() as conn:
+        conn.execute(text("CREATE INDEX IF NOT EXISTS ix_bench_transacoes ON transacoes (nome_companhia, data)"))
+        conn.execute(text("CREATE INDEX IF NOT EXISTS ix_bench_financeiros ON cvm_dados_financeiros (denom_cia, periodo)"))
+        conn.execute(text("CREATE INDEX IF NOT EXISTS ix_bench_documentos ON cvm_documentos_ipe (data_entrega, id)"))
+        if engine.dialect.name == "postgresql":
+            conn.execute(text("ANALYZE"))
+    return tempos
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Carrega dados sintéticos do dashboard num banco local.")
+    parser.add_argument("--url", required=True, help="URL SQLAlchemy (postgresql+psycopg2://... ou sqlite:///arquivo.db)")
+    parser.add_argument("--escala", type=float, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    tabelas = gerar(args.escala, seed=args.seed)
+    tempos = carregar(criar_engine(args.url), tabelas)
+    for nome, df in tabelas.items():
+        print(f"{nome:<24} {len(df):>10,} linhas em {tempos[nome]:6.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+# streamlit_app/comparador.py
+# Painel comparativo de várias empresas para o Comparador de Empresas.
+#
+# As demonstrações de todas as empresas vêm do cache de demonstrações
+# (`get_many`: as que faltam são lidas numa única consulta). Aqui elas são
+# alinhadas num só array (empresa × conta × data) por tipo de demonstração,
+# com a união das contas em ordem contábil e a união das datas de todos os
+# tipos, de modo que os indicadores saem de uma chamada vetorizada.
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from demonstracoes_cache import TIPOS_DEMONSTRACAO, get_demonstracoes_cache, ordem_contabil
+from indicadores import CONTAS, MatrizIndicadores, calcular_indicadores
+
+# Limite de empresas por comparação
+MAX_EMPRESAS = 20
+
+
+@dataclass(frozen=True)
+class PainelConta:
+    """Contas de um tipo de demonstração alinhadas para todas as empresas."""
+    cd_conta: np.ndarray
+    ds_conta: np.ndarray
+    valores: np.ndarray  # (empresa, conta, data)
+
+    def posicao(self, cd_conta):
+        posicao = np.flatnonzero(self.cd_conta == cd_conta)
+        return int(posicao[0]) if posicao.size else None
+
+
+@dataclass(frozen=True)
+class Comparacao:
+    """Empresas comparadas, a união das suas datas e um PainelConta por tipo de demonstração.
+
+    Uma data que falta a uma empresa fica NaN nos valores dela.
+    """
+    empresas: np.ndarray
+    datas: pd.DatetimeIndex
+    paineis: dict
+
+    def conta(self, tipo, cd_conta, divisor=1):
+        """DataFrame empresa × data de uma conta (vazio se nenhuma empresa a tiver)."""
+        painel = self.paineis[tipo]
+        i = painel.posicao(cd_conta)
+        if i is None:
+            return pd.DataFrame(index=pd.Index(self.empresas, name="denom_cia"))
+        return pd.DataFrame(painel.valores[:, i, :] / divisor, index=pd.Index(self.empresas, name="denom_cia"), columns=self.datas)
+
+    def contas_disponiveis(self, tipo):
+        """{cd_conta: 'cd_conta - ds_conta'} das contas do tipo presentes em alguma empresa."""
+        painel = self.paineis[tipo]
+        return {cd: f"{cd} - {ds}" for cd, ds in zip(painel.cd_conta, painel.ds_conta)}
+
+    def indicadores(self):
+        """MatrizIndicadores (empresa × data × indicador) calculada sobre o painel."""
+        contas = np.full((len(self.empresas), len(self.datas), len(CONTAS)), np.nan)
+        for k, (tipo, cd_conta) in enumerate(CONTAS.values()):
+            i = self.paineis[tipo].posicao(cd_conta)
+            if i is not None:
+                contas[..., k] = self.paineis[tipo].valores[:, i, :]
+        return MatrizIndicadores(self.empresas, self.datas, calcular_indicadores(contas, self.datas))
+
+
+def montar_comparacao(demonstracoes):
+    """Comparacao a partir de {empresa: {tipo: Demonstracao}}."""
+    empresas = np.asarray(list(demonstracoes), dtype=object)
+    todas = [d for por_tipo in demonstracoes.values() for d in por_tipo.values()]
+    datas = pd.DatetimeIndex(sorted({data for d in todas for data in d.datas}), name="dt_fim_exerc")
+    paineis = {}
+    for tipo in TIPOS_DEMONSTRACAO:
+        por_empresa = [demonstracoes[e][tipo] for e in empresas]
+        descricoes = {}
+        for d in por_empresa:
+            descricoes.update(zip(d.cd_conta, d.ds_conta))
+        contas = sorted(descricoes, key=ordem_contabil)
+        indice_contas = pd.Index(contas, dtype=object)
+        valores = np.full((len(empresas), len(contas), len(datas)), np.nan)
+        for i, d in enumerate(por_empresa):
+            if not d.empty:
+                linhas = indice_contas.get_indexer(d.cd_conta)
+                colunas = datas.get_indexer(d.datas)
+                valores[i][np.ix_(linhas, colunas)] = d.valores
+        paineis[tipo] = PainelConta(
+            cd_conta=np.asarray(contas, dtype=object),
+            ds_conta=np.asarray([descricoes[c] for c in contas], dtype=object),
+            valores=valores,
+        )
+    return Comparacao(empresas, datas, paineis)
+
+
+def get_comparacao(engine, empresas, periodo):
+    """Comparacao das `empresas` no período ('ANUAL' ou 'TRIMESTRAL'), reaproveitando o cache por empresa.
+
+    Mais de MAX_EMPRESAS empresas levanta ValueError.
+    """
+    empresas = list(dict.fromkeys(empresas))
+    if len(empresas) > MAX_EMPRESAS:
+        raise ValueError(f"no máximo {MAX_EMPRESAS} empresas por comparação ({len(empresas)} pedidas)")
+    return montar_comparacao(get_demonstracoes_cache().get_many(engine, empresas, periodo))
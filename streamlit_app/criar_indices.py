@@ -0,0 +1,48 @@
+# streamlit_app/criar_indices.py
+# Cria os índices que mantêm a latência das páginas constante:
+#   - cvm_documentos_ipe: paginação por chave da página de Documentos CVM;
+#   - transacoes: sincronização incremental do Radar de Insiders.
+#
+# DDL fica fora do app (nenhum botão de página roda CREATE INDEX). CONCURRENTLY
+# não bloqueia as gravações do ETL, mas exige autocommit e pode levar minutos.
+#
+#   python criar_indices.py [--url postgresql+psycopg2://...] [--dry-run]
+#
+# Sem --url, usa DATABASE_URL ou o [database] de .streamlit/secrets.toml.
+
+import argparse
+import os
+
+from sqlalchemy import create_engine, text
+
+from documentos_cvm import INDEXES
+from insiders import INDEX_SQL
+
+COMANDOS = list(INDEXES.values()) + [INDEX_SQL]
+
+
+def _url():
+    import streamlit as st
+    config = st.secrets["database"]
+    return (f"postgresql+psycopg2://{config['user']}:{config['password']}@{config['host']}/{config['dbname']}"
+            "?sslmode=require&connect_timeout=10")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cria os índices recomendados do dashboard.")
+    parser.add_argument("--url", default=os.environ.get("DATABASE_URL"))
+    parser.add_argument("--dry-run", action="store_true", help="só imprime o SQL")
+    args = parser.parse_args()
+
+    if args.dry_run:
+        print(";\n".join(COMANDOS) + ";")
+        return
+    engine = create_engine(args.url or _url())
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for comando in COMANDOS:
+            print(comando)
+            conn.execute(text(comando))
+
+
+if __name__ == "__main__":
+    main()
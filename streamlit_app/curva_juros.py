@@ -0,0 +1,134 @@
+# streamlit_app/curva_juros.py
+# Curva DI × pré: vértices por data e interpolação flat forward (base 252).
+#
+# A interpolação é feita sobre o logaritmo do fator de capitalização,
+# linear em dias úteis entre vértices (taxa a termo constante em cada
+# trecho). Todas as datas e todos os prazos pedidos saem de uma única chamada
+# vetorizada, sem laço por data. Antes do primeiro vértice vale a taxa do
+# primeiro; depois do último, a taxa a termo do último trecho.
+#
+# Dias úteis seguem o calendário da ANBIMA/B3: fins de semana e feriados
+# nacionais (fixos e os móveis, que dependem da Páscoa).
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+DIAS_ANO = 252
+
+# Feriados nacionais de data fixa: (mês, dia, primeiro ano)
+FERIADOS_FIXOS = (
+    (1, 1, None), (4, 21, None), (5, 1, None), (9, 7, None), (10, 12, None),
+    (11, 2, None), (11, 15, None), (11, 20, 2024), (12, 25, None),
+)
+# Feriados móveis em dias a partir da Páscoa: Carnaval (seg. e ter.), Sexta-feira Santa e Corpus Christi
+FERIADOS_PASCOA = (-48, -47, -2, 60)
+
+
+def pascoa(ano):
+    """Domingo de Páscoa do `ano` (calendário gregoriano)."""
+    a, b, c = ano % 19, ano // 100, ano % 100
+    d, e = divmod(b, 4)
+    g = (8 * b + 13) // 25
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 19 * l) // 433
+    mes = (h + l - 7 * m + 90) // 25
+    return np.datetime64(f"{ano:04d}-{mes:02d}-{(h + l - 7 * m + 33 * mes + 19) % 32:02d}")
+
+
+def feriados_nacionais(primeiro_ano, ultimo_ano):
+    """Feriados nacionais (ANBIMA) de `primeiro_ano` a `ultimo_ano`, em datetime64[D] ordenado."""
+    feriados = []
+    for ano in range(primeiro_ano, ultimo_ano + 1):
+        feriados += [np.datetime64(f"{ano:04d}-{mes:02d}-{dia:02d}") for mes, dia, desde in FERIADOS_FIXOS
+                     if desde is None or ano >= desde]
+        feriados += [pascoa(ano) + np.timedelta64(d, "D") for d in FERIADOS_PASCOA]
+    return np.unique(np.array(feriados, dtype="datetime64[D]"))
+
+
+def dias_uteis(datas, prazos, feriados=()):
+    """Matriz (data, prazo) de dias úteis entre cada data e data + prazo (dias corridos)."""
+    inicio = np.asarray(datas, dtype="datetime64[D]")[:, None]
+    fim = inicio + np.asarray(prazos, dtype="timedelta64[D]")[None, :]
+    return np.busday_count(inicio, fim, holidays=list(feriados))
+
+
+def interpolar_flat_forward(du_vertices, taxas, du_alvo):
+    """Taxas (% a.a.) interpoladas em `du_alvo` para cada data.
+
+    `du_vertices` e `taxas` são (data, vértice), com vértices em ordem
+    crescente; `du_alvo` é (prazo,) ou (data, prazo). Retorna (data, prazo).
+    """
+    du_vertices = np.asarray(du_vertices, dtype=float)
+    taxas = np.asarray(taxas, dtype=float)
+    n = du_vertices.shape[0]
+    alvo = np.broadcast_to(np.asarray(du_alvo, dtype=float), (n, np.shape(du_alvo)[-1]))
+
+    # Log do fator acumulado em cada vértice, com a origem (0 dias, fator 1) na frente
+    log_fator = du_vertices / DIAS_ANO * np.log1p(taxas / 100)
+    x = np.concatenate([np.zeros((n, 1)), du_vertices], axis=1)
+    y = np.concatenate([np.zeros((n, 1)), log_fator], axis=1)
+
+    # Cada trecho é uma reta no log do fator: inclinação (taxa a termo) e intercepto
+    inclinacao = np.diff(y, axis=1) / np.diff(x, axis=1)
+    intercepto = y[:, :-1] - inclinacao * x[:, :-1]
+
+    # Trecho de cada prazo: quantos vértices internos ficam <= prazo (depois do último, o último trecho)
+    internos = x[:, 1:-1]
+    if np.ndim(du_alvo) == 1 and np.all(np.diff(du_alvo) >= 0):
+        # Prazos comuns e ordenados: cada vértice marca a coluna onde começa a contar, e a soma acumulada dá o trecho
+        marcas = np.zeros((n, alvo.shape[1] + 1), dtype=np.intp)
+        np.add.at(marcas, (np.arange(n)[:, None], np.searchsorted(alvo[0], internos, side="left")), 1)
+        trecho = np.cumsum(marcas[:, :-1], axis=1)
+    else:
+        # Os vértices são poucos: a contagem percorre um vértice por vez, com todas as datas e prazos juntos
+        trecho = np.zeros(alvo.shape, dtype=np.intp)
+        for v in range(internos.shape[1]):
+            trecho += internos[:, v:v + 1] <= alvo
+    log_alvo = np.take_along_axis(intercepto, trecho, axis=1)
+    log_alvo += np.take_along_axis(inclinacao, trecho, axis=1) * alvo
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(alvo > 0, np.expm1(log_alvo * DIAS_ANO / alvo) * 100, np.nan)
+
+
+@dataclass(frozen=True)
+class CurvaDI:
+    """Vértices da curva DI × pré por data: prazos em dias corridos, taxas em % a.a."""
+    datas: pd.DatetimeIndex
+    prazos: np.ndarray
+    taxas: np.ndarray  # (data, vértice)
+
+    def __len__(self):
+        return len(self.datas)
+
+    def dias_uteis(self):
+        """Matriz (data, vértice) de dias úteis até cada vértice, sem os feriados nacionais."""
+        if not len(self.datas):
+            return dias_uteis(self.datas, self.prazos)
+        fim = self.datas[-1] + pd.Timedelta(days=int(self.prazos.max()))
+        return dias_uteis(self.datas, self.prazos, feriados_nacionais(self.datas[0].year, fim.year))
+
+    def interpolar(self, du_alvo, datas=None):
+        """DataFrame data × prazo (dias úteis) das taxas interpoladas, para todas as datas ou só `datas`."""
+        posicoes = slice(None) if datas is None else self.posicoes(datas)
+        du_alvo = np.asarray(du_alvo)
+        taxas = interpolar_flat_forward(self.dias_uteis()[posicoes], self.taxas[posicoes], du_alvo)
+        return pd.DataFrame(taxas, index=self.datas[posicoes], columns=pd.Index(du_alvo, name="dias_uteis"))
+
+    def posicoes(self, datas):
+        """Posição da última data da curva até cada uma de `datas` (sem repetição)."""
+        posicoes = self.datas.searchsorted(pd.DatetimeIndex(datas), side="right") - 1
+        return np.unique(posicoes[posicoes >= 0])
+
+
+def montar_curva(df_vertices, prazos):
+    """CurvaDI a partir de um DataFrame data × vértice (colunas na ordem de `prazos`).
+
+    Vértices sem cotação num dia repetem a última taxa; datas sem nenhum vértice ficam de fora.
+    """
+    df = df_vertices.sort_index().ffill().dropna()
+    return CurvaDI(pd.DatetimeIndex(df.index), np.asarray(prazos, dtype=int), df.to_numpy(dtype=float))
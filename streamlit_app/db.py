@@ -0,0 +1,149 @@
+# streamlit_app/db.py
+# Camada de acesso ao banco: engine com pool configurável e leitura paralela.
+#
+# O engine é criado uma única vez por processo (sem recriação periódica do
+# pool) e valida conexões com pre-ping. `fetch_parallel` executa as consultas
+# independentes de uma página num pool de threads limitado, de modo que o
+# tempo de carga se aproxima da consulta mais lenta, e não da soma de todas.
+# Tarefas de `fetch_parallel` que fazem o próprio fan-out (ex.: o snapshot da
+# RTD) usam um segundo pool: esperar no mesmo pool que as executa trava
+# quando todas as threads estão ocupadas esperando.
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import streamlit as st
+from sqlalchemy import create_engine
+
+from instrumentation import frame_stats, instrument_engine, metrics, query_label
+from l2_cache import get_l2_cache
+
+# Valores padrão do pool; podem ser sobrescritos em st.secrets["database"]
+POOL_DEFAULTS = {
+    "pool_size": 10,
+    "max_overflow": 10,
+    "pool_timeout": 30,
+    "pool_recycle": 1800,
+}
+MAX_WORKERS = 8
+
+# Pool por nível de aninhamento (0: chamadas das páginas; 1: fan-out dentro de uma tarefa)
+_executores = {}
+_executor_lock = threading.Lock()
+_nivel = threading.local()
+
+
+@st.cache_resource
+def get_db_engine():
+    """Conecta-se ao banco de dados usando o st.secrets."""
+    try:
+        config = st.secrets["database"]
+        user = config["user"]
+        password = config["password"]
+        host = config["host"]
+        dbname = config["dbname"]
+        conn_str = f"postgresql+psycopg2://{user}:{password}@{host}/{dbname}?sslmode=require&connect_timeout=10"
+        pool = {chave: int(config.get(chave, padrao)) for chave, padrao in POOL_DEFAULTS.items()}
+        engine = create_engine(
+            conn_str,
+            pool_pre_ping=True,
+            # values_plus_batch: executemany de UPDATE/DELETE também vai em lote (psycopg2 execute_batch)
+            executemany_mode="values_plus_batch",
+            **pool,
+        )
+        instrument_engine(engine)
+        with engine.connect(): pass
+        return engine
+    except Exception as e:
+        st.error(f"Erro Crítico de Conexão: {e}")
+        st.stop()
+
+
+def read_sql(query, engine, cache_ttl=None, versao=None, **kwargs):
+    """Ponto único de leitura do banco (equivalente a pd.read_sql), com medição de tempo, linhas e bytes.
+
+    Com `cache_ttl` (segundos) e o cache L2 configurado, o resultado é
+    compartilhado entre instâncias pela chave consulta + parâmetros + `versao`
+    (ex.: o fingerprint da tabela, que muda quando o ETL grava).
+    """
+    nome = query_label(query)
+    if kwargs.get("chunksize"):
+        return _read_sql_chunks(nome, query, engine, kwargs)
+    l2 = get_l2_cache() if cache_ttl else None
+    if l2 is not None:
+        banco = engine.url.render_as_string(hide_password=True) if hasattr(engine, "url") else ""
+        chave = l2.chave("read_sql", banco, str(query), kwargs, versao)
+        return l2.get_or_compute(chave, cache_ttl, lambda: _read_sql(nome, query, engine, kwargs), nome="l2.read_sql")
+    return _read_sql(nome, query, engine, kwargs)
+
+
+def _read_sql(nome, query, engine, kwargs):
+    inicio = time.perf_counter()
+    df = pd.read_sql(query, engine, **kwargs)
+    rows, nbytes = frame_stats(df)
+    metrics.observe("read_sql", nome, time.perf_counter() - inicio, rows=rows, nbytes=nbytes)
+    return df
+
+
+def _read_sql_chunks(nome, query, engine, kwargs):
+    # O tempo registrado inclui o consumo dos blocos por quem itera
+    inicio = time.perf_counter()
+    rows = nbytes = 0
+    try:
+        for chunk in pd.read_sql(query, engine, **kwargs):
+            r, b = frame_stats(chunk)
+            rows, nbytes = rows + r, nbytes + b
+            yield chunk
+    finally:
+        metrics.observe("read_sql", nome, time.perf_counter() - inicio, rows=rows, nbytes=nbytes)
+
+
+def _get_executor(nivel):
+    with _executor_lock:
+        if nivel not in _executores:
+            prefixo = "db-fetch" if nivel == 0 else f"db-fetch-{nivel}"
+            _executores[nivel] = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix=prefixo)
+        return _executores[nivel]
+
+
+def _no_nivel(nivel, fn):
+    _nivel.valor = nivel
+    try:
+        return fn()
+    finally:
+        _nivel.valor = 0
+
+
+def fetch_parallel(engine, consultas):
+    """Executa consultas independentes em paralelo e retorna {nome: resultado}.
+
+    Cada valor de `consultas` pode ser uma query (str/text), uma tupla
+    (query, kwargs de read_sql) ou uma função sem argumentos. A primeira
+    exceção é propagada depois que todas as tarefas terminam. Chamada de
+    dentro de uma tarefa, usa o pool do nível seguinte; a partir do segundo
+    nível, executa em sequência na própria thread.
+    """
+    def tarefa(consulta):
+        if callable(consulta):
+            return consulta
+        if isinstance(consulta, tuple):
+            query, kwargs = consulta
+            return lambda: read_sql(query, engine, **kwargs)
+        return lambda: read_sql(consulta, engine)
+
+    nivel = getattr(_nivel, "valor", 0)
+    if len(consultas) <= 1 or nivel >= 2:
+        return {nome: tarefa(consulta)() for nome, consulta in consultas.items()}
+    executor = _get_executor(nivel)
+    futuros = {nome: executor.submit(_no_nivel, nivel + 1, tarefa(consulta)) for nome, consulta in consultas.items()}
+    resultados, erro = {}, None
+    for nome, futuro in futuros.items():
+        try:
+            resultados[nome] = futuro.result()
+        except Exception as e:
+            erro = erro or e
+    if erro is not None:
+        raise erro
+    return resultados
@@ -0,0 +1,172 @@
+# streamlit_app/demonstracoes_cache.py
+# Cache de demonstrações financeiras já pivotadas para a página Dados Históricos.
+#
+# Cada (empresa, período) é lido de `cvm_dados_financeiros` uma única vez e
+# guardado já pivotado por tipo de demonstração (DRE, BPA, BPP, DFC), com as
+# contas na ordem contábil e os valores em uma matriz NumPy. Trocar a unidade
+# é só uma divisão da matriz; o cache é descartado quando o ETL grava novos
+# dados na tabela. `get_many` busca as empresas ausentes do cache numa única
+# consulta e as pivota de uma vez (Comparador de Empresas).
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from sqlalchemy import text
+
+from db import read_sql
+from instrumentation import record_cache
+from shared_cache import get_table_watcher
+
+TIPOS_DEMONSTRACAO = ("DRE", "BPA", "BPP", "DFC")
+
+
+def ordem_contabil(cd_conta):
+    """Chave de ordenação natural de códigos de conta ('3.2' antes de '3.10')."""
+    return tuple(int(p) if p.isdigit() else p for p in str(cd_conta).split("."))
+
+
+@dataclass(frozen=True)
+class Demonstracao:
+    """Demonstração pivotada: linhas = contas (ordem contábil), colunas = datas."""
+    cd_conta: np.ndarray
+    ds_conta: np.ndarray
+    datas: pd.DatetimeIndex
+    valores: np.ndarray
+
+    @property
+    def empty(self):
+        return self.valores.size == 0
+
+    def to_frame(self, divisor=1):
+        """DataFrame para exibição, com os valores divididos por `divisor`."""
+        return pd.DataFrame(
+            self.valores / divisor,
+            index=pd.Index(self.ds_conta, name="ds_conta"),
+            columns=pd.Index(self.datas, name="dt_fim_exerc"),
+        )
+
+    def serie(self, cd_conta):
+        """Valores de uma conta ao longo das datas (Series vazia se a conta não existir)."""
+        posicao = np.flatnonzero(self.cd_conta == cd_conta)
+        if posicao.size == 0:
+            return pd.Series(dtype=float, index=pd.DatetimeIndex([], name="dt_fim_exerc"))
+        return pd.Series(self.valores[posicao[0]], index=self.datas, name=cd_conta)
+
+
+def _vazia():
+    return Demonstracao(np.array([], dtype=object), np.array([], dtype=object),
+                        pd.DatetimeIndex([], name="dt_fim_exerc"), np.empty((0, 0)))
+
+
+def pivotar(df):
+    """Pivota os dados de uma empresa/período em {tipo: Demonstracao}."""
+    resultado = {tipo: _vazia() for tipo in TIPOS_DEMONSTRACAO}
+    resultado.update(pivotar_varias(df.assign(denom_cia="")).get("", {}))
+    return resultado
+
+
+def pivotar_varias(df):
+    """Pivota os dados de várias empresas (um período) em {empresa: {tipo: Demonstracao}} com um único pivot."""
+    if df.empty:
+        return {}
+    df = df.assign(dt_fim_exerc=pd.to_datetime(df["dt_fim_exerc"]))
+    chaves = ["denom_cia", "tipo_demonstracao", "cd_conta"]
+    pivot = df.pivot_table(index=chaves, columns="dt_fim_exerc", values="vl_conta")
+    # Uma linha por conta; a descrição exibida é a do exercício mais recente
+    descricoes = df.sort_values("dt_fim_exerc").groupby(chaves)["ds_conta"].last().reindex(pivot.index).to_numpy(dtype=object)
+    valores = pivot.to_numpy(dtype=float)
+    datas = pd.DatetimeIndex(pivot.columns, name="dt_fim_exerc")
+    empresas = pivot.index.get_level_values(0).to_numpy(dtype=object)
+    tipos = pivot.index.get_level_values(1).to_numpy(dtype=object)
+    contas = pivot.index.get_level_values(2).to_numpy(dtype=object)
+
+    # O índice do pivot vem ordenado: cada (empresa, tipo) é uma faixa contígua de linhas
+    mudanca = np.flatnonzero((empresas[1:] != empresas[:-1]) | (tipos[1:] != tipos[:-1])) + 1
+    inicios = np.concatenate([[0], mudanca])
+    fins = np.concatenate([mudanca, [len(empresas)]])
+    resultado = {}
+    for inicio, fim in zip(inicios, fins):
+        bloco = valores[inicio:fim]
+        colunas = ~np.isnan(bloco).all(axis=0)
+        ordem = sorted(range(inicio, fim), key=lambda i: ordem_contabil(contas[i]))
+        resultado.setdefault(empresas[inicio], {})[tipos[inicio]] = Demonstracao(
+            cd_conta=contas[ordem],
+            ds_conta=descricoes[ordem],
+            datas=datas[colunas],
+            valores=np.ascontiguousarray(valores[ordem][:, colunas]),
+        )
+    return resultado
+
+
+class DemonstracoesCache:
+    """LRU de demonstrações pivotadas por (empresa, período), invalidado quando o ETL grava."""
+
+    def __init__(self, watcher, max_entries=128, max_age=3600):
+        self.watcher = watcher
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._fingerprint = None
+        self._checked_at = time.monotonic()
+
+    def get(self, engine, empresa, periodo):
+        """Retorna {tipo: Demonstracao} da empresa/período."""
+        return self.get_many(engine, [empresa], periodo)[empresa]
+
+    def get_many(self, engine, empresas, periodo):
+        """Retorna {empresa: {tipo: Demonstracao}}; as ausentes do cache vêm numa única consulta."""
+        self._check_invalidation(engine)
+        empresas = list(dict.fromkeys(empresas))
+        resultado = {}
+        with self._lock:
+            for empresa in empresas:
+                chave = (empresa, periodo)
+                record_cache("demonstracoes", hit=chave in self._entries)
+                if chave in self._entries:
+                    self._entries.move_to_end(chave)
+                    resultado[empresa] = self._entries[chave]
+        faltando = [e for e in empresas if e not in resultado]
+        if faltando:
+            query = text("SELECT * FROM cvm_dados_financeiros WHERE periodo = :periodo AND denom_cia = ANY(:empresas)")
+            pivotadas = pivotar_varias(read_sql(
+                query, engine, params={"empresas": faltando, "periodo": periodo},
+                cache_ttl=self.max_age, versao=self._fingerprint,
+            ))
+            with self._lock:
+                for empresa in faltando:
+                    demonstracoes = {tipo: _vazia() for tipo in TIPOS_DEMONSTRACAO}
+                    demonstracoes.update(pivotadas.get(empresa, {}))
+                    self._entries[(empresa, periodo)] = resultado[empresa] = demonstracoes
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return resultado
+
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _check_invalidation(self, engine):
+        fingerprint = self.watcher.fingerprints(engine, ["cvm_dados_financeiros"])["cvm_dados_financeiros"]
+        with self._lock:
+            vencido = fingerprint is None and time.monotonic() - self._checked_at >= self.max_age
+            if fingerprint != self._fingerprint or vencido:
+                self._entries.clear()
+                self._fingerprint = fingerprint
+                self._checked_at = time.monotonic()
+
+
+@st.cache_resource
+def get_demonstracoes_cache():
+    """Cache de demonstrações compartilhado pelo processo."""
+    return DemonstracoesCache(get_table_watcher())
+
+
+def get_demonstracoes(engine, empresa, periodo):
+    """Demonstrações pivotadas de uma empresa e período ('ANUAL' ou 'TRIMESTRAL')."""
+    return get_demonstracoes_cache().get(engine, empresa, periodo)
@@ -0,0 +1,288 @@
+# streamlit_app/document_cache.py
+# Cache em disco, limitado por tamanho, dos PDFs de `cvm_documentos_ipe`.
+#
+# - Cada documento é um arquivo no diretório do cache; um índice SQLite guarda
+#   tamanho, ETag/Last-Modified e o último acesso. Passando de `max_bytes`,
+#   os menos acessados recentemente são apagados (LRU).
+# - Depois de `revalidate_after` segundos a cópia local é revalidada com GET
+#   condicional (If-None-Match / If-Modified-Since); 304 não baixa nada.
+# - `open` devolve o arquivo mapeado em memória (mmap), sem trazer o PDF
+#   inteiro para o heap do processo. `read` (bytes, para o download_button)
+#   lê do arquivo e recusa documentos acima de DOCUMENT_READ_MAX_MB.
+# - Os locks por URL só existem enquanto há um download daquela URL.
+# - `DocumentPrefetcher` baixa em segundo plano os documentos recentes das
+#   empresas da carteira, para que já estejam no disco quando forem abertos.
+
+import hashlib
+import logging
+import mmap
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+import streamlit as st
+from sqlalchemy import text
+
+from db import read_sql
+from instrumentation import record_cache
+
+logger = logging.getLogger("dashaws.document_cache")
+
+DEFAULT_DIR = os.environ.get("DOCUMENT_CACHE_DIR", os.path.join(tempfile.gettempdir(), "dashaws_documentos"))
+DEFAULT_MAX_BYTES = int(float(os.environ.get("DOCUMENT_CACHE_MAX_MB", 512)) * 1024 * 1024)
+# Teto de `read`: o download_button guarda o conteúdo inteiro na memória do servidor
+DEFAULT_READ_LIMIT = int(float(os.environ.get("DOCUMENT_READ_MAX_MB", 50)) * 1024 * 1024)
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+
+
+class DocumentoGrande(ValueError):
+    """Documento acima do limite de `DocumentCache.read`."""
+
+
+class DocumentCache:
+    """PDFs em disco com LRU por tamanho total e revalidação condicional."""
+
+    def __init__(self, root=DEFAULT_DIR, max_bytes=DEFAULT_MAX_BYTES, revalidate_after=6 * 3600, timeout=30):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.revalidate_after = revalidate_after
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._url_locks = {}
+        self._session = None
+        os.makedirs(root, exist_ok=True)
+        self._db = sqlite3.connect(os.path.join(root, "documentos.sqlite"), check_same_thread=False)
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS documentos (
+                url TEXT PRIMARY KEY, arquivo TEXT, tamanho INTEGER, etag TEXT,
+                last_modified TEXT, fetched_at REAL, accessed_at REAL
+            );
+            CREATE INDEX IF NOT EXISTS ix_documentos_accessed_at ON documentos (accessed_at);
+        """)
+        self._total = self._db.execute("SELECT COALESCE(SUM(tamanho), 0) FROM documentos").fetchone()[0]
+
+    def __contains__(self, url):
+        return self._row(url) is not None
+
+    @property
+    def total_bytes(self):
+        return self._total
+
+    def fetch(self, url):
+        """Caminho local do documento, baixando ou revalidando quando necessário."""
+        with self._url_lock(url):
+            row = self._row(url)
+            agora = time.time()
+            valido = row is not None and os.path.exists(self._path(row[0]))
+            fresco = valido and agora - row[4] < self.revalidate_after
+            record_cache("documentos", hit=fresco)
+            if fresco:
+                self._touch(url, agora)
+                return self._path(row[0])
+            headers = {}
+            if valido and row[2]:
+                headers["If-None-Match"] = row[2]
+            if valido and row[3]:
+                headers["If-Modified-Since"] = row[3]
+            try:
+                resposta = self._get(url, headers)
+            except Exception as e:
+                if valido:
+                    # Sem rede, a cópia local (possivelmente desatualizada) ainda serve
+                    logger.warning("revalidação de %s falhou (%s); servindo a cópia local", url, e)
+                    self._touch(url, agora)
+                    return self._path(row[0])
+                raise
+            with resposta:
+                if valido and resposta.status_code == 304:
+                    with self._lock, self._db:
+                        self._db.execute(
+                            "UPDATE documentos SET fetched_at = ?, accessed_at = ? WHERE url = ?", (agora, agora, url)
+                        )
+                    return self._path(row[0])
+                resposta.raise_for_status()
+                return self._store(url, resposta, agora)
+
+    def open(self, url):
+        """Documento mapeado em memória (somente leitura); b"" se vazio. Feche o mmap após o uso."""
+        caminho = self.fetch(url)
+        with open(caminho, "rb") as arquivo:
+            if os.fstat(arquivo.fileno()).st_size == 0:
+                return b""
+            return mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def read(self, url, limite=DEFAULT_READ_LIMIT):
+        """Conteúdo do documento em bytes (para componentes que exigem bytes, como o download_button).
+
+        Levanta DocumentoGrande se o documento passar de `limite` bytes; nesse caso use `open` ou o link original.
+        """
+        caminho = self.fetch(url)
+        with open(caminho, "rb") as arquivo:
+            tamanho = os.fstat(arquivo.fileno()).st_size
+            if tamanho > limite:
+                raise DocumentoGrande(f"documento de {tamanho / 2**20:.1f} MB, acima do limite de {limite / 2**20:.0f} MB")
+            return arquivo.read()
+
+    def clear(self):
+        with self._lock, self._db:
+            for (arquivo,) in self._db.execute("SELECT arquivo FROM documentos").fetchall():
+                self._remove_file(arquivo)
+            self._db.execute("DELETE FROM documentos")
+            self._total = 0
+
+    # --- internos ---
+    @contextmanager
+    def _url_lock(self, url):
+        # (lock, usuários) por URL; a entrada sai quando o último usuário termina
+        with self._lock:
+            lock, usuarios = self._url_locks.get(url, (None, 0))
+            lock = lock or threading.Lock()
+            self._url_locks[url] = (lock, usuarios + 1)
+        try:
+            with lock:
+                yield
+        finally:
+            with self._lock:
+                usuarios = self._url_locks[url][1] - 1
+                if usuarios:
+                    self._url_locks[url] = (lock, usuarios)
+                else:
+                    del self._url_locks[url]
+
+    def _row(self, url):
+        with self._lock:
+            return self._db.execute(
+                "SELECT arquivo, tamanho, etag, last_modified, fetched_at FROM documentos WHERE url = ?", (url,)
+            ).fetchone()
+
+    def _touch(self, url, agora):
+        with self._lock, self._db:
+            self._db.execute("UPDATE documentos SET accessed_at = ? WHERE url = ?", (agora, url))
+
+    def _path(self, arquivo):
+        return os.path.join(self.root, arquivo)
+
+    def _get(self, url, headers):
+        if self._session is None:
+            import requests  # só carregado no primeiro download
+            self._session = requests.Session()
+            self._session.headers["User-Agent"] = USER_AGENT
+        return self._session.get(url, headers=headers, timeout=self.timeout, stream=True)
+
+    def _store(self, url, resposta, agora):
+        arquivo = hashlib.sha256(url.encode()).hexdigest() + ".pdf"
+        # Grava num temporário e troca atomicamente: leitores nunca veem um arquivo pela metade
+        fd, temporario = tempfile.mkstemp(dir=self.root, suffix=".part")
+        tamanho = 0
+        try:
+            with os.fdopen(fd, "wb") as destino:
+                for bloco in resposta.iter_content(chunk_size=256 * 1024):
+                    destino.write(bloco)
+                    tamanho += len(bloco)
+            os.replace(temporario, self._path(arquivo))
+        except BaseException:
+            self._remove_file(os.path.basename(temporario))
+            raise
+        with self._lock, self._db:
+            anterior = self._db.execute("SELECT tamanho FROM documentos WHERE url = ?", (url,)).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO documentos VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, arquivo, tamanho, resposta.headers.get("ETag"), resposta.headers.get("Last-Modified"), agora, agora),
+            )
+            self._total += tamanho - (anterior[0] if anterior else 0)
+            self._evict(manter=url)
+        return self._path(arquivo)
+
+    def _evict(self, manter):
+        # Chamado com o lock adquirido
+        while self._total > self.max_bytes:
+            row = self._db.execute(
+                "SELECT url, arquivo, tamanho FROM documentos WHERE url != ? ORDER BY accessed_at LIMIT 1", (manter,)
+            ).fetchone()
+            if row is None:
+                break
+            self._db.execute("DELETE FROM documentos WHERE url = ?", (row[0],))
+            self._remove_file(row[1])
+            self._total -= row[2]
+
+    def _remove_file(self, arquivo):
+        try:
+            os.remove(self._path(arquivo))
+        except FileNotFoundError:
+            pass
+
+
+class DocumentPrefetcher:
+    """Baixa em paralelo, em segundo plano, os documentos recentes das empresas da carteira."""
+
+    def __init__(self, cache, max_workers=4, dias=7, min_interval=900):
+        self.cache = cache
+        self.dias = dias
+        self.min_interval = min_interval
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="doc-prefetch")
+        self._lock = threading.Lock()
+        self._em_andamento = set()
+        self._agendado_em = {}
+
+    def schedule(self, engine, empresas):
+        """Agenda (no máximo uma vez a cada `min_interval`) a busca das empresas; não bloqueia a página."""
+        chave = tuple(sorted(empresas))
+        agora = time.monotonic()
+        with self._lock:
+            if not chave or agora - self._agendado_em.get(chave, float("-inf")) < self.min_interval:
+                return False
+            self._agendado_em[chave] = agora
+        self._executor.submit(self._run, engine, list(chave))
+        return True
+
+    def pending_urls(self, engine, empresas):
+        """Links dos documentos recentes das empresas que ainda não estão no cache."""
+        query = text("""
+            SELECT link_download FROM cvm_documentos_ipe
+            WHERE nome_companhia = ANY(:nomes) AND data_entrega >= :inicio AND link_download IS NOT NULL
+            ORDER BY data_entrega DESC
+        """)
+        df = read_sql(query, engine, params={"nomes": empresas, "inicio": date.today() - timedelta(days=self.dias)})
+        return [url for url in dict.fromkeys(df["link_download"]) if url not in self.cache]
+
+    def submit(self, urls):
+        """Baixa `urls` em paralelo, ignorando as que já estão sendo baixadas. Retorna os futuros."""
+        futuros = []
+        with self._lock:
+            novas = [url for url in urls if url not in self._em_andamento]
+            self._em_andamento.update(novas)
+        for url in novas:
+            futuros.append(self._executor.submit(self._baixar, url))
+        return futuros
+
+    def _run(self, engine, empresas):
+        try:
+            self.submit(self.pending_urls(engine, empresas))
+        except Exception:
+            logger.warning("pré-busca de documentos falhou", exc_info=True)
+
+    def _baixar(self, url):
+        try:
+            self.cache.fetch(url)
+        except Exception as e:
+            logger.warning("pré-busca de %s falhou: %s", url, e)
+        finally:
+            with self._lock:
+                self._em_andamento.discard(url)
+
+
+@st.cache_resource
+def get_document_cache():
+    """Cache de documentos compartilhado pelo processo."""
+    return DocumentCache()
+
+
+@st.cache_resource
+def get_document_prefetcher():
+    """Pré-busca de documentos compartilhada pelo processo."""
+    return DocumentPrefetcher(get_document_cache())
@@ -0,0 +1,123 @@
+# streamlit_app/documentos_cvm.py
+# Acesso paginado à tabela `cvm_documentos_ipe`.
+#
+# A página de Documentos CVM busca apenas uma página por vez, usando
+# paginação por chave (keyset) sobre (data_entrega, id): o custo de cada
+# página não depende de quantas páginas vieram antes. A exportação percorre
+# o resultado em blocos por um cursor do servidor. Os índices de INDEXES são
+# criados fora do app, por `python criar_indices.py`.
+
+import io
+from dataclasses import dataclass
+
+import streamlit as st
+from sqlalchemy import text
+
+from db import read_sql
+from shared_cache import get_table_watcher
+
+COLUNAS = "id, data_entrega, nome_companhia, categoria, assunto, link_download"
+
+# Índices que cobrem as combinações de filtro da página (empresa, categoria, nenhum)
+INDEXES = {
+    "ix_cvm_documentos_ipe_entrega_id":
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_cvm_documentos_ipe_entrega_id "
+        "ON cvm_documentos_ipe (data_entrega, id)",
+    "ix_cvm_documentos_ipe_cia_entrega_id":
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_cvm_documentos_ipe_cia_entrega_id "
+        "ON cvm_documentos_ipe (nome_companhia, data_entrega, id)",
+    "ix_cvm_documentos_ipe_cat_entrega_id":
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_cvm_documentos_ipe_cat_entrega_id "
+        "ON cvm_documentos_ipe (categoria, data_entrega, id)",
+}
+
+
+@dataclass(frozen=True)
+class FiltroDocumentos:
+    """Filtros da página. `empresa`/`categoria` None significam 'Todas'."""
+    start_date: object
+    end_date: object
+    empresa: str = None
+    categoria: str = None
+
+    def where(self):
+        """Retorna (cláusula WHERE, parâmetros) para o filtro."""
+        params = {"start_date": self.start_date, "end_date": self.end_date}
+        conditions = ["data_entrega BETWEEN :start_date AND :end_date"]
+        if self.empresa:
+            conditions.append("nome_companhia = :empresa")
+            params["empresa"] = self.empresa
+        if self.categoria:
+            conditions.append("categoria = :categoria")
+            params["categoria"] = self.categoria
+        return " WHERE " + " AND ".join(conditions), params
+
+
+def count_documentos(engine, filtro):
+    """Total de documentos do filtro (index-only scan com os índices de INDEXES)."""
+    where, params = filtro.where()
+    with engine.connect() as conn:
+        return conn.execute(text("SELECT COUNT(*) FROM cvm_documentos_ipe" + where), params).scalar_one()
+
+
+def fetch_page(engine, filtro, cursor=None, limit=100):
+    """Busca uma página ordenada por (data_entrega, id) decrescente.
+
+    `cursor` é o par (data_entrega, id) da última linha da página anterior;
+    None busca a primeira página.
+    """
+    where, params = filtro.where()
+    if cursor is not None:
+        where += " AND (data_entrega, id) < (:cursor_data, :cursor_id)"
+        params["cursor_data"], params["cursor_id"] = cursor
+    params["limit"] = limit
+    query = f"SELECT {COLUNAS} FROM cvm_documentos_ipe{where} ORDER BY data_entrega DESC, id DESC LIMIT :limit"
+    # Com a versão da tabela na chave, páginas iguais pedidas por várias instâncias saem do L2
+    # sem ficar atrás da contagem (lida sempre do banco); sem a versão, a página também vai ao banco
+    versao = get_table_watcher().fingerprints(engine, ["cvm_documentos_ipe"])["cvm_documentos_ipe"]
+    cache_ttl = 300 if versao is not None else None
+    return read_sql(text(query), engine, params=params, cache_ttl=cache_ttl, versao=versao)
+
+
+def next_cursor(df_page):
+    """Cursor para a página seguinte à `df_page` (None se for a última)."""
+    if df_page.empty:
+        return None
+    ultima = df_page.iloc[-1]
+    return ultima['data_entrega'], int(ultima['id'])
+
+
+def iter_documentos(engine, filtro, chunksize=5000):
+    """Percorre todo o resultado do filtro em blocos, sem materializá-lo inteiro."""
+    where, params = filtro.where()
+    query = text(f"SELECT {COLUNAS} FROM cvm_documentos_ipe{where} ORDER BY data_entrega DESC, id DESC")
+    with engine.connect().execution_options(stream_results=True) as conn:
+        yield from read_sql(query, conn, params=params, chunksize=chunksize)
+
+
+def export_csv(engine, filtro, chunksize=5000):
+    """CSV do filtro em bytes (o download_button precisa do conteúdo inteiro).
+
+    O banco é lido em blocos, então o pico de memória é o CSV mais um bloco,
+    nunca o DataFrame do resultado inteiro.
+    """
+    with io.BytesIO() as arquivo:
+        for i, chunk in enumerate(iter_documentos(engine, filtro, chunksize)):
+            arquivo.write(chunk.drop(columns='id').to_csv(index=False, header=(i == 0)).encode('utf-8'))
+        return arquivo.getvalue()
+
+
+@st.cache_data(ttl=3600)
+def get_categorias(_engine):
+    """Lista de categorias para o filtro, cacheada por uma hora."""
+    df = read_sql("SELECT DISTINCT categoria FROM cvm_documentos_ipe ORDER BY categoria", _engine, cache_ttl=3600)
+    return df['categoria'].dropna().tolist()
+
+
+@st.cache_data(ttl=3600)
+def missing_indexes(_engine):
+    """Nomes dos índices de INDEXES que ainda não existem no banco."""
+    df = read_sql(
+        text("SELECT indexname FROM pg_indexes WHERE tablename = 'cvm_documentos_ipe'"), _engine
+    )
+    return sorted(set(INDEXES) - set(df['indexname']))
@@ -0,0 +1,87 @@
+# streamlit_app/empresas_index.py
+# Índice ticker <-> empresa construído a partir de `dim_empresas`.
+#
+# O índice é montado uma vez por processo e só é reconstruído quando a
+# tabela muda, substituindo os laços com `iterrows()` que cada página
+# refazia a cada rerun.
+
+import threading
+import time
+
+import streamlit as st
+
+from db import read_sql
+from instrumentation import record_cache
+from shared_cache import get_table_watcher
+
+
+class EmpresasIndex:
+    """Consultas O(1) de ticker -> empresa e empresa -> tickers, e a lista de exibição dos selectboxes."""
+
+    def __init__(self, df_empresas):
+        df = df_empresas[['tickers', 'denom_cia']].explode('tickers').dropna()
+        tickers = df['tickers'].astype(str).str.strip().str.upper()
+        df = df.assign(ticker=tickers)[tickers != ''].drop_duplicates(['ticker', 'denom_cia'])
+        df = df.assign(display=df['ticker'] + " - " + df['denom_cia']).sort_values('display')
+
+        self.ticker_to_empresa = dict(zip(df['ticker'], df['denom_cia']))
+        self.empresa_to_tickers = df.groupby('denom_cia', sort=False)['ticker'].agg(list).to_dict()
+        self.display_list = df['display'].tolist()
+        self.display_to_empresa = dict(zip(df['display'], df['denom_cia']))
+
+    def __len__(self):
+        return len(self.display_list)
+
+    def empresa(self, ticker):
+        """Nome da empresa de um ticker (None se desconhecido)."""
+        return self.ticker_to_empresa.get(str(ticker).strip().upper())
+
+    def tickers(self, empresa):
+        """Tickers de uma empresa, em ordem alfabética."""
+        return self.empresa_to_tickers.get(empresa, [])
+
+    def empresas_dos_tickers(self, tickers):
+        """Empresas (sem repetição, na ordem de entrada) de uma lista de tickers."""
+        nomes = (self.empresa(t) for t in tickers)
+        return list(dict.fromkeys(n for n in nomes if n))
+
+
+class EmpresasIndexCache:
+    """Mantém o índice do processo, reconstruindo-o só quando `dim_empresas` muda."""
+
+    def __init__(self, watcher, max_age=600):
+        self.watcher = watcher
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._index = None
+        self._fingerprint = None
+        self._built_at = 0.0
+
+    def get(self, engine):
+        with self._lock:
+            fingerprint = self.watcher.fingerprints(engine, ['dim_empresas'])['dim_empresas']
+            vencido = time.monotonic() - self._built_at >= self.max_age
+            reconstruir = self._index is None or fingerprint != self._fingerprint or (fingerprint is None and vencido)
+            record_cache("empresas_index", hit=not reconstruir)
+            if reconstruir:
+                # Compartilhada entre instâncias (L2) enquanto a tabela não muda
+                df = read_sql("SELECT tickers, denom_cia FROM dim_empresas", engine, cache_ttl=self.max_age, versao=fingerprint)
+                self._index = EmpresasIndex(df)
+                self._fingerprint = fingerprint
+                self._built_at = time.monotonic()
+            return self._index
+
+    def invalidate(self):
+        with self._lock:
+            self._index = None
+
+
+@st.cache_resource
+def get_empresas_index_cache():
+    """Cache do índice compartilhado pelo processo."""
+    return EmpresasIndexCache(get_table_watcher())
+
+
+def get_empresas_index(engine):
+    """Índice de empresas compartilhado por todas as sessões."""
+    return get_empresas_index_cache().get(engine)
@@ -0,0 +1,278 @@
+# streamlit_app/indicadores.py
+# Motor de indicadores fundamentalistas para todas as empresas de uma vez.
+#
+# As contas necessárias de `cvm_dados_financeiros` são carregadas para o
+# mercado inteiro e organizadas em uma matriz (empresa × data × conta); os
+# indicadores saem de operações vetorizadas sobre essa matriz, resultando em
+# (empresa × data × indicador). Quando o ETL grava novos dados, apenas as
+# empresas cujo resumo (contagem, última data, soma dos valores) mudou são
+# relidas; a soma pega reapresentações, que não mudam contagem nem data.
+
+import logging
+import os
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from sqlalchemy import text
+
+from db import read_sql
+from instrumentation import record_cache
+from shared_cache import get_table_watcher
+
+logger = logging.getLogger(__name__)
+
+INDICADORES_DIR = os.environ.get("INDICADORES_DIR", os.path.join(tempfile.gettempdir(), "dashaws_indicadores"))
+
+# Contas usadas pelos indicadores: nome -> (tipo_demonstracao, cd_conta).
+# Lucro líquido é o 3.11 da DRE (o 3.99.01 é o lucro por ação); a aba de
+# indicadores de Dados Históricos usa os mesmos códigos.
+CONTAS = {
+    "receita": ("DRE", "3.01"),
+    "lucro_bruto": ("DRE", "3.03"),
+    "ebit": ("DRE", "3.05"),
+    "lucro_liquido": ("DRE", "3.11"),
+    "ativo_total": ("BPA", "1"),
+    "caixa": ("BPA", "1.01.01"),
+    "patrimonio_liquido": ("BPP", "2.03"),
+    "emprestimos_cp": ("BPP", "2.01.04"),
+    "emprestimos_lp": ("BPP", "2.02.01"),
+}
+NOMES_CONTAS = tuple(CONTAS)
+
+INDICADORES = {
+    "roe": "ROE (%)",
+    "margem_bruta": "Margem Bruta (%)",
+    "margem_ebit": "Margem EBIT (%)",
+    "margem_liquida": "Margem Líquida (%)",
+    "divida_bruta_pl": "Dívida Bruta / PL",
+    "divida_liquida_pl": "Dívida Líquida / PL",
+    "ativo_pl": "Ativo / PL",
+    "cresc_receita": "Cresc. Receita A/A (%)",
+    "cresc_lucro": "Cresc. Lucro A/A (%)",
+}
+NOMES_INDICADORES = tuple(INDICADORES)
+
+# Indicadores de alavancagem, em que menor é melhor: o screening os ordena em ordem crescente
+MENOR_MELHOR = frozenset({"divida_bruta_pl", "divida_liquida_pl", "ativo_pl"})
+
+
+def _div(num, den):
+    out = np.full(np.broadcast(num, den).shape, np.nan)
+    np.divide(num, den, out=out, where=(den != 0) & ~np.isnan(den))
+    return out
+
+
+def _indices_ano_anterior(datas):
+    """Para cada data, o índice da data exatamente um ano antes (-1 se não houver)."""
+    alvo = (datas - pd.DateOffset(years=1)).to_numpy()
+    pos = np.searchsorted(datas.to_numpy(), alvo)
+    pos_ok = np.clip(pos, 0, len(datas) - 1)
+    return np.where((pos < len(datas)) & (datas.to_numpy()[pos_ok] == alvo), pos, -1)
+
+
+def calcular_indicadores(contas, datas):
+    """Calcula a matriz (empresa × data × indicador) a partir de (empresa × data × conta)."""
+    c = {nome: contas[..., i] for i, nome in enumerate(NOMES_CONTAS)}
+    divida_bruta = np.nan_to_num(c["emprestimos_cp"]) + np.nan_to_num(c["emprestimos_lp"])
+    divida_bruta = np.where(np.isnan(c["emprestimos_cp"]) & np.isnan(c["emprestimos_lp"]), np.nan, divida_bruta)
+
+    anterior = _indices_ano_anterior(datas)
+    tem_anterior = anterior >= 0
+
+    def crescimento(serie):
+        previa = np.where(tem_anterior, serie[:, np.clip(anterior, 0, None)], np.nan)
+        return _div(serie - previa, np.abs(previa)) * 100
+
+    pl = c["patrimonio_liquido"]
+    receita = c["receita"]
+    return np.stack([
+        _div(c["lucro_liquido"], pl) * 100,
+        _div(c["lucro_bruto"], receita) * 100,
+        _div(c["ebit"], receita) * 100,
+        _div(c["lucro_liquido"], receita) * 100,
+        _div(divida_bruta, pl),
+        _div(divida_bruta - np.nan_to_num(c["caixa"]), pl),
+        _div(c["ativo_total"], pl),
+        crescimento(receita),
+        crescimento(c["lucro_liquido"]),
+    ], axis=-1)
+
+
+@dataclass(frozen=True)
+class MatrizIndicadores:
+    """Indicadores pré-calculados de um período ('ANUAL' ou 'TRIMESTRAL')."""
+    empresas: np.ndarray
+    datas: pd.DatetimeIndex
+    valores: np.ndarray  # (empresa, data, indicador)
+
+    def indicador(self, nome):
+        """DataFrame empresa × data de um indicador."""
+        return pd.DataFrame(self.valores[..., NOMES_INDICADORES.index(nome)], index=self.empresas, columns=self.datas)
+
+    def ultimos(self):
+        """Valores mais recentes por empresa: a última data com algum indicador disponível."""
+        if self.valores.size == 0:
+            return pd.DataFrame(columns=["data", *NOMES_INDICADORES])
+        disponivel = ~np.isnan(self.valores).all(axis=-1)
+        tem_dado = disponivel.any(axis=1)
+        ultima = np.where(tem_dado, disponivel.shape[1] - 1 - np.argmax(disponivel[:, ::-1], axis=1), 0)
+        valores = self.valores[np.arange(len(self.empresas)), ultima]
+        df = pd.DataFrame(valores, index=pd.Index(self.empresas, name="denom_cia"), columns=list(NOMES_INDICADORES))
+        df.insert(0, "data", self.datas[ultima] if len(self.datas) else pd.NaT)
+        return df[tem_dado]
+
+    def filtrar(self, limites):
+        """Empresas cujo último valor está dentro dos `limites` {indicador: (mín, máx)}.
+
+        Mínimo ou máximo None significa sem limite daquele lado.
+        """
+        df = self.ultimos()
+        mascara = np.ones(len(df), dtype=bool)
+        for nome, (minimo, maximo) in limites.items():
+            coluna = df[nome].to_numpy()
+            if minimo is not None:
+                mascara &= coluna >= minimo
+            if maximo is not None:
+                mascara &= coluna <= maximo
+        return df[mascara]
+
+
+def montar_matriz(df_raw):
+    """Converte o formato longo (denom_cia, dt_fim_exerc, conta, vl_conta) em MatrizIndicadores."""
+    if df_raw.empty:
+        return MatrizIndicadores(np.array([], dtype=object), pd.DatetimeIndex([]), np.empty((0, 0, len(NOMES_INDICADORES))))
+    empresas, i_emp = np.unique(df_raw["denom_cia"].to_numpy(dtype=object), return_inverse=True)
+    datas_raw = pd.to_datetime(df_raw["dt_fim_exerc"]).to_numpy()
+    datas, i_data = np.unique(datas_raw, return_inverse=True)
+    i_conta = pd.Categorical(df_raw["conta"], categories=NOMES_CONTAS).codes
+    contas = np.full((len(empresas), len(datas), len(NOMES_CONTAS)), np.nan)
+    contas[i_emp, i_data, i_conta] = df_raw["vl_conta"].to_numpy(dtype=float)
+    datas = pd.DatetimeIndex(datas)
+    return MatrizIndicadores(empresas, datas, calcular_indicadores(contas, datas))
+
+
+def _resumo_por_empresa(resumo):
+    """{empresa: (contagem, última data, soma)}; a soma é arredondada para não
+    acusar mudança por diferença de ordem na soma em ponto flutuante."""
+    soma = resumo["soma"].astype(float).round(2)
+    return dict(zip(resumo["denom_cia"], zip(resumo["n"].astype(int), resumo["ultima"].astype(str), soma)))
+
+
+class IndicadoresStore:
+    """Matrizes de indicadores do mercado, mantidas de forma incremental e persistidas em disco."""
+
+    def __init__(self, watcher, root=INDICADORES_DIR, max_age=3600):
+        self.watcher = watcher
+        self.root = root
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._raw = {}
+        self._resumos = {}
+        self._matrizes = {}
+        self._fingerprint = {}
+        self._checked_at = {}
+        os.makedirs(root, exist_ok=True)
+
+    def get(self, engine, periodo):
+        """MatrizIndicadores atualizada do período."""
+        with self._lock:
+            fingerprint = self.watcher.fingerprints(engine, ["cvm_dados_financeiros"])["cvm_dados_financeiros"]
+            vencido = time.monotonic() - self._checked_at.get(periodo, float("-inf")) >= self.max_age
+            if periodo not in self._matrizes:
+                self._load_disk(periodo)
+            sincronizar = periodo not in self._matrizes or fingerprint != self._fingerprint.get(periodo) or (fingerprint is None and vencido)
+            record_cache("indicadores", hit=not sincronizar)
+            if sincronizar:
+                self._sync(engine, periodo, fingerprint)
+                self._fingerprint[periodo] = fingerprint
+                self._checked_at[periodo] = time.monotonic()
+            return self._matrizes[periodo]
+
+    def _filtro_contas(self):
+        clausulas = " OR ".join(
+            f"(tipo_demonstracao = :t{i} AND cd_conta = :c{i})" for i in range(len(CONTAS))
+        )
+        params = {}
+        for i, (tipo, conta) in enumerate(CONTAS.values()):
+            params[f"t{i}"], params[f"c{i}"] = tipo, conta
+        return f"({clausulas})", params
+
+    def _sync(self, engine, periodo, versao=None):
+        """Relê apenas as empresas cujo resumo mudou desde a última sincronização.
+
+        As leituras passam pelo cache L2 com o fingerprint da tabela como `versao`.
+        """
+        filtro, params = self._filtro_contas()
+        params["periodo"] = periodo
+        resumo = read_sql(text(f"""
+            SELECT denom_cia, COUNT(*) AS n, MAX(dt_fim_exerc) AS ultima, COALESCE(SUM(vl_conta), 0) AS soma
+            FROM cvm_dados_financeiros WHERE periodo = :periodo AND {filtro}
+            GROUP BY denom_cia
+        """), engine, params=params, cache_ttl=self.max_age, versao=versao)
+        novo = _resumo_por_empresa(resumo)
+        antigo = self._resumos.get(periodo, {})
+        alteradas = [e for e, r in novo.items() if antigo.get(e) != r]
+        removidas = set(antigo) - set(novo)
+
+        raw = self._raw.get(periodo, pd.DataFrame(columns=["denom_cia", "dt_fim_exerc", "conta", "vl_conta"]))
+        if alteradas or removidas or periodo not in self._matrizes:
+            if alteradas:
+                params["empresas"] = alteradas
+                df_novo = read_sql(text(f"""
+                    SELECT denom_cia, dt_fim_exerc, tipo_demonstracao, cd_conta, vl_conta
+                    FROM cvm_dados_financeiros
+                    WHERE periodo = :periodo AND denom_cia = ANY(:empresas) AND {filtro}
+                """), engine, params=params, cache_ttl=self.max_age, versao=versao)
+                codigo_para_nome = {v: k for k, v in CONTAS.items()}
+                df_novo["conta"] = [codigo_para_nome[(t, c)] for t, c in zip(df_novo["tipo_demonstracao"], df_novo["cd_conta"])]
+                df_novo["dt_fim_exerc"] = pd.to_datetime(df_novo["dt_fim_exerc"])
+                df_novo = df_novo[["denom_cia", "dt_fim_exerc", "conta", "vl_conta"]]
+            else:
+                df_novo = raw.iloc[:0]
+            mantidas = ~raw["denom_cia"].isin(set(alteradas) | removidas)
+            raw = pd.concat([raw[mantidas], df_novo], ignore_index=True)
+            self._raw[periodo] = raw
+            self._resumos[periodo] = novo
+            self._matrizes[periodo] = montar_matriz(raw)
+            self._save_disk(periodo)
+
+    def _paths(self, periodo):
+        base = os.path.join(self.root, periodo.lower())
+        return base + "_contas.parquet", base + "_resumo.parquet"
+
+    def _save_disk(self, periodo):
+        path_raw, path_resumo = self._paths(periodo)
+        resumo = pd.DataFrame(
+            [(empresa, *r) for empresa, r in self._resumos[periodo].items()], columns=["denom_cia", "n", "ultima", "soma"],
+        )
+        # Contas antes do resumo, cada uma num temporário trocado de uma vez: uma queda no
+        # meio deixa no máximo um resumo antigo, que só faz reler empresas a mais
+        for df, path in ((self._raw[periodo], path_raw), (resumo, path_resumo)):
+            temporario = path + ".tmp"
+            df.to_parquet(temporario)
+            os.replace(temporario, path)
+
+    def _load_disk(self, periodo):
+        path_raw, path_resumo = self._paths(periodo)
+        if not (os.path.exists(path_raw) and os.path.exists(path_resumo)):
+            return
+        try:
+            raw = pd.read_parquet(path_raw)
+            resumo = _resumo_por_empresa(pd.read_parquet(path_resumo))
+            matriz = montar_matriz(raw)
+        except Exception:
+            # Arquivo ilegível: começa do zero, com a carga completa do banco
+            logger.warning("cache de indicadores (%s) ilegível; recarregando do banco", periodo, exc_info=True)
+            return
+        self._raw[periodo], self._resumos[periodo], self._matrizes[periodo] = raw, resumo, matriz
+
+
+@st.cache_resource
+def get_indicadores_store():
+    """Store de indicadores compartilhado pelo processo."""
+    return IndicadoresStore(get_table_watcher())
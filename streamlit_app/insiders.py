@@ -0,0 +1,290 @@
+# streamlit_app/insiders.py
+# Movimentações de insiders (CVM 44) resolvidas para `dim_empresas` e agregadas.
+#
+# Cada linha de `transacoes` é associada, na carga, a uma empresa de
+# `dim_empresas` pelo nome normalizado (sem acentos, pontuação e "S.A.").
+# Sobre essas linhas o store mantém:
+#   - um índice empresa -> fatia das transações (mais recentes primeiro);
+#   - fluxos líquidos diário e mensal por (empresa, categoria do insider).
+# Quando o ETL grava, só as companhias cujo resumo (contagem, última data,
+# soma dos valores) mudou são relidas, e só as agregações dessas empresas são
+# recalculadas; a soma pega correções que não mudam contagem nem data.
+# Tudo é persistido em Parquet, então um processo novo começa aquecido.
+
+import logging
+import os
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from sqlalchemy import text
+
+from db import read_sql
+from instrumentation import record_cache
+from shared_cache import get_table_watcher
+
+logger = logging.getLogger(__name__)
+
+INSIDERS_DIR = os.environ.get("INSIDERS_DIR", os.path.join(tempfile.gettempdir(), "dashaws_insiders"))
+
+COLUNAS = ["nome_companhia", "data", "descricao", "categoria", "valor"]
+
+# Cobre a busca por companhia da sincronização incremental
+INDEX_SQL = "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_transacoes_cia_data ON transacoes (nome_companhia, data)"
+
+# Sentido da operação pela descrição do formulário: compra soma, venda subtrai
+_RE_COMPRA = r"COMPRA|AQUISI"
+_RE_VENDA = r"VENDA|ALIENA"
+
+AGREGADOS = ["compras", "vendas", "liquido", "n"]
+
+
+def normalizar_nome(nomes):
+    """Chave de comparação de nomes de companhias ('Cia. Xyz S/A' == 'COMPANHIA XYZ SA')."""
+    s = pd.Series(nomes, dtype="object").fillna("").astype(str).str.upper()
+    s = s.str.normalize("NFKD").str.encode("ascii", "ignore").str.decode("ascii")
+    s = s.str.replace(r"[^A-Z0-9]+", " ", regex=True).str.strip()
+    s = s.str.replace(r"\bCOMPANHIA\b", "CIA", regex=True)
+    s = s.str.replace(r"\bEM RECUPERACAO JUDICIAL\b", "", regex=True)
+    s = s.str.replace(r"(\s+S\s*A)+\s*$", "", regex=True)
+    return s.str.replace(r"\s+", " ", regex=True).str.strip()
+
+
+def sinal_operacao(descricoes):
+    """+1 para compras, -1 para vendas, 0 para o resto (subscrições, doações, etc.)."""
+    # Poucas descrições distintas: o texto é tratado uma vez por valor único
+    codigos, unicas = pd.factorize(pd.Series(descricoes, dtype="object").fillna(""))
+    d = pd.Series(unicas, dtype="object").astype(str).str.upper()
+    d = d.str.normalize("NFKD").str.encode("ascii", "ignore").str.decode("ascii")
+    sinais = np.where(d.str.contains(_RE_COMPRA), 1, np.where(d.str.contains(_RE_VENDA), -1, 0))
+    return sinais[codigos].astype(np.int8) if len(sinais) else np.zeros(len(codigos), dtype=np.int8)
+
+
+def resolver_empresas(nomes, denominacoes):
+    """denom_cia de `dim_empresas` para cada nome de `transacoes` (None se não houver correspondência)."""
+    denominacoes = pd.Series(denominacoes, dtype="object").dropna().drop_duplicates()
+    mapa = dict(zip(normalizar_nome(denominacoes), denominacoes))
+    mapa.pop("", None)
+    codigos, unicos = pd.factorize(pd.Series(nomes, dtype="object"))
+    resolvidos = np.array([mapa.get(chave) for chave in normalizar_nome(unicos)] + [None], dtype=object)
+    # factorize marca nulos com -1, que aponta para o None do final
+    return resolvidos[codigos]
+
+
+def agregar(df, freq):
+    """Fluxo por (empresa, categoria, período); `freq` 'D' (dia) ou 'M' (mês)."""
+    if df.empty:
+        return pd.DataFrame(columns=["empresa", "categoria", "periodo"] + AGREGADOS)
+    periodo = df["data"].dt.normalize() if freq == "D" else df["data"].dt.to_period("M").dt.to_timestamp()
+    volume = df["valor"].abs()
+    base = pd.DataFrame({
+        "empresa": df["empresa"], "categoria": df["categoria"].fillna("Não informada"), "periodo": periodo,
+        "compras": volume.where(df["sinal"] > 0, 0.0), "vendas": volume.where(df["sinal"] < 0, 0.0),
+        "liquido": volume * df["sinal"], "n": 1,
+    })
+    return base.groupby(["empresa", "categoria", "periodo"], sort=True, as_index=False)[AGREGADOS].sum()
+
+
+@dataclass(frozen=True)
+class RadarInsiders:
+    """Visão imutável do store: transações indexadas por empresa e agregações."""
+    transacoes: pd.DataFrame
+    posicoes: dict
+    diario: pd.DataFrame
+    mensal: pd.DataFrame
+    nao_resolvidas: tuple
+
+    def empresas(self):
+        return sorted(self.posicoes)
+
+    def ultimas(self, empresa, n=5):
+        """Últimas `n` transações da empresa, pelo índice (sem varrer a tabela)."""
+        inicio, fim = self.posicoes.get(empresa, (0, 0))
+        return self.transacoes.iloc[inicio:min(fim, inicio + n)]
+
+    def fluxo_mensal(self, empresa, meses=12):
+        """Fluxo líquido mensal (linhas = mês, colunas = categoria) dos últimos `meses` meses."""
+        df = self.mensal[self.mensal["empresa"] == empresa]
+        if df.empty:
+            return pd.DataFrame()
+        corte = pd.Timestamp.today().to_period("M").to_timestamp() - pd.DateOffset(months=meses - 1)
+        df = df[df["periodo"] >= corte]
+        return df.pivot_table(index="periodo", columns="categoria", values="liquido", aggfunc="sum", fill_value=0.0)
+
+    def ranking(self, dias=30, categorias=None, empresas=None):
+        """Fluxo por empresa nos últimos `dias` dias, do maior saldo comprador ao maior vendedor."""
+        df = self.diario[self.diario["periodo"] >= pd.Timestamp.today().normalize() - pd.Timedelta(days=dias)]
+        if categorias:
+            df = df[df["categoria"].isin(categorias)]
+        if empresas is not None:
+            df = df[df["empresa"].isin(empresas)]
+        return df.groupby("empresa")[AGREGADOS].sum().sort_values("liquido", ascending=False)
+
+
+def indexar(raw):
+    """(transações resolvidas ordenadas por empresa e data decrescente, {empresa: (início, fim)})."""
+    transacoes = raw[raw["empresa"].notna()].sort_values(["empresa", "data"], ascending=[True, False], ignore_index=True)
+    empresas = transacoes["empresa"].to_numpy()
+    if not len(empresas):
+        return transacoes, {}
+    nomes, inicios = np.unique(empresas, return_index=True)
+    fins = np.append(inicios[1:], len(empresas))
+    return transacoes, {nome: (int(i), int(f)) for nome, i, f in zip(nomes, inicios, fins)}
+
+
+def montar_radar(raw, nao_resolvidas=()):
+    """RadarInsiders a partir das transações já resolvidas (colunas de COLUNAS + empresa, sinal)."""
+    transacoes, posicoes = indexar(raw)
+    return RadarInsiders(
+        transacoes=transacoes, posicoes=posicoes,
+        diario=agregar(transacoes, "D"), mensal=agregar(transacoes, "M"),
+        nao_resolvidas=tuple(nao_resolvidas),
+    )
+
+
+def _resumo_por_companhia(resumo):
+    """{companhia: (contagem, última data, soma)}, com a soma arredondada (a ordem da soma no banco varia)."""
+    soma = resumo["soma"].astype(float).round(2)
+    return dict(zip(resumo["nome_companhia"], zip(resumo["n"].astype(int), resumo["ultima"].astype(str), soma)))
+
+
+class InsidersStore:
+    """Transações resolvidas e agregações, atualizadas por companhia e persistidas em disco."""
+
+    def __init__(self, watcher, root=INSIDERS_DIR, max_age=3600):
+        self.watcher = watcher
+        self.root = root
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._raw = None
+        self._resumo = {}
+        self._radar = None
+        self._fingerprint = None
+        self._checked_at = 0.0
+        os.makedirs(root, exist_ok=True)
+
+    def get(self, engine):
+        """RadarInsiders atualizado."""
+        with self._lock:
+            fingerprint = self.watcher.fingerprints(engine, ["transacoes", "dim_empresas"])
+            fingerprint = (fingerprint["transacoes"], fingerprint["dim_empresas"])
+            vencido = time.monotonic() - self._checked_at >= self.max_age
+            if self._radar is None:
+                self._load_disk()
+            sincronizar = self._radar is None or fingerprint != self._fingerprint or (None in fingerprint and vencido)
+            record_cache("insiders", hit=not sincronizar)
+            if sincronizar:
+                dim_mudou = self._fingerprint is None or fingerprint[1] is None or fingerprint[1] != self._fingerprint[1]
+                self._sync(engine, dim_mudou, fingerprint)
+                self._fingerprint = fingerprint
+                self._checked_at = time.monotonic()
+            return self._radar
+
+    def _sync(self, engine, dim_mudou, versao=None):
+        resumo = read_sql(
+            "SELECT nome_companhia, COUNT(*) AS n, MAX(data) AS ultima, COALESCE(SUM(valor), 0) AS soma "
+            "FROM transacoes GROUP BY nome_companhia", engine,
+            cache_ttl=self.max_age, versao=versao,
+        )
+        novo = _resumo_por_companhia(resumo)
+        alteradas = [c for c, r in novo.items() if self._resumo.get(c) != r]
+        removidas = set(self._resumo) - set(novo)
+        if not (alteradas or removidas or dim_mudou) and self._radar is not None:
+            return
+
+        raw = self._raw if self._raw is not None else pd.DataFrame(columns=COLUNAS + ["sinal"])
+        if alteradas:
+            df_novo = read_sql(
+                text(f"SELECT {', '.join(COLUNAS)} FROM transacoes WHERE nome_companhia = ANY(:nomes)"),
+                engine, cache_ttl=self.max_age, versao=versao, params={"nomes": alteradas},
+            )
+            df_novo["data"] = pd.to_datetime(df_novo["data"])
+            df_novo["valor"] = pd.to_numeric(df_novo["valor"], errors="coerce").fillna(0.0)
+            df_novo["sinal"] = sinal_operacao(df_novo["descricao"])
+        else:
+            df_novo = raw.iloc[:0]
+        mantidas = ~raw["nome_companhia"].isin(set(alteradas) | removidas)
+        raw = pd.concat([raw.loc[mantidas, COLUNAS + ["sinal"]], df_novo], ignore_index=True)
+        raw = raw.astype({"data": "datetime64[ns]", "valor": float, "sinal": np.int8})
+
+        # A resolução é refeita para todas as linhas (só um dicionário de nomes);
+        # companhias que passaram a apontar para outra empresa também contam como alteradas
+        denominacoes = read_sql(
+            "SELECT DISTINCT denom_cia FROM dim_empresas", engine, cache_ttl=self.max_age, versao=versao
+        )["denom_cia"]
+        raw["empresa"] = resolver_empresas(raw["nome_companhia"], denominacoes)
+        nao_resolvidas = sorted(raw.loc[raw["empresa"].isna(), "nome_companhia"].dropna().unique())
+        mapa_novo = dict(zip(raw["nome_companhia"], raw["empresa"]))
+        mapa_antigo = dict(zip(self._raw["nome_companhia"], self._raw["empresa"])) if self._raw is not None else {}
+        tocadas = set(alteradas) | removidas | {c for c, e in mapa_novo.items() if c in mapa_antigo and mapa_antigo[c] != e}
+        afetadas = {mapa_novo.get(c) for c in tocadas} | {mapa_antigo.get(c) for c in tocadas}
+        afetadas.discard(None)
+
+        if self._radar is None:
+            self._radar = montar_radar(raw, nao_resolvidas)
+        else:
+            self._radar = self._atualizar_radar(raw, afetadas, nao_resolvidas)
+        self._raw = raw
+        self._resumo = novo
+        self._save_disk()
+
+    def _atualizar_radar(self, raw, afetadas, nao_resolvidas):
+        # Só as agregações das empresas afetadas são recalculadas
+        transacoes, posicoes = indexar(raw)
+        afetadas_df = transacoes[transacoes["empresa"].isin(afetadas)]
+        anterior = self._radar
+        return RadarInsiders(
+            transacoes=transacoes, posicoes=posicoes,
+            diario=pd.concat([anterior.diario[~anterior.diario["empresa"].isin(afetadas)], agregar(afetadas_df, "D")], ignore_index=True),
+            mensal=pd.concat([anterior.mensal[~anterior.mensal["empresa"].isin(afetadas)], agregar(afetadas_df, "M")], ignore_index=True),
+            nao_resolvidas=tuple(nao_resolvidas),
+        )
+
+    def _paths(self):
+        return os.path.join(self.root, "transacoes.parquet"), os.path.join(self.root, "resumo.parquet")
+
+    def _save_disk(self):
+        path_raw, path_resumo = self._paths()
+        # Transações antes do resumo: uma queda entre as duas trocas deixa um resumo
+        # antigo, que só faz reler as companhias a mais
+        _gravar_parquet(self._raw, path_raw)
+        _gravar_parquet(pd.DataFrame(
+            [(companhia, *r) for companhia, r in self._resumo.items()], columns=["nome_companhia", "n", "ultima", "soma"],
+        ), path_resumo)
+
+    def _load_disk(self):
+        path_raw, path_resumo = self._paths()
+        if not (os.path.exists(path_raw) and os.path.exists(path_resumo)):
+            return
+        try:
+            raw = pd.read_parquet(path_raw)
+            resumo = _resumo_por_companhia(pd.read_parquet(path_resumo))
+            nao_resolvidas = sorted(raw.loc[raw["empresa"].isna(), "nome_companhia"].dropna().unique())
+            radar = montar_radar(raw, nao_resolvidas)
+        except Exception:
+            # Arquivo ilegível: começa do zero, com a carga completa do banco
+            logger.warning("cache de insiders em %s ilegível; recarregando do banco", self.root, exc_info=True)
+            return
+        self._raw, self._resumo, self._radar = raw, resumo, radar
+
+
+def _gravar_parquet(df, path):
+    # Grava num temporário e troca, para um leitor nunca ver um arquivo pela metade
+    temporario = path + ".tmp"
+    df.to_parquet(temporario)
+    os.replace(temporario, path)
+
+
+@st.cache_resource
+def get_insiders_store():
+    """Store de insiders compartilhado pelo processo."""
+    return InsidersStore(get_table_watcher())
+
+
+def get_radar_insiders(engine):
+    """Radar de insiders compartilhado por todas as sessões."""
+    return get_insiders_store().get(engine)
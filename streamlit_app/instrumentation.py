@@ -0,0 +1,199 @@
+# streamlit_app/instrumentation.py
+# Instrumentação de desempenho: tempo por página e por consulta, linhas,
+# bytes e acertos de cache.
+#
+# As medições ficam num registro do processo (histogramas de latência com
+# faixas fixas) exibido no painel opcional da barra lateral, e cada evento
+# também sai como uma linha de log JSON no stdout, que o App Runner coleta.
+
+import hmac
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+# Limites superiores (ms) das faixas do histograma; a última é aberta
+BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, float("inf"))
+
+logger = logging.getLogger("dashaws.perf")
+if not logger.handlers:
+    _handler = logging.StreamHandler(sys.stdout)
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(_handler)
+    logger.setLevel(os.environ.get("PERF_LOG_LEVEL", "INFO"))
+    logger.propagate = False
+
+
+class MetricsRegistry:
+    """Registro thread-safe de latências, volumes e eventos de cache."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._series = {}
+            self._cache = {}
+
+    def observe(self, kind, name, seconds, rows=None, nbytes=None):
+        ms = seconds * 1000
+        with self._lock:
+            serie = self._series.setdefault((kind, name), {
+                "count": 0, "total_ms": 0.0, "max_ms": 0.0, "rows": 0, "bytes": 0,
+                "hist": np.zeros(len(BUCKETS_MS), dtype=np.int64),
+            })
+            serie["count"] += 1
+            serie["total_ms"] += ms
+            serie["max_ms"] = max(serie["max_ms"], ms)
+            serie["rows"] += rows or 0
+            serie["bytes"] += nbytes or 0
+            serie["hist"][np.searchsorted(BUCKETS_MS, ms)] += 1
+        _log({"event": kind, "name": name, "ms": round(ms, 2), "rows": rows, "bytes": nbytes})
+
+    def cache_event(self, name, hit):
+        with self._lock:
+            contagem = self._cache.setdefault(name, [0, 0])
+            contagem[0 if hit else 1] += 1
+
+    def latencias(self):
+        """DataFrame com uma linha por (tipo, nome): contagem, média, p50/p95 (pela faixa), máx., linhas e bytes."""
+        with self._lock:
+            linhas = []
+            for (kind, name), s in self._series.items():
+                acumulado = np.cumsum(s["hist"]) / s["count"]
+                linhas.append({
+                    "tipo": kind, "nome": name, "n": s["count"],
+                    "média (ms)": s["total_ms"] / s["count"],
+                    "p50 (ms) ≤": BUCKETS_MS[int(np.searchsorted(acumulado, 0.50))],
+                    "p95 (ms) ≤": BUCKETS_MS[int(np.searchsorted(acumulado, 0.95))],
+                    "máx. (ms)": s["max_ms"], "linhas": s["rows"], "bytes": s["bytes"],
+                })
+        return pd.DataFrame(linhas)
+
+    def caches(self):
+        """DataFrame com acertos, falhas e taxa de acerto por cache."""
+        with self._lock:
+            linhas = [
+                {"cache": nome, "acertos": h, "falhas": m, "taxa de acerto": 100 * h / (h + m)}
+                for nome, (h, m) in self._cache.items()
+            ]
+        return pd.DataFrame(linhas)
+
+
+metrics = MetricsRegistry()
+
+
+def _log(evento):
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(json.dumps({k: v for k, v in evento.items() if v is not None}, default=str))
+
+
+@contextmanager
+def timed(kind, name):
+    """Mede o bloco e registra em `metrics`, mesmo se ele terminar com exceção (st.stop/st.rerun)."""
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.observe(kind, name, time.perf_counter() - inicio)
+
+
+def record_cache(name, hit):
+    """Registra um acerto (hit=True) ou falha de cache."""
+    metrics.cache_event(name, hit)
+
+
+_RE_TABELA = re.compile(r"\b(FROM|INTO|UPDATE)\s+([\w.]+)", re.IGNORECASE)
+
+
+def query_label(query):
+    """Rótulo curto de uma consulta: comando + primeira tabela ('SELECT portfolio_config')."""
+    sql = str(query).strip()
+    comando = sql.split(None, 1)[0].upper() if sql else "?"
+    tabela = _RE_TABELA.search(sql)
+    return f"{comando} {tabela.group(2)}" if tabela else comando
+
+
+def frame_stats(df):
+    """(linhas, bytes em memória) de um DataFrame."""
+    return len(df), int(df.memory_usage(index=True, deep=True).sum())
+
+
+def instrument_engine(engine):
+    """Mede cada execução de cursor do engine (inclui COUNTs, escritas e consultas de catálogo)."""
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _antes(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("perf_inicio", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _depois(conn, cursor, statement, parameters, context, executemany):
+        inicio = conn.info["perf_inicio"].pop()
+        rows = cursor.rowcount if cursor.rowcount is not None and cursor.rowcount >= 0 else None
+        metrics.observe("sql", query_label(statement), time.perf_counter() - inicio, rows=rows)
+
+    @event.listens_for(engine, "handle_error")
+    def _erro(contexto):
+        # Comando que falhou não chega ao after_cursor_execute: o início dele sai da pilha aqui
+        conn = contexto.connection
+        if contexto.statement is not None and conn is not None and conn.info.get("perf_inicio"):
+            conn.info["perf_inicio"].pop()
+
+    return engine
+
+
+def instrument_page(name, func):
+    """Envolve uma função de página para medir seu tempo total de execução."""
+    def wrapper(*args, **kwargs):
+        with timed("page", name):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def panel_enabled():
+    """O painel (que pode zerar as métricas) é só da administração.
+
+    Aparece com PERF_PANEL=1 no ambiente, [admin] perf_panel = true nos secrets
+    ou ?perf=<token> na URL, com o token em [admin] perf_token nos secrets.
+    """
+    if os.environ.get("PERF_PANEL") == "1":
+        return True
+    try:
+        admin = st.secrets.get("admin", {})
+    except Exception:
+        return False
+    if admin.get("perf_panel", False):
+        return True
+    token, informado = str(admin.get("perf_token", "")), st.query_params.get("perf", "")
+    return bool(token) and hmac.compare_digest(token.encode(), informado.encode())
+
+
+def render_panel():
+    """Painel de desempenho na barra lateral."""
+    with st.sidebar.expander("⏱️ Desempenho", expanded=False):
+        df_lat = metrics.latencias()
+        if df_lat.empty:
+            st.caption("Nenhuma medição ainda.")
+        else:
+            for tipo, titulo in (("page", "Páginas"), ("import", "Importação de páginas"), ("etapa", "Etapas"), ("read_sql", "Leituras (DataFrame)"), ("sql", "Comandos SQL")):
+                df_tipo = df_lat[df_lat["tipo"] == tipo].drop(columns="tipo").sort_values("média (ms)", ascending=False)
+                if not df_tipo.empty:
+                    st.markdown(f"**{titulo}**")
+                    st.dataframe(df_tipo, hide_index=True, use_container_width=True)
+        df_cache = metrics.caches()
+        if not df_cache.empty:
+            st.markdown("**Caches**")
+            st.dataframe(df_cache, hide_index=True, use_container_width=True,
+                         column_config={"taxa de acerto": st.column_config.NumberColumn(format="%.0f%%")})
+        if st.button("Zerar métricas", key="perf_reset"):
+            metrics.reset()
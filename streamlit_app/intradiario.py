@@ -0,0 +1,176 @@
+# streamlit_app/intradiario.py
+# Série intradiária da carteira (PL, cota, exposição e contribuição por ativo).
+#
+# Cada atualização da página RTD calcula a carteira inteira; aqui fica um
+# ponto por intervalo (o último cálculo dentro dele), sem recalcular nada
+# depois. Os pontos vão para um anel de arrays NumPy do tamanho do pregão,
+# então a memória não cresce com o tempo de processo. O dia inteiro é
+# gravado de uma vez em disco a cada poucos minutos, não a cada ponto, e
+# também na virada do dia e na saída do processo; um processo novo retoma
+# a série do dia.
+
+import atexit
+import os
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import streamlit as st
+
+INTRADIARIO_DIR = os.environ.get("INTRADIARIO_DIR", os.path.join(tempfile.gettempdir(), "dashaws_intradiario"))
+
+# O dia do pregão e os horários do gráfico seguem a B3, qualquer que seja o fuso do servidor
+FUSO = ZoneInfo("America/Sao_Paulo")
+
+CAMPOS = (
+    "patrimonio_liquido", "cota_atual", "variacao_cota_dia",
+    "posicao_comprada_perc", "posicao_vendida_perc", "net_long", "exposicao_total",
+)
+
+
+@dataclass(frozen=True)
+class Intradiario:
+    """Pontos do dia em ordem cronológica (cópias, seguras para a página)."""
+    instantes: np.ndarray  # datetime64[ns], horário de Brasília
+    valores: np.ndarray  # (n, len(CAMPOS))
+    tickers: tuple
+    contribuicoes: np.ndarray  # (n, len(tickers)), contribuição em R$
+
+    def __len__(self):
+        return len(self.instantes)
+
+    def campo(self, nome):
+        return self.valores[:, CAMPOS.index(nome)]
+
+
+class SerieIntradiaria:
+    """Anel de pontos da carteira do dia, um por `intervalo` segundos, persistido em lote."""
+
+    def __init__(self, intervalo=60, duracao=10 * 3600, root=INTRADIARIO_DIR, gravar_a_cada=300):
+        self.intervalo = intervalo
+        self.capacidade = int(np.ceil(duracao / intervalo))
+        self.root = root
+        self.gravar_a_cada = gravar_a_cada
+        self._lock = threading.Lock()
+        self._dia = None
+        self._gravado_em = time.monotonic()
+        self._limpar()
+        os.makedirs(root, exist_ok=True)
+
+    def _limpar(self):
+        self._n = 0  # pontos do dia; o próximo vai na posição _n % capacidade
+        self._balde = None
+        self._instantes = np.zeros(self.capacidade, dtype="datetime64[ns]")
+        self._valores = np.zeros((self.capacidade, len(CAMPOS)))
+        self._colunas = {}
+        self._contribuicoes = np.zeros((self.capacidade, 0))
+        self._pendente = False
+
+    def registrar(self, resultado, tickers, agora=None):
+        """Guarda os totais e as contribuições de um cálculo da carteira (PortfolioResult)."""
+        agora = agora or datetime.now(FUSO).replace(tzinfo=None)
+        instante = np.datetime64(agora, "ns")
+        with self._lock:
+            self._virar_dia(agora.date())
+            balde = int(instante.astype(np.int64) // (self.intervalo * 10**9))
+            if balde != self._balde:
+                self._balde = balde
+                self._n += 1
+            # Dentro do mesmo intervalo, o ponto aberto é sobrescrito pelo cálculo mais recente
+            pos = (self._n - 1) % self.capacidade
+            self._instantes[pos] = instante
+            self._valores[pos] = [float(getattr(resultado, c)) for c in CAMPOS]
+            colunas = self._indices(tickers)
+            self._contribuicoes[pos] = 0.0
+            np.add.at(self._contribuicoes[pos], colunas, np.asarray(resultado.contrib_rs, dtype=float))
+            self._pendente = True
+            if time.monotonic() - self._gravado_em >= self.gravar_a_cada:
+                self._save_disk()
+
+    def serie(self, hoje=None):
+        """Intradiario do dia."""
+        with self._lock:
+            self._virar_dia(hoje or datetime.now(FUSO).date())
+            n = min(self._n, self.capacidade)
+            # Anel cheio: o mais antigo está logo depois do último gravado
+            ordem = (np.arange(n) + self._n) % self.capacidade if self._n > self.capacidade else np.arange(n)
+            return Intradiario(
+                instantes=self._instantes[ordem], valores=self._valores[ordem],
+                tickers=tuple(self._colunas), contribuicoes=self._contribuicoes[ordem],
+            )
+
+    def gravar(self):
+        """Grava os pontos ainda não persistidos (chamado na saída do processo)."""
+        with self._lock:
+            if self._pendente:
+                self._save_disk()
+
+    def _indices(self, tickers):
+        novos = [t for t in dict.fromkeys(tickers) if t not in self._colunas]
+        if novos:
+            # Ativo novo no dia: uma coluna a mais, zerada nos pontos anteriores
+            for t in novos:
+                self._colunas[t] = len(self._colunas)
+            self._contribuicoes = np.pad(self._contribuicoes, ((0, 0), (0, len(novos))))
+        return np.fromiter((self._colunas[t] for t in tickers), dtype=np.int64, count=len(tickers))
+
+    def _virar_dia(self, dia):
+        if dia == self._dia:
+            return
+        if self._dia is not None and self._pendente:
+            # Os últimos pontos do dia que termina ainda não foram gravados
+            self._save_disk()
+        self._limpar()
+        self._dia = dia
+        self._load_disk()
+        # Ficam em disco o dia corrente e o último pregão antes dele
+        atual = os.path.basename(self._path())
+        anteriores = sorted(n for n in os.listdir(self.root) if n.startswith("intradiario-") and n < atual)
+        for nome in anteriores[:-1]:
+            os.remove(os.path.join(self.root, nome))
+
+    # --- persistência ---
+    def _path(self):
+        return os.path.join(self.root, f"intradiario-{self._dia.isoformat()}.npz")
+
+    def _save_disk(self):
+        dados = {
+            "intervalo": np.array([self.intervalo]), "estado": np.array([self._n, -1 if self._balde is None else self._balde]),
+            "instantes": self._instantes, "valores": self._valores,
+            "tickers": np.array(list(self._colunas), dtype=str), "contribuicoes": self._contribuicoes,
+        }
+        # O diretório pode ter sumido (ex.: limpeza do /tmp) com o processo no ar
+        os.makedirs(self.root, exist_ok=True)
+        # Grava num temporário e troca, para um leitor nunca ver um arquivo pela metade
+        temporario = os.path.join(self.root, f".{os.path.basename(self._path())}.tmp.npz")
+        np.savez(temporario, **dados)
+        os.replace(temporario, self._path())
+        self._pendente = False
+        self._gravado_em = time.monotonic()
+
+    def _load_disk(self):
+        if not os.path.exists(self._path()):
+            return
+        with np.load(self._path()) as dados:
+            if dados["intervalo"][0] != self.intervalo or len(dados["instantes"]) != self.capacidade:
+                return
+            n, balde = (int(v) for v in dados["estado"])
+            self._n, self._balde = n, None if balde < 0 else balde
+            self._instantes, self._valores = dados["instantes"], dados["valores"]
+            self._colunas = {t: i for i, t in enumerate(dados["tickers"].tolist())}
+            self._contribuicoes = dados["contribuicoes"].reshape(self.capacidade, len(self._colunas))
+
+
+@st.cache_resource
+def get_serie_intradiaria():
+    """Série intradiária do processo (intervalo em RTD_INTRADAY_INTERVAL, em segundos).
+
+    Os pontos pendentes são gravados na saída do processo.
+    """
+    serie = SerieIntradiaria(intervalo=int(os.environ.get("RTD_INTRADAY_INTERVAL", 60)))
+    atexit.register(serie.gravar)
+    return serie
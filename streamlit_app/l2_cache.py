@@ -0,0 +1,277 @@
+# streamlit_app/l2_cache.py
+# Cache de segundo nível compartilhado entre instâncias do App Runner.
+#
+# `st.cache_*` e os stores valem só dentro de um processo; com várias
+# instâncias, cada uma repetiria as mesmas consultas ao Postgres e ao
+# yfinance. Aqui os resultados ficam num backend comum (Redis em produção;
+# arquivo ou memória em testes), com chave = hash da consulta e dos
+# parâmetros e validade (TTL). DataFrames vão em Arrow IPC comprimido; os
+# demais valores, em JSON. Contra estouro de manada, quem não acha a chave
+# tenta pegar uma trava: uma instância calcula e as outras esperam o valor.
+#
+# Configuração por L2_CACHE_URL: redis://..., file:///caminho ou memory://.
+# Sem a variável, o cache fica desligado e tudo é calculado direto.
+
+import hashlib
+import io
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+
+import pandas as pd
+import streamlit as st
+
+from instrumentation import metrics, record_cache
+
+logger = logging.getLogger(__name__)
+
+L2_CACHE_URL = os.environ.get("L2_CACHE_URL", "")
+
+_ARROW, _JSON = b"A", b"J"
+
+
+def serializar(valor):
+    """Bytes de um DataFrame (Arrow IPC, com índice) ou de um valor JSON."""
+    if isinstance(valor, pd.DataFrame):
+        import pyarrow as pa
+        tabela = pa.Table.from_pandas(valor, preserve_index=True)
+        buffer = io.BytesIO()
+        opcoes = pa.ipc.IpcWriteOptions(compression="zstd" if pa.Codec.is_available("zstd") else None)
+        with pa.ipc.new_stream(buffer, tabela.schema, options=opcoes) as escritor:
+            escritor.write_table(tabela)
+        return _ARROW + buffer.getvalue()
+    return _JSON + json.dumps(valor, default=str).encode("utf-8")
+
+
+def desserializar(dados):
+    if dados[:1] == _ARROW:
+        import pyarrow as pa
+        return pa.ipc.open_stream(dados[1:]).read_all().to_pandas()
+    return json.loads(dados[1:].decode("utf-8"))
+
+
+class MemoryBackend:
+    """Backend do próprio processo (testes)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._dados = {}
+
+    def get(self, chave):
+        with self._lock:
+            item = self._dados.get(chave)
+            if item is None or item[0] < time.time():
+                return None
+            return item[1]
+
+    def set(self, chave, valor, ttl):
+        with self._lock:
+            self._dados[chave] = (time.time() + ttl, valor)
+
+    def add(self, chave, valor, ttl):
+        """Grava só se a chave não existir (ou tiver vencido); True se gravou."""
+        with self._lock:
+            item = self._dados.get(chave)
+            if item is not None and item[0] >= time.time():
+                return False
+            self._dados[chave] = (time.time() + ttl, valor)
+            return True
+
+    def delete_if(self, chave, valor):
+        with self._lock:
+            item = self._dados.get(chave)
+            if item is not None and item[1] == valor:
+                del self._dados[chave]
+
+
+class FileBackend:
+    """Backend em diretório (vários processos na mesma máquina). A validade fica na primeira linha do arquivo."""
+
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, chave):
+        return os.path.join(self.root, hashlib.sha1(chave.encode()).hexdigest())
+
+    def _ler(self, path):
+        try:
+            with open(path, "rb") as f:
+                expira = float(f.readline())
+                return expira, f.read()
+        except (OSError, ValueError):
+            return None
+
+    def get(self, chave):
+        item = self._ler(self._path(chave))
+        if item is None or item[0] < time.time():
+            return None
+        return item[1]
+
+    def set(self, chave, valor, ttl):
+        path = self._path(chave)
+        temporario = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(temporario, "wb") as f:
+            f.write(f"{time.time() + ttl}\n".encode() + valor)
+        os.replace(temporario, path)
+
+    def add(self, chave, valor, ttl):
+        path = self._path(chave)
+        item = self._ler(path)
+        if item is not None and item[0] < time.time():
+            # Trava vencida (dono caiu): remove e disputa de novo
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            return False
+        with os.fdopen(fd, "wb") as f:
+            f.write(f"{time.time() + ttl}\n".encode() + valor)
+        return True
+
+    def delete_if(self, chave, valor):
+        path = self._path(chave)
+        item = self._ler(path)
+        if item is not None and item[1] == valor:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+class RedisBackend:
+    """Redis (ou compatível, como ElastiCache/Valkey). O cliente `redis` só é importado aqui."""
+
+    # Apaga a trava só se ainda for do mesmo dono
+    _LIBERAR = "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) end return 0"
+
+    def __init__(self, url, timeout=2.0):
+        import redis
+        self._redis = redis.Redis.from_url(url, socket_timeout=timeout, socket_connect_timeout=timeout)
+        self._liberar = self._redis.register_script(self._LIBERAR)
+
+    def get(self, chave):
+        return self._redis.get(chave)
+
+    def set(self, chave, valor, ttl):
+        self._redis.set(chave, valor, px=int(ttl * 1000))
+
+    def add(self, chave, valor, ttl):
+        return bool(self._redis.set(chave, valor, px=int(ttl * 1000), nx=True))
+
+    def delete_if(self, chave, valor):
+        self._liberar(keys=[chave], args=[valor])
+
+
+class L2Cache:
+    """get-or-compute sobre um backend, com trava contra estouro de manada.
+
+    Falhas do backend nunca derrubam a página: o valor é calculado direto.
+    """
+
+    def __init__(self, backend, prefixo="dashaws:", lock_ttl=30, intervalo=0.05):
+        self.backend = backend
+        self.prefixo = prefixo
+        self.lock_ttl = lock_ttl
+        self.intervalo = intervalo
+
+    def chave(self, *partes):
+        """Chave estável de um conjunto de partes (consulta, parâmetros, versão...)."""
+        bruto = json.dumps(partes, default=str, sort_keys=True, separators=(",", ":"))
+        return self.prefixo + hashlib.sha256(bruto.encode("utf-8")).hexdigest()
+
+    def get(self, chave):
+        """Valor guardado na `chave` (None se ausente, vencido ou com o backend fora)."""
+        dados = self._get(chave)
+        return desserializar(dados) if dados is not None else None
+
+    def set(self, chave, valor, ttl):
+        self._set(chave, serializar(valor), ttl)
+
+    def get_or_compute(self, chave, ttl, calcular, nome="l2"):
+        """Valor da `chave`; na falta, só um chamador (entre instâncias) executa `calcular`."""
+        dados = self._get(chave)
+        if dados is not None:
+            record_cache(nome, hit=True)
+            return desserializar(dados)
+        record_cache(nome, hit=False)
+
+        trava, dono = chave + ":trava", uuid.uuid4().hex.encode()
+        inicio = time.monotonic()
+        while not self._add(trava, dono):
+            # Outra instância está calculando: espera o valor aparecer
+            time.sleep(self.intervalo)
+            dados = self._get(chave)
+            if dados is not None:
+                metrics.observe("l2", f"{nome}.espera", time.monotonic() - inicio)
+                return desserializar(dados)
+            if time.monotonic() - inicio >= self.lock_ttl:
+                break  # dono lento ou caído: calcula por conta própria
+        try:
+            # O dono anterior pode ter gravado entre a primeira leitura e a trava
+            dados = self._get(chave)
+            if dados is not None:
+                return desserializar(dados)
+            valor = calcular()
+            try:
+                dados = serializar(valor)
+            except Exception as e:
+                # Tipos que o Arrow não representa: o valor só não é compartilhado
+                logger.warning("L2: valor de %s não serializável: %s", nome, e)
+            else:
+                self._set(chave, dados, ttl)
+            return valor
+        finally:
+            self._delete_if(trava, dono)
+
+    # Operações do backend que degradam para "sem cache" em caso de erro
+    def _get(self, chave):
+        try:
+            return self.backend.get(chave)
+        except Exception as e:
+            logger.warning("L2 indisponível (get): %s", e)
+            return None
+
+    def _set(self, chave, valor, ttl):
+        try:
+            self.backend.set(chave, valor, ttl)
+        except Exception as e:
+            logger.warning("L2 indisponível (set): %s", e)
+
+    def _add(self, chave, valor):
+        try:
+            return self.backend.add(chave, valor, self.lock_ttl)
+        except Exception as e:
+            logger.warning("L2 indisponível (trava): %s", e)
+            return True
+
+    def _delete_if(self, chave, valor):
+        try:
+            self.backend.delete_if(chave, valor)
+        except Exception as e:
+            logger.warning("L2 indisponível (liberar trava): %s", e)
+
+
+def criar_cache(url):
+    """L2Cache para `url` (redis://, rediss://, file:///caminho ou memory://); None se vazia."""
+    if not url:
+        return None
+    if url.startswith(("redis://", "rediss://")):
+        return L2Cache(RedisBackend(url))
+    if url.startswith("file://"):
+        return L2Cache(FileBackend(url[len("file://"):]))
+    if url.startswith("memory://"):
+        return L2Cache(MemoryBackend())
+    raise ValueError(f"L2_CACHE_URL não suportada: {url}")
+
+
+@st.cache_resource
+def get_l2_cache():
+    """Cache de segundo nível do processo (None se L2_CACHE_URL não estiver definida)."""
+    return criar_cache(L2_CACHE_URL)
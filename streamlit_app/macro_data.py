@@ -0,0 +1,294 @@
+# streamlit_app/macro_data.py
+# Séries do SGS (Banco Central) e vértices da curva DI × pré em armazenamento local.
+#
+# - Cada série é um diretório de partes Parquet (data, valor); a sincronização
+#   busca só as datas posteriores ao último ponto guardado e grava só esses
+#   pontos, numa parte nova. Passando de MAX_PARTES, as partes são compactadas.
+# - As páginas leem apenas o armazenamento local: séries vencidas são
+#   sincronizadas em segundo plano e aparecem na próxima execução.
+#
+# O provedor é plugável: `BCBProvider` (python-bcb) para produção e
+# `FixtureProvider` (determinístico, sem rede) para testes e benchmarks.
+
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from curva_juros import montar_curva
+from instrumentation import record_cache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DIR = os.environ.get("MACRO_DATA_DIR", os.path.join(tempfile.gettempdir(), "dashaws_macro_data"))
+MAX_PARTES = 32
+
+
+@dataclass(frozen=True)
+class Serie:
+    codigo: int
+    nome: str
+    unidade: str
+    frequencia: str  # "D" (dias úteis) ou "M" (mensal)
+
+
+# Séries da página Dados Macro
+SERIES = {
+    "selic": Serie(432, "Meta Selic", "% a.a.", "D"),
+    "cdi": Serie(4389, "CDI (base 252)", "% a.a.", "D"),
+    "ipca": Serie(433, "IPCA", "% a.m.", "M"),
+    "igpm": Serie(189, "IGP-M", "% a.m.", "M"),
+    "dolar": Serie(1, "Dólar (PTAX venda)", "R$", "D"),
+    "ibc_br": Serie(24363, "IBC-Br", "índice", "M"),
+}
+
+# Taxa referencial de swaps DI × pré (B3) publicada no SGS: {prazo em dias corridos: código}
+VERTICES_DI = {30: 7805, 60: 7806, 90: 7807, 120: 7808, 180: 7809, 360: 7810}
+
+
+class BCBProvider:
+    """Busca séries no SGS. O python-bcb só é importado no primeiro uso."""
+
+    def series(self, inicios):
+        """Retorna {código: Series} a partir da data de início de cada código."""
+        from bcb import sgs
+        resultado = {}
+        for codigo, inicio in inicios.items():
+            # Uma requisição por série; a falha de uma não impede as outras
+            try:
+                df = sgs.get({"valor": codigo}, start=inicio)
+            except Exception as e:
+                logger.warning("SGS %s: %s", codigo, e)
+                continue
+            resultado[codigo] = df["valor"].dropna()
+        return resultado
+
+
+class FixtureProvider:
+    """Provedor offline: séries sintéticas determinísticas por código.
+
+    Os vértices da curva DI partem de uma mesma taxa básica, com inclinação
+    positiva. `latency` simula o tempo de rede por chamada; `calls` conta as chamadas.
+    """
+
+    # Taxas que acompanham a taxa básica: {código: diferença em p.p.}
+    TAXAS = {432: 0.0, 4389: -0.1}
+    # Demais séries: {código: (nível, desvio)}; nas diárias o desvio é a volatilidade diária
+    NIVEIS = {433: (0.4, 0.3), 189: (0.5, 0.8), 1: (4.5, 0.006), 24363: (140.0, 3.0)}
+
+    def __init__(self, latency=0.0, today=None):
+        self.latency = latency
+        self.today = today
+        self.calls = {"series": 0}
+
+    def _base(self, datas):
+        # Taxa básica: passeio aleatório suave entre 2% e 15% a.a.
+        rng = np.random.default_rng(0)
+        return np.clip(10 + np.cumsum(rng.normal(0, 0.03, len(datas))), 2, 15)
+
+    def series(self, inicios):
+        self.calls["series"] += 1
+        time.sleep(self.latency)
+        fim = self.today or date.today()
+        # Série completa a partir de uma data fixa, recortada no início pedido
+        diarias = pd.bdate_range("2000-01-03", fim)
+        base = pd.Series(self._base(diarias), index=diarias)
+        prazos = {codigo: prazo for prazo, codigo in VERTICES_DI.items()}
+        mensais = {s.codigo for s in SERIES.values() if s.frequencia == "M"}
+        resultado = {}
+        for codigo, inicio in inicios.items():
+            rng = np.random.default_rng(zlib.crc32(str(codigo).encode()))
+            nivel, desvio = self.NIVEIS.get(codigo, (1.0, 0.01))
+            if codigo in prazos:
+                valores = base + 1.2 * np.sqrt(prazos[codigo] / 360) + rng.normal(0, 0.02, len(base))
+            elif codigo in self.TAXAS:
+                valores = (base + self.TAXAS[codigo]).round(2)
+            elif codigo in mensais:
+                datas = pd.date_range("2000-01-01", fim, freq="MS")
+                valores = pd.Series(nivel + rng.normal(0, desvio, len(datas)), index=datas)
+            else:
+                valores = pd.Series(nivel * np.exp(np.cumsum(rng.normal(0, desvio, len(base)))), index=diarias)
+            valores.index.name = "Date"
+            resultado[codigo] = valores[valores.index >= pd.Timestamp(inicio)].rename("valor")
+        return resultado
+
+
+class MacroStore:
+    """Séries do SGS persistidas localmente e sincronizadas em segundo plano."""
+
+    def __init__(self, provider, root=DEFAULT_DIR, ttl=6 * 3600, history_days=5 * 365, max_workers=2):
+        self.provider = provider
+        self.root = root
+        self.ttl = ttl
+        self.history_days = history_days
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="macro-sync")
+        self._lock = threading.Lock()
+        self._frames = {}
+        self._em_andamento = set()
+        os.makedirs(os.path.join(root, "series"), exist_ok=True)
+        self._db = sqlite3.connect(os.path.join(root, "macro_data.sqlite"), check_same_thread=False)
+        self._db.execute("CREATE TABLE IF NOT EXISTS series_meta (codigo INTEGER PRIMARY KEY, fetched_at REAL, last_date TEXT)")
+
+    # --- leitura (sempre local) ---
+    def series(self, codigos):
+        """DataFrame data × código com o que está guardado; as séries vencidas são agendadas."""
+        codigos = list(dict.fromkeys(codigos))
+        agendadas = set(self.schedule(codigos))
+        for codigo in codigos:
+            record_cache("macro_data", hit=codigo not in agendadas)
+        frames = [self._load(c).rename(c) for c in codigos]
+        return pd.concat(frames, axis=1).sort_index() if frames else pd.DataFrame()
+
+    def curva_di(self):
+        """CurvaDI com os vértices guardados (VERTICES_DI)."""
+        df = self.series(VERTICES_DI.values())
+        return montar_curva(df[list(VERTICES_DI.values())], list(VERTICES_DI))
+
+    def sincronizando(self, codigos=None):
+        """Se há sincronização em andamento (de qualquer série ou de alguma de `codigos`)."""
+        with self._lock:
+            return bool(self._em_andamento if codigos is None else self._em_andamento & set(codigos))
+
+    # --- sincronização ---
+    def pendentes(self, codigos):
+        """{código: data de início} das séries vencidas: o dia seguinte ao último ponto guardado."""
+        codigos = list(dict.fromkeys(codigos))
+        with self._lock:
+            meta = {
+                r[0]: (r[1], r[2]) for r in self._db.execute(
+                    f"SELECT codigo, fetched_at, last_date FROM series_meta "
+                    f"WHERE codigo IN ({','.join('?' * len(codigos))})", codigos
+                )
+            } if codigos else {}
+        agora = time.time()
+        inicio_padrao = date.today() - timedelta(days=self.history_days)
+        pendentes = {}
+        for codigo in codigos:
+            fetched_at, last_date = meta.get(codigo, (None, None))
+            if fetched_at is not None and agora - fetched_at < self.ttl:
+                continue
+            pendentes[codigo] = date.fromisoformat(last_date) + timedelta(days=1) if last_date else inicio_padrao
+        return pendentes
+
+    def sync(self, codigos):
+        """Busca (de forma síncrona) só os pontos novos das séries vencidas. Retorna os códigos buscados."""
+        pendentes = self.pendentes(codigos)
+        agora = time.time()
+        # Séries já em dia até hoje só têm o horário da verificação renovado
+        buscar = {c: inicio for c, inicio in pendentes.items() if inicio <= date.today()}
+        novos = self.provider.series(buscar) if buscar else {}
+        with self._lock:
+            for codigo, inicio in pendentes.items():
+                if codigo in buscar and codigo not in novos:
+                    continue  # falhou no provedor: tenta de novo na próxima vez
+                self._append(codigo, novos.get(codigo), inicio, agora)
+        return list(buscar)
+
+    def schedule(self, codigos):
+        """Agenda em segundo plano a sincronização das séries vencidas; não bloqueia a página."""
+        with self._lock:
+            livres = [c for c in codigos if c not in self._em_andamento]
+        pendentes = list(self.pendentes(livres)) if livres else []
+        with self._lock:
+            pendentes = [c for c in pendentes if c not in self._em_andamento]
+            self._em_andamento.update(pendentes)
+        if pendentes:
+            self._executor.submit(self._run, pendentes)
+        return pendentes
+
+    def _run(self, codigos):
+        try:
+            self.sync(codigos)
+        except Exception:
+            logger.warning("sincronização de séries do SGS falhou", exc_info=True)
+        finally:
+            with self._lock:
+                self._em_andamento.difference_update(codigos)
+
+    # --- armazenamento ---
+    def _dir(self, codigo):
+        return os.path.join(self.root, "series", f"sgs_{codigo}")
+
+    def _partes(self, codigo):
+        """Arquivos da série, do mais antigo ao mais novo (o nome é o instante da gravação)."""
+        pasta = self._dir(codigo)
+        if not os.path.isdir(pasta):
+            return []
+        return sorted(os.path.join(pasta, n) for n in os.listdir(pasta) if n.endswith(".parquet"))
+
+    def _ler(self, codigo):
+        partes = self._partes(codigo)
+        if not partes:
+            return None
+        serie = pd.concat([pd.read_parquet(p)["valor"] for p in partes])
+        # Uma data regravada numa parte mais nova vale sobre a antiga
+        return serie[~serie.index.duplicated(keep="last")].sort_index()
+
+    def _gravar_parte(self, codigo, serie):
+        pasta = self._dir(codigo)
+        # O diretório pode ter sumido (ex.: limpeza do /tmp) com o processo no ar
+        os.makedirs(pasta, exist_ok=True)
+        path = os.path.join(pasta, f"{time.time_ns():020d}.parquet")
+        temporario = path + ".tmp"
+        serie.to_frame().to_parquet(temporario)
+        os.replace(temporario, path)
+        return path
+
+    def _load(self, codigo):
+        with self._lock:
+            serie = self._frames.get(codigo)
+            if serie is None:
+                serie = self._ler(codigo)
+                if serie is None:
+                    serie = pd.Series(dtype=float, index=pd.DatetimeIndex([], name="Date"), name="valor")
+                self._frames[codigo] = serie
+            return serie
+
+    def _append(self, codigo, novos, inicio, agora):
+        # Chamado com o lock adquirido
+        atual = self._frames.get(codigo)
+        if atual is None:
+            atual = self._ler(codigo)
+        if novos is not None and not novos.empty:
+            novos = pd.to_numeric(novos, errors="coerce").astype(float)
+            novos.index = pd.DatetimeIndex(novos.index, name="Date")
+            novos = novos[novos.index >= pd.Timestamp(inicio)]
+            novos = novos[~novos.index.duplicated(keep="last")].sort_index().rename("valor")
+            serie = pd.concat([atual, novos]) if atual is not None and not atual.empty else novos
+            serie = serie[~serie.index.duplicated(keep="last")].sort_index().rename("valor")
+            # Só os pontos novos vão para o disco; muitas partes (ou nenhuma, se o
+            # disco perdeu a série) viram a série inteira numa parte só
+            antigas = self._partes(codigo)
+            if not antigas or len(antigas) >= MAX_PARTES:
+                self._gravar_parte(codigo, serie)
+                for path in antigas:
+                    os.remove(path)
+            elif not novos.empty:
+                self._gravar_parte(codigo, novos)
+            self._frames[codigo] = serie
+        else:
+            serie = atual
+        last_date = serie.index.max().date().isoformat() if serie is not None and not serie.empty else None
+        with self._db:
+            self._db.execute("INSERT OR REPLACE INTO series_meta VALUES (?, ?, ?)", (codigo, agora, last_date))
+
+
+@st.cache_resource
+def get_macro_store():
+    """Armazenamento de séries macro compartilhado pelo processo.
+
+    Com MACRO_DATA_PROVIDER=fixture usa o provedor offline (benchmarks, sem rede).
+    """
+    if os.environ.get("MACRO_DATA_PROVIDER") == "fixture":
+        return MacroStore(FixtureProvider())
+    return MacroStore(BCBProvider())
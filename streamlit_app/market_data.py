@@ -0,0 +1,306 @@
+# streamlit_app/market_data.py
+# Camada de dados de mercado com armazenamento local na frente do yfinance.
+#
+# - Histórico diário em Parquet (um arquivo por ticker); a cada atualização
+#   só as barras que faltam são buscadas e anexadas.
+# - `info` em SQLite com validade (TTL).
+# - `prefetch` atualiza vários tickers numa única chamada ao provedor;
+#   `schedule` faz o mesmo em segundo plano, sem bloquear a página.
+#
+# O provedor é plugável: `YFinanceProvider` para produção e
+# `FixtureProvider` (determinístico, sem rede) para testes e benchmarks.
+
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from instrumentation import record_cache
+from l2_cache import get_l2_cache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DIR = os.environ.get("MARKET_DATA_DIR", os.path.join(tempfile.gettempdir(), "dashaws_market_data"))
+COLUNAS_OHLCV = ["Open", "High", "Low", "Close", "Volume"]
+
+
+class YFinanceProvider:
+    """Busca dados no Yahoo Finance. O yfinance só é importado no primeiro uso."""
+
+    def info(self, ticker):
+        import yfinance as yf
+        return yf.Ticker(ticker).info
+
+    def history(self, tickers, start):
+        """Retorna {ticker: DataFrame OHLCV} a partir de `start`, numa só requisição."""
+        import yfinance as yf
+        df = yf.download(
+            list(tickers), start=start, group_by="ticker", auto_adjust=False,
+            progress=False, threads=True,
+        )
+        resultado = {}
+        for ticker in tickers:
+            if isinstance(df.columns, pd.MultiIndex):
+                if ticker not in df.columns.get_level_values(0):
+                    continue
+                parte = df[ticker]
+            else:
+                parte = df
+            resultado[ticker] = parte[COLUNAS_OHLCV].dropna(how="all")
+        return resultado
+
+
+class FixtureProvider:
+    """Provedor offline: séries sintéticas determinísticas por ticker.
+
+    `latency` simula o tempo de rede por chamada; `calls` conta as chamadas.
+    """
+
+    def __init__(self, latency=0.0, today=None):
+        self.latency = latency
+        self.today = today
+        self.calls = {"info": 0, "history": 0}
+
+    def _seed(self, ticker):
+        return zlib.crc32(ticker.encode())
+
+    def info(self, ticker):
+        self.calls["info"] += 1
+        time.sleep(self.latency)
+        rng = np.random.default_rng(self._seed(ticker))
+        preco = float(rng.uniform(5, 100))
+        return {
+            "longName": f"{ticker} Fixture S.A.", "currency": "BRL", "currentPrice": preco,
+            "regularMarketChange": preco * 0.01, "regularMarketChangePercent": 0.01,
+            "marketCap": float(rng.uniform(1e9, 1e11)), "trailingPE": float(rng.uniform(3, 30)),
+            "dividendYield": float(rng.uniform(0, 0.1)),
+        }
+
+    def history(self, tickers, start):
+        self.calls["history"] += 1
+        time.sleep(self.latency)
+        fim = self.today or date.today()
+        # Série completa a partir de uma data fixa, recortada em `start`: o mesmo
+        # dia sempre tem o mesmo preço, independentemente da janela pedida.
+        datas = pd.bdate_range("2000-01-03", fim)
+        resultado = {}
+        for ticker in tickers:
+            rng = np.random.default_rng(self._seed(ticker))
+            close = 20 * np.exp(np.cumsum(rng.normal(0, 0.02, len(datas))))
+            df = pd.DataFrame({
+                "Open": close * 0.995, "High": close * 1.01, "Low": close * 0.99,
+                "Close": close, "Volume": rng.integers(1e5, 1e7, len(datas)).astype(float),
+            }, index=pd.DatetimeIndex(datas, name="Date"))
+            resultado[ticker] = df[df.index >= pd.Timestamp(start)]
+        return resultado
+
+
+class L2Provider:
+    """Provedor na frente de outro, com os resultados compartilhados entre instâncias pelo cache L2.
+
+    O histórico é guardado por ticker (instâncias com pedidos diferentes
+    ainda aproveitam os tickers em comum); os que faltam são buscados numa
+    única chamada, sob a trava do cache, enquanto as outras instâncias esperam.
+    """
+
+    def __init__(self, provider, l2, info_ttl=6 * 3600, history_ttl=3600):
+        self.provider = provider
+        self.l2 = l2
+        self.info_ttl = info_ttl
+        self.history_ttl = history_ttl
+
+    def info(self, ticker):
+        chave = self.l2.chave("market_data.info", ticker)
+        return self.l2.get_or_compute(chave, self.info_ttl, lambda: self.provider.info(ticker), nome="l2.market_data")
+
+    def history(self, tickers, start):
+        hoje = date.today().isoformat()
+        chaves = {t: self.l2.chave("market_data.history", t, str(start), hoje) for t in tickers}
+        resultado = {}
+        for ticker, chave in chaves.items():
+            df = self.l2.get(chave)
+            if df is not None:
+                resultado[ticker] = df
+        faltando = sorted(set(tickers) - set(resultado))
+        if not faltando:
+            return resultado
+        buscados = {}
+
+        def buscar():
+            buscados.update(self.provider.history(faltando, start))
+            for ticker, df in buscados.items():
+                self.l2.set(chaves[ticker], df, self.history_ttl)
+            return sorted(buscados)
+
+        lote = self.l2.chave("market_data.history.lote", faltando, str(start), hoje)
+        self.l2.get_or_compute(lote, self.history_ttl, buscar, nome="l2.market_data")
+        for ticker in faltando:
+            # Buscado aqui ou por outra instância (que gravou cada ticker antes de liberar a trava)
+            df = buscados.get(ticker)
+            resultado[ticker] = df if df is not None else self.l2.get(chaves[ticker])
+        return {t: df for t, df in resultado.items() if df is not None}
+
+
+class MarketDataStore:
+    """Histórico e `info` persistidos localmente, atualizados de forma incremental."""
+
+    def __init__(self, provider, root=DEFAULT_DIR, info_ttl=6 * 3600, history_ttl=3600, history_days=365, max_workers=1):
+        self.provider = provider
+        self.root = root
+        self.info_ttl = info_ttl
+        self.history_ttl = history_ttl
+        self.history_days = history_days
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="market-data-prefetch")
+        self._lock = threading.Lock()
+        self._frames = {}
+        self._em_andamento = set()
+        os.makedirs(os.path.join(root, "history"), exist_ok=True)
+        self._db = sqlite3.connect(os.path.join(root, "market_data.sqlite"), check_same_thread=False)
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS info (ticker TEXT PRIMARY KEY, fetched_at REAL, payload TEXT);
+            CREATE TABLE IF NOT EXISTS history_meta (ticker TEXT PRIMARY KEY, fetched_at REAL, last_date TEXT);
+        """)
+
+    # --- info ---
+    def info(self, ticker):
+        """`info` do ticker, do armazenamento local enquanto estiver dentro do TTL."""
+        with self._lock:
+            row = self._db.execute("SELECT fetched_at, payload FROM info WHERE ticker = ?", (ticker,)).fetchone()
+        valido = bool(row) and time.time() - row[0] < self.info_ttl
+        record_cache("market_data.info", hit=valido)
+        if valido:
+            return json.loads(row[1])
+        payload = self.provider.info(ticker)
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO info VALUES (?, ?, ?)",
+                (ticker, time.time(), json.dumps(payload, default=str)),
+            )
+        return payload
+
+    # --- histórico ---
+    def history(self, ticker, period_days=None):
+        """Histórico diário dos últimos `period_days` dias (padrão: `history_days`)."""
+        self.prefetch([ticker])
+        inicio = pd.Timestamp(date.today() - timedelta(days=period_days or self.history_days))
+        df = self._load(ticker)
+        return df[df.index >= inicio]
+
+    def pendentes(self, tickers):
+        """{ticker: data de início} dos tickers vencidos: a última barra guardada, ou `history_days` atrás."""
+        tickers = list(dict.fromkeys(tickers))
+        with self._lock:
+            meta = {
+                r[0]: (r[1], r[2]) for r in self._db.execute(
+                    f"SELECT ticker, fetched_at, last_date FROM history_meta "
+                    f"WHERE ticker IN ({','.join('?' * len(tickers))})", tickers
+                )
+            } if tickers else {}
+        agora = time.time()
+        inicio_padrao = date.today() - timedelta(days=self.history_days)
+        pendentes = {}
+        for ticker in tickers:
+            if ticker not in meta:
+                pendentes[ticker] = inicio_padrao
+                continue
+            fetched_at, last_date = meta[ticker]
+            if agora - fetched_at < self.history_ttl:
+                continue
+            # Rebusca a partir da última barra, que pode ter sido parcial (pregão em curso)
+            pendentes[ticker] = date.fromisoformat(last_date) if last_date else inicio_padrao
+        return pendentes
+
+    def prefetch(self, tickers):
+        """Atualiza (de forma síncrona) de uma vez todos os tickers vencidos, buscando só as barras que faltam."""
+        tickers = list(dict.fromkeys(tickers))
+        pendentes = self.pendentes(tickers)
+        for ticker in tickers:
+            record_cache("market_data.history", hit=ticker not in pendentes)
+        if not pendentes:
+            return []
+
+        agora = time.time()
+        novos = self.provider.history(list(pendentes), min(pendentes.values()))
+        with self._lock:
+            for ticker, inicio in pendentes.items():
+                df_novo = novos.get(ticker)
+                if df_novo is None:
+                    df_novo = pd.DataFrame(columns=COLUNAS_OHLCV, index=pd.DatetimeIndex([], name="Date"))
+                df_novo = df_novo[df_novo.index >= pd.Timestamp(inicio)]
+                self._append(ticker, df_novo, agora)
+        return list(pendentes)
+
+    def schedule(self, tickers):
+        """Agenda em segundo plano o `prefetch` dos tickers vencidos; não bloqueia a página."""
+        with self._lock:
+            livres = [t for t in dict.fromkeys(tickers) if t not in self._em_andamento]
+        pendentes = list(self.pendentes(livres)) if livres else []
+        with self._lock:
+            pendentes = [t for t in pendentes if t not in self._em_andamento]
+            self._em_andamento.update(pendentes)
+        if pendentes:
+            self._executor.submit(self._run, pendentes)
+        return pendentes
+
+    def _run(self, tickers):
+        try:
+            self.prefetch(tickers)
+        except Exception:
+            logger.warning("pré-carga do histórico de mercado falhou", exc_info=True)
+        finally:
+            with self._lock:
+                self._em_andamento.difference_update(tickers)
+
+    def _path(self, ticker):
+        return os.path.join(self.root, "history", f"{ticker.replace('/', '_')}.parquet")
+
+    def _load(self, ticker):
+        with self._lock:
+            df = self._frames.get(ticker)
+            if df is None:
+                path = self._path(ticker)
+                df = pd.read_parquet(path) if os.path.exists(path) else pd.DataFrame(
+                    columns=COLUNAS_OHLCV, index=pd.DatetimeIndex([], name="Date"))
+                self._frames[ticker] = df
+            return df
+
+    def _append(self, ticker, df_novo, agora):
+        # Chamado com o lock adquirido
+        path = self._path(ticker)
+        atual = self._frames.get(ticker)
+        if atual is None and os.path.exists(path):
+            atual = pd.read_parquet(path)
+        if atual is not None and not atual.empty:
+            df_novo = pd.concat([atual[~atual.index.isin(df_novo.index)], df_novo]).sort_index()
+        df_novo = df_novo[COLUNAS_OHLCV].astype(float)
+        indice = pd.DatetimeIndex(df_novo.index, name="Date")
+        df_novo.index = indice.tz_localize(None) if indice.tz is not None else indice
+        df_novo.to_parquet(path)
+        self._frames[ticker] = df_novo
+        last_date = df_novo.index.max().date().isoformat() if not df_novo.empty else None
+        with self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO history_meta VALUES (?, ?, ?)", (ticker, agora, last_date)
+            )
+
+
+@st.cache_resource
+def get_market_data_store():
+    """Armazenamento de dados de mercado compartilhado pelo processo.
+
+    Com MARKET_DATA_PROVIDER=fixture usa o provedor offline (benchmarks, sem rede);
+    com o cache L2 configurado, as chamadas ao provedor são compartilhadas entre instâncias.
+    """
+    provider = FixtureProvider() if os.environ.get("MARKET_DATA_PROVIDER") == "fixture" else YFinanceProvider()
+    l2 = get_l2_cache()
+    return MarketDataStore(L2Provider(provider, l2) if l2 is not None else provider)
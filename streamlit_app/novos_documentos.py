@@ -0,0 +1,91 @@
+# streamlit_app/novos_documentos.py
+# Alertas de documentos novos da CVM para as empresas da carteira.
+#
+# Um único feed por processo guarda a marca d'água (data_entrega, id) do
+# último documento visto e um anel com os alertas mais recentes. Quando
+# `cvm_documentos_ipe` muda (contadores do pg_stat_user_tables), só os
+# documentos acima da marca são lidos, para a união das empresas da
+# carteira; todas as sessões leem o mesmo anel. Se a carteira muda, o anel é
+# refeito com os documentos dos últimos `dias`.
+
+import threading
+import time
+from collections import deque
+from datetime import date, timedelta
+
+import pandas as pd
+import streamlit as st
+from sqlalchemy import text
+
+from db import read_sql
+from documentos_cvm import COLUNAS
+from instrumentation import record_cache
+from shared_cache import get_table_watcher
+
+
+class FeedDocumentos:
+    """Anel de documentos recentes das empresas da carteira, atualizado pela marca d'água."""
+
+    def __init__(self, watcher, tamanho=50, dias=7, max_age=300):
+        self.watcher = watcher
+        self.dias = dias
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._anel = deque(maxlen=tamanho)
+        self._empresas = None
+        self._marca = None
+        self._fingerprint = None
+        self._checked_at = 0.0
+
+    def get(self, engine, empresas):
+        """DataFrame dos alertas dos últimos `dias` (mais recentes primeiro) das `empresas`."""
+        empresas = tuple(sorted(set(empresas)))
+        with self._lock:
+            fingerprint = self.watcher.fingerprints(engine, ["cvm_documentos_ipe"])["cvm_documentos_ipe"]
+            vencido = time.monotonic() - self._checked_at >= self.max_age
+            recarregar = empresas != self._empresas
+            buscar = recarregar or fingerprint != self._fingerprint or (fingerprint is None and vencido)
+            record_cache("novos_documentos", hit=not buscar)
+            if buscar:
+                self._atualizar(engine, empresas, recarregar, fingerprint)
+                self._fingerprint = fingerprint
+                self._checked_at = time.monotonic()
+            df = pd.DataFrame(list(self._anel), columns=COLUNAS.split(", "))
+        if df.empty:
+            return df
+        return df[df["data_entrega"] >= pd.Timestamp(date.today() - timedelta(days=self.dias))]
+
+    def _atualizar(self, engine, empresas, recarregar, versao=None):
+        if recarregar:
+            self._anel.clear()
+            self._empresas = empresas
+            self._marca = None
+        if not empresas:
+            return
+        # Sem marca (início ou carteira nova), a janela de `dias`; depois, só o que passou da marca
+        if self._marca is None:
+            where, params = "data_entrega >= :inicio", {"inicio": date.today() - timedelta(days=self.dias)}
+        else:
+            where = "(data_entrega, id) > (:marca_data, :marca_id)"
+            params = {"marca_data": self._marca[0], "marca_id": self._marca[1]}
+        query = text(f"""
+            SELECT {COLUNAS} FROM cvm_documentos_ipe
+            WHERE nome_companhia = ANY(:nomes) AND {where}
+            ORDER BY data_entrega, id
+        """)
+        # Sem a versão da tabela (catálogo ilegível), vai sempre ao banco: o L2 daria a leitura anterior
+        cache_ttl = self.max_age if versao is not None else None
+        df = read_sql(query, engine, cache_ttl=cache_ttl, versao=versao, params={"nomes": list(empresas), **params})
+        if df.empty:
+            return
+        ultima = df.iloc[-1]
+        self._marca = (ultima["data_entrega"], int(ultima["id"]))
+        df["data_entrega"] = pd.to_datetime(df["data_entrega"])
+        # Mais recentes à esquerda; o anel descarta os mais antigos
+        self._anel.extendleft(df.itertuples(index=False, name=None))
+
+
+@st.cache_resource
+def get_feed_documentos():
+    """Feed de documentos novos compartilhado pelo processo."""
+    return FeedDocumentos(get_table_watcher())
@@ -0,0 +1,25 @@
+# streamlit_app/paginas/__init__.py
+# Uma página do dashboard por módulo.
+#
+# O app_aws.py só conhece as páginas pelo caminho "módulo:função"; o módulo
+# (e as dependências pesadas que ele importa, como plotly e yfinance) só é
+# carregado quando a página é selecionada pela primeira vez no processo.
+
+import importlib
+import sys
+
+from instrumentation import timed
+
+
+def load_page(spec):
+    """Resolve 'modulo:funcao' (relativo a este pacote) para a função da página."""
+    if callable(spec):
+        return spec
+    modulo, funcao = spec.split(":")
+    nome = f"{__name__}.{modulo}"
+    if nome in sys.modules:
+        return getattr(sys.modules[nome], funcao)
+    # Primeira seleção no processo: mede o custo de importar a página
+    with timed("import", modulo):
+        return getattr(importlib.import_module(nome), funcao)
+
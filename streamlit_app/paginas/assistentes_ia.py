@@ -0,0 +1,18 @@
+# streamlit_app/paginas/assistentes_ia.py
+# Página Assistentes de IA (backend embutido por iframe).
+
+import streamlit as st
+
+
+# =================================================================
+# NOVA PÁGINA: Assistentes de IA
+# =================================================================
+def assistentes_ia_page(engine):
+    st.title("🤖 Assistentes de IA")
+    st.info("Esta é a sua central de assistentes de IA, integrada à plataforma.")
+
+    # --- Use a URL que o AWS App Runner forneceu para o seu backend de assistentes ---
+    ASSISTENTE_URL = "https://ikr3ycmefq.us-east-2.awsapprunner.com "
+    
+    # Usa o componente de iframe do Streamlit para embutir a outra aplicação
+    st.components.v1.iframe(ASSISTENTE_URL, height=800, scrolling=True)
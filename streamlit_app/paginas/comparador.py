@@ -0,0 +1,81 @@
+# streamlit_app/paginas/comparador.py
+# Página Comparador de Empresas.
+
+import plotly.graph_objects as go
+import streamlit as st
+
+from comparador import MAX_EMPRESAS, get_comparacao
+from demonstracoes_cache import TIPOS_DEMONSTRACAO
+from empresas_index import get_empresas_index
+from indicadores import INDICADORES
+from paginas.tabelas import Formato, demonstrativo, tabela
+
+
+# =================================================================
+# PÁGINA: Comparador de Empresas
+# =================================================================
+def comparador_empresas_page(engine):
+    st.title("⚖️ Comparador de Empresas")
+
+    try:
+        empresas_index = get_empresas_index(engine)
+    except Exception as e:
+        st.error(f"Erro ao carregar a lista de empresas. Execute os pipelines ETL. Detalhes: {e}")
+        return
+
+    cols_filtros = st.columns([3, 1, 1])
+    selecao = cols_filtros[0].multiselect(
+        f"Empresas (até {MAX_EMPRESAS})", options=empresas_index.display_list,
+        max_selections=MAX_EMPRESAS, key="comparador_empresas",
+    )
+    periodo = cols_filtros[1].radio("Período", ["Anual", "Trimestral"], horizontal=True, key="comparador_periodo")
+    unidade = cols_filtros[2].radio("Valores em", ["Milhares", "Milhões"], horizontal=True, key="comparador_unidade")
+    divisor = 1000 if unidade == "Milhões" else 1
+
+    if not selecao:
+        st.info("Selecione as empresas que deseja comparar.")
+        return
+    empresas = list(dict.fromkeys(empresas_index.display_to_empresa[s] for s in selecao))
+
+    try:
+        # Uma consulta para as empresas que ainda não estão no cache de demonstrações
+        comparacao = get_comparacao(engine, empresas, periodo.upper())
+    except Exception as e:
+        st.error(f"Erro ao buscar dados financeiros: {e}")
+        return
+
+    # --- Indicadores mais recentes ---
+    st.subheader("Indicadores mais recentes")
+    matriz = comparacao.indicadores()
+    df_ultimos = matriz.ultimos()
+    if df_ultimos.empty:
+        st.info("Nenhuma das empresas selecionadas tem dados para este período.")
+        return
+    df_ultimos.insert(0, "Tickers", [", ".join(empresas_index.tickers(e)) for e in df_ultimos.index])
+    df_display = df_ultimos.reset_index().rename(columns={"denom_cia": "Empresa", "data": "Data", **INDICADORES})
+    tabela(
+        df_display, {rotulo: Formato(2) for rotulo in INDICADORES.values()},
+        hide_index=True, use_container_width=True,
+        column_config={"Data": st.column_config.DateColumn("Data", format="DD/MM/YYYY")},
+    )
+
+    # --- Evolução de um indicador ---
+    nome = st.selectbox("Indicador", options=list(INDICADORES), format_func=INDICADORES.get, key="comparador_indicador")
+    df_indicador = matriz.indicador(nome).dropna(how="all", axis=1)
+    fig = go.Figure([
+        go.Scatter(x=df_indicador.columns, y=linha.to_numpy(), mode="lines+markers", name=empresa, connectgaps=True)
+        for empresa, linha in df_indicador.iterrows()
+    ])
+    fig.update_layout(height=400, yaxis_title=INDICADORES[nome], margin=dict(l=0, r=0, t=10, b=0))
+    st.plotly_chart(fig, use_container_width=True)
+
+    # --- Uma conta de demonstração, lado a lado ---
+    st.subheader("Contas das demonstrações")
+    cols_conta = st.columns([1, 3])
+    tipo = cols_conta[0].radio("Demonstração", TIPOS_DEMONSTRACAO, horizontal=True, key="comparador_tipo")
+    contas = comparacao.contas_disponiveis(tipo)
+    if not contas:
+        st.info(f"Nenhuma das empresas tem dados de {tipo} neste período.")
+        return
+    cd_conta = cols_conta[1].selectbox("Conta", options=list(contas), format_func=contas.get, key="comparador_conta")
+    demonstrativo(comparacao.conta(tipo, cd_conta, divisor).dropna(how="all", axis=1), use_container_width=True)
@@ -0,0 +1,23 @@
+# streamlit_app/paginas/comum.py
+# Funções compartilhadas pelas páginas (tabela da carteira e placeholders).
+
+import streamlit as st
+
+from paginas.tabelas import INTEIRO, INTEIRO_SINAL, MOEDA, PERCENTUAL, PERCENTUAL_SINAL, tabela
+
+FORMATOS_CARTEIRA = {
+    'Cotação': MOEDA, 'Var. Dia (%)': PERCENTUAL_SINAL, 'Contrib. (%)': PERCENTUAL_SINAL,
+    'Quantidade': INTEIRO, 'Posição (R$)': MOEDA, 'Posição (%)': PERCENTUAL,
+    'Posição % Alvo': PERCENTUAL, 'Diferença': PERCENTUAL_SINAL, 'Ajuste (Qtd.)': INTEIRO_SINAL,
+}
+
+
+def tabela_carteira(df, **kwargs):
+    """Exibe a composição da carteira com os formatos de FORMATOS_CARTEIRA."""
+    return tabela(df, FORMATOS_CARTEIRA, **kwargs)
+
+
+def placeholder_page(title, engine):
+    """Função genérica para páginas em construção."""
+    st.title(title)
+    st.info("Página em construção.")
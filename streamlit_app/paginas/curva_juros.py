@@ -0,0 +1,75 @@
+# streamlit_app/paginas/curva_juros.py
+# Página Curva de Juros (DI × pré).
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from plotly.colors import qualitative
+import streamlit as st
+
+from macro_data import VERTICES_DI, get_macro_store
+from paginas.tabelas import Formato, tabela
+
+COMPARACOES = {"Há 1 semana": 7, "Há 1 mês": 30, "Há 6 meses": 182, "Há 1 ano": 365}
+# Prazos fixos (dias úteis) do histórico
+PRAZOS_HISTORICO = {"1 mês": 21, "3 meses": 63, "6 meses": 126, "1 ano": 252}
+CORES = qualitative.Plotly
+
+
+# =================================================================
+# PÁGINA: Curva de Juros
+# =================================================================
+def curva_juros_page(engine):
+    st.title("➿ Curva de Juros")
+
+    # Vértices do armazenamento local; os que estiverem vencidos são atualizados em segundo plano
+    store = get_macro_store()
+    curva = store.curva_di()
+    if store.sincronizando(VERTICES_DI.values()):
+        st.caption("Atualizando vértices da curva em segundo plano…")
+    if not len(curva):
+        st.info("Curva ainda não disponível. Os dados aparecem assim que a primeira sincronização terminar.")
+        st.button("Atualizar")
+        return
+
+    ultima = curva.datas[-1]
+    st.caption(f"Taxa referencial de swaps DI × pré, interpolação flat forward (base 252). Última data: {ultima:%d/%m/%Y}.")
+
+    # --- Curva na última data e em datas de comparação ---
+    comparar = st.multiselect("Comparar com", list(COMPARACOES), default=["Há 1 mês"], key="curva_comparar")
+    datas = [ultima] + [ultima - pd.Timedelta(days=COMPARACOES[c]) for c in comparar]
+    du_vertices = curva.dias_uteis()
+    grade = np.arange(1, int(du_vertices[-1].max()) + 1)
+    # Todas as datas escolhidas e todos os prazos da grade numa só interpolação
+    df_curvas = curva.interpolar(grade, datas=datas)
+    fig = go.Figure()
+    for k, (data, taxas) in enumerate(df_curvas.iterrows()):
+        i = curva.datas.get_loc(data)
+        cor = CORES[k % len(CORES)]
+        fig.add_trace(go.Scatter(x=grade, y=taxas.to_numpy(), mode="lines", name=f"{data:%d/%m/%Y}", line_color=cor))
+        fig.add_trace(go.Scatter(
+            x=du_vertices[i], y=curva.taxas[i], mode="markers", showlegend=False,
+            marker_color=cor, hovertemplate="%{x} du: %{y:.2f}%<extra></extra>",
+        ))
+    fig.update_layout(height=420, xaxis_title="Prazo (dias úteis)", yaxis_title="% a.a.", margin=dict(l=0, r=0, t=10, b=0))
+    st.plotly_chart(fig, use_container_width=True)
+
+    df_vertices = pd.DataFrame(curva.taxas[curva.posicoes(datas)], columns=[f"{p} dias" for p in curva.prazos])
+    df_vertices.insert(0, "Data", df_curvas.index)
+    tabela(
+        df_vertices, Formato(2), hide_index=True, use_container_width=True,
+        column_config={"Data": st.column_config.DateColumn("Data", format="DD/MM/YYYY")},
+    )
+
+    # --- Histórico de prazos fixos ---
+    st.subheader("Histórico por prazo")
+    prazos = st.multiselect("Prazos", list(PRAZOS_HISTORICO), default=["1 mês", "1 ano"], key="curva_prazos")
+    if prazos:
+        # Uma chamada para todas as datas × prazos escolhidos
+        df_hist = curva.interpolar([PRAZOS_HISTORICO[p] for p in prazos])
+        fig_hist = go.Figure([
+            go.Scatter(x=df_hist.index, y=df_hist[PRAZOS_HISTORICO[p]].to_numpy(), mode="lines", name=p)
+            for p in prazos
+        ])
+        fig_hist.update_layout(height=380, yaxis_title="% a.a.", margin=dict(l=0, r=0, t=10, b=0))
+        st.plotly_chart(fig_hist, use_container_width=True)
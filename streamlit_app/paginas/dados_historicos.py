@@ -0,0 +1,98 @@
+# streamlit_app/paginas/dados_historicos.py
+# Página Dados Históricos (demonstrações financeiras da CVM).
+
+import pandas as pd
+import streamlit as st
+
+from demonstracoes_cache import get_demonstracoes
+from empresas_index import get_empresas_index
+from indicadores import CONTAS
+from paginas.tabelas import demonstrativo
+
+
+# =================================================================
+# PÁGINA 3: Dados Históricos
+# =================================================================
+def dados_historicos_page(engine):
+    st.title("📂 Dados Históricos")
+
+    try:
+        # Índice da lista mestra de empresas, compartilhado e reconstruído só quando a tabela muda
+        empresas_index = get_empresas_index(engine)
+        if len(empresas_index) == 0:
+            st.warning("Lista mestra de empresas está vazia. Execute o script 'criar_lista_empresas.py' na VM.")
+            return
+    except Exception as e:
+        st.error(f"Erro ao buscar lista de empresas: {e}")
+        st.info("É provável que a tabela 'dim_empresas' ainda não exista ou esteja vazia.")
+        return
+
+    # --- Lista de seleção (Ticker - Nome da Empresa), já ordenada no índice ---
+    selecao_display = st.selectbox("Selecione a Empresa pelo Ticker", options=empresas_index.display_list)
+    
+    if not selecao_display:
+        return
+
+    # Pega o nome completo da empresa a partir da seleção do ticker
+    empresa_selecionada = empresas_index.display_to_empresa[selecao_display]
+    
+    # O resto da lógica da página permanece quase idêntico
+    cols_filtros = st.columns(4)
+    periodo = cols_filtros[0].radio("Período", ["Anual", "Trimestral"], horizontal=True, key="periodo")
+    unidade = cols_filtros[1].radio("Valores em", ["Milhares", "Milhões"], horizontal=True, key="unidade")
+    divisor = 1000 if unidade == "Milhões" else 1
+
+    # --- Busca dos Dados (demonstrações já pivotadas, cacheadas por empresa/período) ---
+    try:
+        demonstracoes = get_demonstracoes(engine, empresa_selecionada, periodo.upper())
+    except Exception as e:
+        st.error(f"Erro ao buscar dados financeiros: {e}")
+        return
+
+    tab_dre, tab_bp, tab_fc, tab_indicadores = st.tabs(["Histórico de DRE", "Balanço Patrimonial", "Fluxo de Caixa", "Indicadores e Múltiplos"])
+
+    # --- Função auxiliar: a troca de unidade só reescala a matriz em cache ---
+    def criar_pivot_table(tipo_demo):
+        demonstracao = demonstracoes[tipo_demo]
+        if demonstracao.empty: return pd.DataFrame()
+        return demonstracao.to_frame(divisor)
+
+    with tab_dre:
+        df_dre_pivot = criar_pivot_table('DRE')
+        if not df_dre_pivot.empty:
+            demonstrativo(df_dre_pivot)
+        else: st.info("Dados de DRE não disponíveis para esta empresa/período.")
+
+    with tab_bp:
+        df_bpa_pivot = criar_pivot_table('BPA') # Ativo
+        df_bpp_pivot = criar_pivot_table('BPP') # Passivo
+        if not df_bpa_pivot.empty:
+            st.subheader("Ativo")
+            demonstrativo(df_bpa_pivot)
+        if not df_bpp_pivot.empty:
+            st.subheader("Passivo e Patrimônio Líquido")
+            demonstrativo(df_bpp_pivot)
+        if df_bpa_pivot.empty and df_bpp_pivot.empty:
+            st.info("Dados de Balanço Patrimonial não disponíveis.")
+    
+    with tab_fc:
+        df_fc_pivot = criar_pivot_table('DFC')
+        if not df_fc_pivot.empty:
+            demonstrativo(df_fc_pivot)
+        else: st.info("Dados de Fluxo de Caixa não disponíveis.")
+
+    with tab_indicadores:
+        st.subheader("Indicadores e Múltiplos (Em Desenvolvimento)")
+        # Lógica para buscar os dados necessários (ex: Lucro Líquido, PL, etc.)
+        try:
+            lucro_liquido = demonstracoes['DRE'].serie(CONTAS['lucro_liquido'][1])
+            patrimonio_liquido = demonstracoes['BPP'].serie(CONTAS['patrimonio_liquido'][1])
+            
+            if not lucro_liquido.empty and not patrimonio_liquido.empty:
+                roe = (lucro_liquido / patrimonio_liquido) * 100
+                st.write("ROE (Retorno sobre o Patrimônio Líquido)")
+                st.line_chart(roe)
+            else:
+                st.info("Dados insuficientes para calcular ROE.")
+        except Exception as e:
+            st.error(f"Erro ao calcular indicadores: {e}")
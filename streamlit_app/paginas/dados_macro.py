@@ -0,0 +1,72 @@
+# streamlit_app/paginas/dados_macro.py
+# Página Dados Macro (séries do SGS do Banco Central).
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+
+from macro_data import SERIES, get_macro_store
+
+JANELAS = {"1A": 365, "3A": 3 * 365, "5A": 5 * 365}
+
+
+def acumulado_12m(serie):
+    """Variação acumulada em 12 meses (%) de uma série mensal em % a.m."""
+    return np.expm1(np.log1p(serie / 100).rolling(12).sum()) * 100
+
+
+# =================================================================
+# PÁGINA: Dados Macro
+# =================================================================
+def dados_macro_page(engine):
+    st.title("💹 Dados Macro")
+
+    # Só o armazenamento local é lido; séries vencidas são atualizadas em segundo plano
+    store = get_macro_store()
+    codigos = [s.codigo for s in SERIES.values()]
+    df = store.series(codigos)
+    if store.sincronizando(codigos):
+        st.caption("Atualizando séries do Banco Central em segundo plano…")
+    if df.dropna(how="all").empty:
+        st.info("Nenhuma série disponível ainda. Os dados aparecem assim que a primeira sincronização terminar.")
+        st.button("Atualizar")
+        return
+
+    # --- Últimos valores ---
+    cols = st.columns(len(SERIES))
+    for col, serie in zip(cols, SERIES.values()):
+        valores = df[serie.codigo].dropna()
+        if valores.empty:
+            col.metric(serie.nome, "—")
+            continue
+        delta = valores.iloc[-1] - valores.iloc[-2] if len(valores) > 1 else None
+        col.metric(
+            f"{serie.nome} ({serie.unidade})", f"{valores.iloc[-1]:,.2f}",
+            delta=f"{delta:+,.2f}" if delta is not None else None,
+            help=f"SGS {serie.codigo}, em {valores.index[-1]:%d/%m/%Y}",
+        )
+
+    # --- Gráficos ---
+    opcoes = st.columns([2, 1])
+    janela = opcoes[0].radio("Período", list(JANELAS), index=1, horizontal=True, key="macro_janela")
+    acumular = opcoes[1].toggle("Inflação acumulada em 12 meses", value=True, key="macro_12m")
+    inicio = df.index.max() - pd.Timedelta(days=JANELAS[janela])
+
+    series = list(SERIES.values())
+    for i in range(0, len(series), 2):
+        cols_graficos = st.columns(2)
+        for col, serie in zip(cols_graficos, series[i:i + 2]):
+            valores = df[serie.codigo].dropna()
+            unidade = serie.unidade
+            if acumular and serie.unidade == "% a.m.":
+                valores, unidade = acumulado_12m(valores), "% em 12 meses"
+            valores = valores[valores.index >= inicio]
+            col.markdown(f"###### {serie.nome} ({unidade})")
+            if valores.empty:
+                col.info("Sem dados no período.")
+                continue
+            tipo = go.Bar if serie.frequencia == "M" and not (acumular and serie.unidade == "% a.m.") else go.Scatter
+            fig = go.Figure(tipo(x=valores.index, y=valores.to_numpy(), name=serie.nome))
+            fig.update_layout(height=280, margin=dict(l=0, r=0, t=10, b=0))
+            col.plotly_chart(fig, use_container_width=True)
@@ -0,0 +1,148 @@
+# streamlit_app/paginas/documentos.py
+# Página Documentos CVM.
+
+from datetime import datetime, timedelta
+from functools import partial
+
+import streamlit as st
+
+import documentos_cvm
+from db import fetch_parallel
+from document_cache import DocumentoGrande, get_document_cache
+from empresas_index import get_empresas_index
+
+
+# =================================================================
+# PÁGINA: Documentos CVM (VERSÃO FINAL COM TABELA)
+# =================================================================
+def documentos_cvm_page(engine):
+    st.title("📄 Documentos CVM")
+
+    try:
+        empresas_index = get_empresas_index(engine)
+        lista_categorias = ["Todas"] + documentos_cvm.get_categorias(engine)
+    except Exception as e:
+        st.error(f"Erro ao carregar filtros. Execute os pipelines ETL. Detalhes: {e}")
+        return
+
+    # --- Filtros ---
+    st.subheader("Filtros")
+    cols_filtros = st.columns(3)
+    selecao_display = cols_filtros[0].selectbox("Filtrar por Empresa", options=["Todas as Empresas"] + empresas_index.display_list)
+    empresa_selecionada = empresas_index.display_to_empresa.get(selecao_display, "Todas")
+    
+    categoria_selecionada = cols_filtros[1].selectbox("Filtrar por Categoria", options=lista_categorias)
+    
+    with cols_filtros[2]:
+        end_date = datetime.now().date()
+        start_date = end_date - timedelta(days=90)
+        date_range = st.date_input("Filtrar por Período de Publicação", value=(start_date, end_date))
+    
+    if len(date_range) != 2:
+        st.warning("Por favor, selecione um intervalo de datas válido.")
+        st.stop()
+    start_date_filter, end_date_filter = date_range
+
+    filtro = documentos_cvm.FiltroDocumentos(
+        start_date=start_date_filter,
+        end_date=end_date_filter,
+        empresa=None if empresa_selecionada == "Todas" else empresa_selecionada,
+        categoria=None if categoria_selecionada == "Todas" else categoria_selecionada,
+    )
+
+    # --- Paginação por chave: guarda os cursores das páginas já visitadas ---
+    tamanho_pagina = cols_filtros[0].selectbox("Documentos por página", options=[50, 100, 250], index=1)
+    estado_pagina = (filtro, tamanho_pagina)
+    if st.session_state.get("docs_filtro") != estado_pagina:
+        st.session_state["docs_filtro"] = estado_pagina
+        st.session_state["docs_cursores"] = [None]
+    cursores = st.session_state["docs_cursores"]
+
+    try:
+        # Contagem e página são independentes: rodam em paralelo
+        resultados = fetch_parallel(engine, {
+            "total": partial(documentos_cvm.count_documentos, engine, filtro),
+            "pagina": partial(documentos_cvm.fetch_page, engine, filtro, cursor=cursores[-1], limit=tamanho_pagina),
+        })
+        total_documentos, df_documentos = resultados["total"], resultados["pagina"]
+    except Exception as e:
+        st.error(f"Erro ao buscar documentos: {e}")
+        return
+
+    st.markdown("---")
+    pagina_atual = len(cursores)
+    total_paginas = max(1, -(-total_documentos // tamanho_pagina))
+    st.subheader(f"{total_documentos} documentos encontrados (página {pagina_atual} de {total_paginas})")
+
+    cols_nav = st.columns([1, 1, 4])
+    if cols_nav[0].button("◀ Anterior", disabled=pagina_atual == 1):
+        cursores.pop()
+        st.rerun()
+    if cols_nav[1].button("Próxima ▶", disabled=pagina_atual >= total_paginas or df_documentos.empty):
+        cursores.append(documentos_cvm.next_cursor(df_documentos))
+        st.rerun()
+
+    # --- Exibição em Tabela Interativa ---
+    if not df_documentos.empty:
+        df_display = df_documentos.rename(columns={
+            'data_entrega': 'Data',
+            'nome_companhia': 'Empresa',
+            'categoria': 'Categoria',
+            'assunto': 'Assunto'
+        })
+        
+        evento = st.dataframe(
+            df_display,
+            use_container_width=True,
+            hide_index=True,
+            on_select="rerun",
+            selection_mode="single-row",
+            key="docs_tabela",
+            column_config={
+                "Data": st.column_config.DateColumn(
+                    "Data",
+                    format="DD/MM/YYYY",
+                ),
+                "link_download": st.column_config.LinkColumn(
+                    "Link",
+                    display_text="Abrir 📄",
+                    width="small"
+                )
+            },
+            column_order=["Data", "Empresa", "Categoria", "Assunto", "link_download"]
+        )
+
+        # PDF da linha selecionada, servido pelo cache em disco
+        linhas = evento.selection.rows
+        if linhas:
+            documento = df_documentos.iloc[linhas[0]]
+            st.caption(f"Selecionado: {documento['nome_companhia']} - {documento['assunto']}")
+            if st.button("Preparar PDF", key="docs_preparar_pdf"):
+                try:
+                    conteudo = get_document_cache().read(documento['link_download'])
+                except DocumentoGrande as e:
+                    # Grande demais para servir pela memória do app: vai direto à CVM
+                    st.warning(f"PDF grande demais para o download pelo painel ({e}).")
+                    st.link_button("Abrir no site da CVM", documento['link_download'])
+                except Exception as e:
+                    st.error(f"Não foi possível baixar o PDF: {e}")
+                else:
+                    st.download_button("Baixar PDF", data=conteudo, file_name=f"documento_{documento['id']}.pdf", mime="application/pdf")
+    else:
+        st.info("Nenhum documento encontrado com os filtros selecionados.")
+
+    # --- Exportação: gerada sob demanda, lendo o resultado em blocos ---
+    if total_documentos and st.button("Preparar exportação (CSV)"):
+        arquivo_csv = documentos_cvm.export_csv(engine, filtro)
+        st.download_button("Baixar CSV", data=arquivo_csv, file_name="documentos_cvm.csv", mime="text/csv")
+
+    # --- Verificação dos índices que mantêm a latência da página constante ---
+    try:
+        indices_ausentes = documentos_cvm.missing_indexes(engine)
+    except Exception:
+        indices_ausentes = []
+    if indices_ausentes:
+        with st.expander("⚠️ Índices recomendados ausentes"):
+            st.caption("Sem eles, a contagem e a paginação fazem varredura completa da tabela.")
+            st.code(";\n".join(documentos_cvm.INDEXES[nome] for nome in indices_ausentes) + ";", language="sql")
+            st.caption("Crie-os com `python criar_indices.py` (fora do horário de carga do ETL).")
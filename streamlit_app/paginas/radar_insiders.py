@@ -0,0 +1,104 @@
+# streamlit_app/paginas/radar_insiders.py
+# Página Radar de Insiders (CVM 44).
+
+import plotly.graph_objects as go
+import streamlit as st
+
+from empresas_index import get_empresas_index
+from insiders import INDEX_SQL, get_radar_insiders
+from shared_cache import get_portfolio_snapshot
+
+
+# =================================================================
+# PÁGINA: Radar de Insiders (CVM 44)
+# =================================================================
+def radar_insiders_page(engine):
+    st.title("📡 Radar de Insiders (CVM 44)")
+
+    try:
+        # Transações resolvidas e fluxos pré-agregados, compartilhados pelo processo
+        radar = get_radar_insiders(engine)
+    except Exception as e:
+        st.error(f"Erro ao carregar as movimentações de insiders. Execute o pipeline ETL. Detalhes: {e}")
+        return
+    if not radar.posicoes:
+        st.info("Nenhuma movimentação de insiders disponível. Execute o pipeline ETL.")
+        return
+
+    # --- Filtros ---
+    cols_filtros = st.columns([1, 2, 1])
+    dias = cols_filtros[0].selectbox("Período", options=[7, 30, 90, 180, 365], index=1, format_func=lambda d: f"Últimos {d} dias")
+    categorias = cols_filtros[1].multiselect(
+        "Categorias de insider", options=sorted(radar.diario["categoria"].dropna().unique()), placeholder="Todas",
+    )
+    empresas_filtro = None
+    if cols_filtros[2].toggle("Só empresas da carteira"):
+        try:
+            df_config = get_portfolio_snapshot().get(engine).config
+            empresas_filtro = get_empresas_index(engine).empresas_dos_tickers(df_config['ticker'].dropna())
+        except Exception as e:
+            st.warning(f"Não foi possível carregar a carteira: {e}")
+
+    # --- Ranking por fluxo líquido ---
+    ranking = radar.ranking(dias, categorias=categorias, empresas=empresas_filtro)
+    st.subheader(f"Fluxo líquido por empresa (últimos {dias} dias)")
+    if ranking.empty:
+        st.info("Nenhuma movimentação no período com os filtros escolhidos.")
+    else:
+        # Maiores saldos compradores e vendedores
+        extremos = ranking[ranking["liquido"] != 0]
+        extremos = extremos if len(extremos) <= 20 else extremos.iloc[list(range(10)) + list(range(-10, 0))]
+        fig = go.Figure(go.Bar(
+            x=extremos["liquido"], y=extremos.index, orientation="h",
+            marker_color=["#2ca02c" if v > 0 else "#d62728" for v in extremos["liquido"]],
+        ))
+        fig.update_layout(yaxis={"autorange": "reversed"}, height=max(300, 28 * len(extremos)), margin=dict(l=0, r=0, t=10, b=0))
+        st.plotly_chart(fig, use_container_width=True)
+        st.dataframe(
+            ranking.reset_index(),
+            hide_index=True,
+            use_container_width=True,
+            column_config={
+                "empresa": st.column_config.TextColumn("Empresa"),
+                "compras": st.column_config.NumberColumn("Compras (R$)", format="%.0f"),
+                "vendas": st.column_config.NumberColumn("Vendas (R$)", format="%.0f"),
+                "liquido": st.column_config.NumberColumn("Líquido (R$)", format="%.0f"),
+                "n": st.column_config.NumberColumn("Operações"),
+            },
+        )
+
+    # --- Detalhe da empresa ---
+    st.markdown("---")
+    opcoes = radar.empresas()
+    escolhida = st.session_state.get("radar_empresa")
+    empresa = st.selectbox("Empresa", options=opcoes, index=opcoes.index(escolhida) if escolhida in opcoes else 0)
+    st.session_state["radar_empresa"] = empresa
+
+    cols_detalhe = st.columns([3, 2])
+    with cols_detalhe[0]:
+        st.subheader("Fluxo líquido mensal por categoria (12 meses)")
+        fluxo = radar.fluxo_mensal(empresa, meses=12)
+        if fluxo.empty:
+            st.info("Sem movimentações no último ano.")
+        else:
+            fig = go.Figure([go.Bar(x=fluxo.index, y=fluxo[categoria], name=categoria) for categoria in fluxo.columns])
+            fig.update_layout(barmode="relative", height=380, margin=dict(l=0, r=0, t=10, b=0))
+            st.plotly_chart(fig, use_container_width=True)
+    with cols_detalhe[1]:
+        st.subheader("Últimas movimentações")
+        st.dataframe(
+            radar.ultimas(empresa, 20)[['data', 'descricao', 'categoria', 'valor']],
+            hide_index=True,
+            use_container_width=True,
+            column_config={
+                "data": st.column_config.DateColumn("Data", format="DD/MM/YYYY"),
+                "valor": st.column_config.NumberColumn("Valor (R$)", format="%.2f"),
+            },
+        )
+
+    if radar.nao_resolvidas:
+        with st.expander(f"⚠️ {len(radar.nao_resolvidas)} companhias sem correspondência em dim_empresas"):
+            st.caption("Estas transações ficam fora do radar até que o nome seja cadastrado em dim_empresas.")
+            st.write(", ".join(radar.nao_resolvidas))
+            st.caption("Índice recomendado para a sincronização incremental (criado por `python criar_indices.py`):")
+            st.code(INDEX_SQL, language="sql")
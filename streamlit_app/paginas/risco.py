@@ -0,0 +1,95 @@
+# streamlit_app/paginas/risco.py
+# Página Risco da Carteira (volatilidade, drawdown, beta, correlação e Sharpe).
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+
+from paginas.tabelas import Formato, tabela
+from retorno_acumulado import reduzir
+from risco import METRICAS, get_risco
+
+PONTOS_GRAFICO = 600
+JANELAS_GRAFICO = {"1A": 365, "3A": 3 * 365, "5A": 5 * 365, "Tudo": None}
+TITULOS = {"volatilidade": "Volatilidade anualizada", "beta": "Beta vs. Ibovespa",
+           "correlacao": "Correlação com o Ibovespa", "sharpe": "Sharpe anualizado (sobre o CDI)"}
+
+
+def _linhas(fig, datas, colunas, nomes, pontos):
+    for valores, nome in zip(colunas, nomes):
+        validos = ~np.isnan(valores)
+        if validos.any():
+            x, y = reduzir(datas[validos], valores[validos], pontos)
+            fig.add_trace(go.Scatter(x=x, y=y, mode="lines", name=nome))
+
+
+# =================================================================
+# PÁGINA: Risco da Carteira
+# =================================================================
+def risco_carteira_page(engine):
+    st.title("🛡️ Risco da Carteira")
+
+    try:
+        # Estado compartilhado: cada linha nova do histórico é aplicada em O(1)
+        risco = get_risco(engine)
+    except Exception as e:
+        st.error(f"Erro ao carregar o histórico da carteira: {e}")
+        return
+    if len(risco) < 2:
+        st.info("Histórico da carteira insuficiente para calcular métricas de risco.")
+        return
+
+    ultimos = risco.ultimos()
+    maior = int(risco.janelas.max())
+    cols = st.columns(4)
+    cols[0].metric("Drawdown atual", f"{risco.drawdown[-1]:.2%}")
+    cols[1].metric("Drawdown máximo", f"{risco.max_drawdown:.2%}")
+    cols[2].metric(f"Volatilidade ({maior} du)", f"{ultimos.loc[maior, 'volatilidade']:.2%}")
+    cols[3].metric(f"Beta ({maior} du)", f"{ultimos.loc[maior, 'beta']:.2f}")
+
+    df_ultimos = pd.DataFrame({
+        "Janela (du)": ultimos.index,
+        "Volatilidade (%)": ultimos["volatilidade"].to_numpy() * 100,
+        "Beta": ultimos["beta"].to_numpy(),
+        "Correlação": ultimos["correlacao"].to_numpy(),
+        "Sharpe": ultimos["sharpe"].to_numpy(),
+    })
+    tabela(df_ultimos, {
+        "Volatilidade (%)": Formato(2, percentual=True), "Beta": Formato(2),
+        "Correlação": Formato(2), "Sharpe": Formato(2, sinal=True),
+    }, hide_index=True, use_container_width=True)
+
+    opcoes = st.columns([2, 3])
+    periodo = opcoes[0].radio("Período", list(JANELAS_GRAFICO), index=1, horizontal=True, key="risco_periodo")
+    janelas = opcoes[1].multiselect("Janelas (dias úteis)", list(risco.janelas), default=[21, maior], key="risco_janelas")
+    dias = JANELAS_GRAFICO[periodo]
+    inicio = int(np.searchsorted(risco.datas, risco.datas[-1] - np.timedelta64(dias, "D"))) if dias else 0
+    datas = risco.datas[inicio:]
+    posicoes = [int(np.flatnonzero(risco.janelas == j)[0]) for j in janelas]
+
+    # --- Drawdown ---
+    st.markdown("###### Drawdown")
+    x, y = reduzir(datas, risco.drawdown[inicio:], PONTOS_GRAFICO)
+    fig_dd = go.Figure(go.Scatter(x=x, y=y, fill="tozeroy", mode="lines", line_color="#ef4444", name="Drawdown"))
+    fig_dd.update_layout(height=260, yaxis_tickformat=".0%", margin=dict(l=0, r=0, t=10, b=0))
+    st.plotly_chart(fig_dd, use_container_width=True)
+
+    # --- Métricas móveis, uma linha por janela ---
+    if not janelas:
+        st.info("Escolha ao menos uma janela.")
+        return
+    cols_graficos = st.columns(2)
+    for k, nome in enumerate(TITULOS):
+        indice = METRICAS.index(nome)
+        fig = go.Figure()
+        _linhas(fig, datas, [risco.valores[inicio:, p, indice] for p in posicoes], [f"{j} du" for j in janelas], PONTOS_GRAFICO)
+        if nome == "volatilidade":
+            fig.update_layout(yaxis_tickformat=".0%")
+        fig.update_layout(height=300, margin=dict(l=0, r=0, t=10, b=0))
+        with cols_graficos[k % 2]:
+            st.markdown(f"###### {TITULOS[nome]}")
+            if nome == "sharpe" and risco.rf_pendente:
+                st.caption("Série do CDI ainda não sincronizada; o Sharpe é recalculado quando ela chegar.")
+                continue
+            st.plotly_chart(fig, use_container_width=True)
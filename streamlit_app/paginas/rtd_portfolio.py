@@ -0,0 +1,338 @@
+# streamlit_app/paginas/rtd_portfolio.py
+# Página Carteira em Tempo Real (RTD) e configuração da carteira.
+
+from functools import partial
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+
+import instrumentation
+from db import fetch_parallel
+from document_cache import get_document_prefetcher
+from empresas_index import get_empresas_index_cache
+from intradiario import get_serie_intradiaria
+from novos_documentos import get_feed_documentos
+from paginas.comum import tabela_carteira
+from paginas.tabelas import INTEIRO, INTEIRO_SINAL, MOEDA, PERCENTUAL, tabela
+from persistence import diff_portfolio, save_portfolio_diff, upsert_metrics
+from portfolio_analytics import build_portfolio, lote_padrao, parse_metrics, rebalancear
+from quote_feed import feed_config, get_quote_feed
+from retorno_acumulado import get_retorno_acumulado_cache, reduzir
+from shared_cache import get_portfolio_snapshot
+
+# Pontos por série no gráfico de retorno (~1 por pixel da coluna em layout wide)
+PONTOS_GRAFICO = 600
+JANELAS_RETORNO = {"1A": 365, "3A": 3 * 365, "5A": 5 * 365, "Tudo": None}
+# Ativos com linha própria na atribuição intradiária; o resto vira "Outros"
+ATIVOS_ATRIBUICAO = 8
+# Grade de choques de mercado da curva de sensibilidade do simulador
+CHOQUES_SIMULADOR = np.linspace(-0.2, 0.2, 81)
+
+
+# =================================================================
+# PÁGINA 1: CARTEIRA EM TEMPO REAL (RTD)
+# =================================================================
+def rtd_portfolio_page(engine):
+    st.title("📊 Carteira de Ações em Tempo Real (RTD)")
+
+    try:
+        # Snapshot compartilhado entre sessões: as tabelas só são relidas quando mudam.
+        # Snapshot e índice de empresas são carregados em paralelo.
+        resultados = fetch_parallel(engine, {
+            "snapshot": partial(get_portfolio_snapshot().get, engine),
+            "empresas": partial(get_empresas_index_cache().get, engine),
+            "retorno": partial(get_retorno_acumulado_cache().get, engine),
+        })
+        snapshot = resultados["snapshot"]
+        df_config = snapshot.config.copy()
+        df_quotes = snapshot.quotes
+        metrics_resp = snapshot.metrics
+        serie_retorno = resultados["retorno"]
+        empresas_index = resultados["empresas"]
+    except Exception as e:
+        st.error(f"Erro ao carregar dados do banco: {e}")
+        return
+
+# --- Lógica principal da página ---
+    metrics = {item['metric_key']: item['metric_value'] for item in metrics_resp.to_dict('records')}
+
+    if not df_config.empty:
+        df_config.reset_index(inplace=True)
+        # Documentos recentes das empresas da carteira vão para o cache em segundo plano
+        get_document_prefetcher().schedule(engine, empresas_index.empresas_dos_tickers(df_config['ticker']))
+
+    # Modo ao vivo: só a tabela de posições e o resumo são redesenhados (fragmento),
+    # com as cotações que o feed mantém no snapshot; gráficos e editor ficam como estão
+    _, _, intervalo_tela = feed_config()
+    ao_vivo = st.toggle("Atualização ao vivo", value=True, key="rtd_ao_vivo",
+                        help=f"Atualiza posições e resumo a cada {intervalo_tela:g} s, sem recarregar a página.")
+    if ao_vivo:
+        get_quote_feed(engine)
+    painel = st.fragment(painel_ao_vivo, run_every=intervalo_tela if ao_vivo else None)
+    painel(engine, df_config, metrics)
+
+    # Todo o cálculo de P&L, exposição e cota fica no motor vetorizado
+    with instrumentation.timed("etapa", "rtd.calculo"):
+        df_portfolio, _ = build_portfolio(df_config, df_quotes, metrics)
+
+    main_cols = st.columns([3, 1])
+    with main_cols[0]:
+        st.subheader("Gráficos")
+        with instrumentation.timed("etapa", "rtd.graficos"):
+            chart_cols = st.columns(2)
+            with chart_cols[0]:
+                st.markdown("###### Contribuição para Variação Diária")
+                df_contrib = df_portfolio[df_portfolio['contrib_rs'] != 0].sort_values(by='contrib_rs', ascending=False)
+                if not df_contrib.empty:
+                    fig_contrib = go.Figure(go.Bar(x=df_contrib['ticker'], y=df_contrib['contrib_rs'], marker_color=['#22c55e' if v > 0 else '#ef4444' for v in df_contrib['contrib_rs']]))
+                    st.plotly_chart(fig_contrib, use_container_width=True)
+            with chart_cols[1]:
+                st.markdown("###### Retorno Acumulado: Cota vs. Ibovespa")
+                if len(serie_retorno):
+                    opcoes = st.columns([3, 2])
+                    janela = opcoes[0].radio("Período", list(JANELAS_RETORNO), index=len(JANELAS_RETORNO) - 1, horizontal=True, key="rtd_janela_retorno", label_visibility="collapsed")
+                    completa = opcoes[1].toggle("Resolução completa", key="rtd_retorno_completo")
+                    dias = JANELAS_RETORNO[janela]
+                    inicio = serie_retorno.datas[-1] - pd.Timedelta(days=dias) if dias else None
+                    trecho = serie_retorno.janela(inicio)
+                    pontos = len(trecho) if completa else PONTOS_GRAFICO
+                    fig_hist = go.Figure()
+                    for valores, nome in ((trecho.cota_return, 'Retorno da Cota'), (trecho.ibov_return, 'Retorno do Ibovespa')):
+                        # Retorno acumulado desde o início do período escolhido
+                        x, y = reduzir(trecho.datas, (1 + valores) / (1 + valores[0]) - 1, pontos)
+                        fig_hist.add_trace(go.Scatter(x=x, y=y, mode='lines', name=nome))
+                    fig_hist.update_layout(yaxis_tickformat=".2%")
+                    st.plotly_chart(fig_hist, use_container_width=True)
+
+        with st.expander("Simulador de Rebalanceamento"):
+            simulador_rebalanceamento(df_portfolio, metrics)
+
+    with main_cols[1]:
+        with st.expander("Gerenciar Ativos e Métricas"):
+            configure_rtd_portfolio(df_config, metrics, engine, empresas_index)
+
+
+def painel_ao_vivo(engine, df_config, metrics):
+    """Tabela de posições e resumo do portfólio, recalculados com as cotações atuais do snapshot."""
+    with instrumentation.timed("etapa", "rtd.ao_vivo"):
+        try:
+            df_quotes = get_portfolio_snapshot().get(engine).quotes
+        except Exception as e:
+            st.error(f"Erro ao atualizar as cotações: {e}")
+            return
+        df_portfolio, resultado = build_portfolio(df_config, df_quotes, metrics)
+        # Um ponto por intervalo na série do dia; os gráficos intradiários só leem a série
+        serie = get_serie_intradiaria()
+        if not df_portfolio.empty:
+            serie.registrar(resultado, df_portfolio['ticker'].tolist())
+        intradiario = serie.serie()
+    caixa_liquido = float(resultado.caixa_liquido)
+    patrimonio_liquido = float(resultado.patrimonio_liquido)
+    posicao_comprada_perc = float(resultado.posicao_comprada_perc)
+    posicao_vendida_perc = float(resultado.posicao_vendida_perc)
+    net_long = float(resultado.net_long)
+    exposicao_total = float(resultado.exposicao_total)
+    cota_atual = float(resultado.cota_atual)
+    variacao_cota_dia = float(resultado.variacao_cota_dia)
+
+    main_cols = st.columns([3, 1])
+    with main_cols[0]:
+        st.subheader("Composição da Carteira")
+        if not df_portfolio.empty:
+            df_display = df_portfolio.rename(columns={'ticker': 'Ativo', 'last_price': 'Cotação', 'var_dia_perc': 'Var. Dia (%)', 'contrib_perc': 'Contrib. (%)', 'quantidade': 'Quantidade', 'posicao_rs': 'Posição (R$)', 'posicao_perc': 'Posição (%)', 'posicao_alvo_perc': 'Posição % Alvo', 'diferenca_perc': 'Diferença', 'ajuste_qtd': 'Ajuste (Qtd.)'})
+            with instrumentation.timed("etapa", "rtd.tabela"):
+                tabela_carteira(df_display[['Ativo', 'Cotação', 'Var. Dia (%)', 'Contrib. (%)', 'Quantidade', 'Posição (R$)', 'Posição (%)', 'Posição % Alvo', 'Diferença', 'Ajuste (Qtd.)']], use_container_width=True, hide_index=True)
+        st.markdown(f"**Caixa Líquido:** `{caixa_liquido:,.2f}`")
+        graficos_intradiarios(intradiario, float(metrics.get('cota_d1', 0.0)))
+
+    with main_cols[1]:
+        st.subheader("Resumo do Portfólio")
+        st.metric("Patrimônio Líquido:", f"R$ {patrimonio_liquido:,.2f}")
+        st.metric("Valor da Cota:", f"R$ {cota_atual:,.4f}", f"{variacao_cota_dia:.2%}")
+        st.markdown("---")
+        st.markdown(f"**Posição Comprada:** `{posicao_comprada_perc:.2%}`")
+        st.markdown(f"**Posição Vendida:** `{posicao_vendida_perc:.2%}`")
+        st.markdown(f"**Net Long:** `{net_long:.2%}`")
+        st.markdown(f"**Exposição Total:** `{exposicao_total:.2%}`")
+
+
+def graficos_intradiarios(intradiario, cota_d1):
+    """Cota e atribuição por ativo ao longo do dia, a partir da série intradiária."""
+    if len(intradiario) < 2:
+        return
+    cols = st.columns(2)
+    with cols[0]:
+        st.markdown("###### Cota Intradiária")
+        fig_cota = go.Figure(go.Scatter(x=intradiario.instantes, y=intradiario.campo('cota_atual'), mode='lines', name='Cota'))
+        if cota_d1 > 0:
+            fig_cota.add_hline(y=cota_d1, line_dash='dot', line_color='#9ca3af', annotation_text='D-1')
+        fig_cota.update_layout(height=300, margin=dict(l=0, r=0, t=10, b=0))
+        st.plotly_chart(fig_cota, use_container_width=True)
+    with cols[1]:
+        st.markdown("###### Atribuição Intradiária (R$)")
+        contribuicoes = intradiario.contribuicoes
+        principais = np.argsort(-np.abs(contribuicoes[-1]))[:ATIVOS_ATRIBUICAO]
+        fig_atrib = go.Figure()
+        for i in principais:
+            fig_atrib.add_trace(go.Scatter(x=intradiario.instantes, y=contribuicoes[:, i], mode='lines', name=intradiario.tickers[i]))
+        if contribuicoes.shape[1] > len(principais):
+            outros = contribuicoes.sum(axis=1) - contribuicoes[:, principais].sum(axis=1)
+            fig_atrib.add_trace(go.Scatter(x=intradiario.instantes, y=outros, mode='lines', name='Outros', line_dash='dot'))
+        fig_atrib.update_layout(height=300, margin=dict(l=0, r=0, t=10, b=0))
+        st.plotly_chart(fig_atrib, use_container_width=True)
+
+
+@st.fragment
+def simulador_rebalanceamento(df_portfolio, metrics):
+    """What-if de choque de mercado, alvo de um ativo e caixa mínimo; só o fragmento é refeito a cada ajuste."""
+    if df_portfolio.empty:
+        st.info("Adicione ativos à carteira para simular o rebalanceamento.")
+        return
+    tickers = df_portfolio['ticker'].tolist()
+    controles = st.columns(4)
+    choque = controles[0].slider("Mercado (%)", -20.0, 20.0, 0.0, 0.5, key="sim_choque") / 100
+    ativo = controles[1].selectbox("Ativo", tickers, key="sim_ativo")
+    i = tickers.index(ativo)
+    alvo_atual = round(float(df_portfolio['posicao_alvo'].iloc[i]) * 100, 1)
+    novo_alvo = controles[2].slider(f"Alvo de {ativo} (%)", min(0.0, alvo_atual), max(30.0, alvo_atual), alvo_atual, 0.5, key=f"sim_alvo_{ativo}") / 100
+    reserva = controles[3].slider("Caixa mínimo (% do PL)", 0.0, 20.0, 0.0, 0.5, key="sim_reserva") / 100
+    fracionario = st.toggle("Mercado fracionário (lote de 1)", key="sim_fracionario")
+
+    with instrumentation.timed("etapa", "rtd.simulador"):
+        quantidade = df_portfolio['quantidade'].to_numpy(dtype=float)
+        last, prev = df_portfolio['last_price'].to_numpy(dtype=float), df_portfolio['previous_close'].to_numpy(dtype=float)
+        preco = np.where(last > 0, last, prev)
+        alvo = df_portfolio['posicao_alvo'].to_numpy(dtype=float).copy()
+        alvo[i] = novo_alvo
+        caixa = parse_metrics(metrics)['caixa_liquido']
+        # Curva de sensibilidade e cenário escolhido (última linha) numa só chamada: uma linha por choque
+        choques = np.append(CHOQUES_SIMULADOR, choque)
+        precos = preco * (1 + choques[:, None])
+        pl = (quantidade * precos).sum(axis=-1) + caixa
+        r = rebalancear(quantidade, precos, alvo, caixa, lote=1.0 if fracionario else lote_padrao(tickers), caixa_minimo=reserva * pl)
+
+    cols = st.columns(4)
+    cols[0].metric("PL no cenário", f"R$ {pl[-1]:,.2f}")
+    cols[1].metric("Giro", f"R$ {r.giro[-1]:,.2f}")
+    cols[2].metric("Caixa após ordens", f"R$ {r.caixa_final[-1]:,.2f}")
+    cols[3].metric("Distância do alvo", f"{r.erro_alvo[-1]:.2f} p.p.")
+
+    ordens = pd.DataFrame({
+        'Ativo': tickers, 'Cotação': precos[-1], 'Quantidade': quantidade, 'Ordem (Qtd.)': r.ordem[-1],
+        'Quantidade Final': r.quantidade_final[-1], 'Posição Final (%)': r.posicao_perc_final[-1], 'Alvo (%)': alvo * 100,
+    })
+    ordens = ordens[ordens['Ordem (Qtd.)'] != 0]
+    if ordens.empty:
+        st.info("Nenhuma ordem necessária neste cenário.")
+    else:
+        tabela(ordens, {
+            'Cotação': MOEDA, 'Quantidade': INTEIRO, 'Ordem (Qtd.)': INTEIRO_SINAL, 'Quantidade Final': INTEIRO,
+            'Posição Final (%)': PERCENTUAL, 'Alvo (%)': PERCENTUAL,
+        }, hide_index=True, use_container_width=True)
+
+    st.markdown("###### Giro e caixa após o rebalanceamento, por choque de mercado")
+    x = CHOQUES_SIMULADOR * 100
+    n = len(CHOQUES_SIMULADOR)
+    fig = go.Figure([
+        go.Scatter(x=x, y=r.giro[:n], mode='lines', name='Giro'),
+        go.Scatter(x=x, y=r.caixa_final[:n], mode='lines', name='Caixa após ordens'),
+    ])
+    fig.add_vline(x=choque * 100, line_dash='dot', line_color='#9ca3af')
+    fig.update_layout(height=300, xaxis_ticksuffix='%', margin=dict(l=0, r=0, t=10, b=0))
+    st.plotly_chart(fig, use_container_width=True)
+
+
+def configure_rtd_portfolio(df_config, metrics, engine, empresas_index):
+    """Renderiza os componentes para gerenciar ativos e métricas."""
+    
+    # --- SEÇÃO PARA GERENCIAR ATIVOS ---
+    st.subheader("Gerenciar Ativos da Carteira")
+    st.info("Adicione, edite ou remova linhas. Depois, clique em 'Salvar Carteira'.")
+    
+    # Prepara o dataframe para edição, garantindo que o index 'id' seja mantido
+    if 'id' in df_config.columns:
+        df_edit = df_config.set_index('id')
+    else:
+        df_edit = df_config # Fallback para o caso de a tabela estar vazia
+        
+    edited_df = st.data_editor(
+        df_edit[['ticker', 'quantidade', 'posicao_alvo']], 
+        num_rows="dynamic", 
+        key="asset_editor", 
+        use_container_width=True
+    )
+    
+    if st.button("Salvar Carteira"):
+        try:
+            # Grava só o que mudou (inclusões, alterações e exclusões) numa única transação
+            diff = diff_portfolio(df_edit, edited_df)
+            if diff.vazio:
+                st.info("Nenhuma alteração na carteira.")
+            else:
+                save_portfolio_diff(engine, diff)
+                get_portfolio_snapshot().invalidate('portfolio_config')
+                st.success(f"Carteira salva com sucesso! ({diff.resumo()})")
+                st.rerun()
+        except Exception as e:
+            st.error(f"Erro ao salvar carteira: {e}")
+            
+    st.markdown("---") # Divisor visual
+
+    # --- SEÇÃO PARA EDITAR MÉTRICAS DIÁRIAS (RESTAURADA) ---
+    st.subheader("Editar Métricas Diárias")
+    with st.form("metrics_form"):
+        cota_d1_val = st.number_input("Cota D-1", value=float(metrics.get('cota_d1', 1.0)), format="%.4f")
+        qtd_cotas_val = st.number_input("Quantidade de Cotas", value=int(metrics.get('quantidade_cotas', 1)), step=1)
+        caixa_val = st.number_input("Caixa Bruto", value=float(metrics.get('caixa_bruto', 0.0)), format="%.2f")
+        outros_val = st.number_input("Outros", value=float(metrics.get('outros', 0.0)), format="%.2f")
+        outras_despesas_val = st.number_input("Outras Despesas", value=float(metrics.get('outras_despesas', 0.0)), format="%.2f")
+        
+        submitted = st.form_submit_button("Atualizar Métricas")
+        
+        if submitted:
+            try:
+                metrics_to_upsert = {
+                    "cota_d1": cota_d1_val,
+                    "quantidade_cotas": qtd_cotas_val,
+                    "caixa_bruto": caixa_val,
+                    "outros": outros_val,
+                    "outras_despesas": outras_despesas_val,
+                }
+                # Um único INSERT ... ON CONFLICT em lote, só com as métricas alteradas
+                upsert_metrics(engine, metrics_to_upsert, metrics)
+                get_portfolio_snapshot().invalidate('portfolio_metrics')
+                st.success("Métricas salvas com sucesso!")
+                st.rerun()
+            except Exception as e:
+                st.error(f"Erro ao salvar métricas: {e}")
+ 
+    # --- DOCUMENTOS RECENTES DA CARTEIRA ---
+    st.markdown("---")
+    st.subheader("Documentos Recentes")
+    if df_config.empty:
+        st.info("Adicione ativos à sua carteira para ver os documentos recentes.")
+        return
+    nomes_empresas = empresas_index.empresas_dos_tickers(df_config['ticker'].str.strip().str.upper())
+    if not nomes_empresas:
+        st.warning("Não foi possível encontrar as empresas correspondentes aos tickers da sua carteira.")
+        return
+    # Feed compartilhado: só lê documentos acima da marca d'água quando a tabela muda
+    feed = get_feed_documentos()
+    df_documentos = feed.get(engine, nomes_empresas)
+    if df_documentos.empty:
+        st.info(f"Nenhum novo documento encontrado para as empresas da sua carteira nos últimos {feed.dias} dias.")
+        return
+    st.success(f"🔔 Alerta: {len(df_documentos)} novo(s) documento(s) encontrado(s)!")
+    st.dataframe(
+        df_documentos[['data_entrega', 'nome_companhia', 'categoria', 'assunto', 'link_download']],
+        hide_index=True, use_container_width=True,
+        column_config={
+            'data_entrega': st.column_config.DateColumn("Data", format="DD/MM/YYYY"),
+            'nome_companhia': "Empresa",
+            'categoria': "Categoria",
+            'assunto': "Assunto",
+            'link_download': st.column_config.LinkColumn("Link", display_text="Abrir"),
+        },
+    )
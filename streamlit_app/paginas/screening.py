@@ -0,0 +1,58 @@
+# streamlit_app/paginas/screening.py
+# Página Screening Fundamentalista.
+
+import streamlit as st
+
+from empresas_index import get_empresas_index
+from indicadores import INDICADORES, MENOR_MELHOR, get_indicadores_store
+
+
+# =================================================================
+# PÁGINA: Screening Fundamentalista
+# =================================================================
+def screening_fundamentalista_page(engine):
+    st.title("🔍 Screening Fundamentalista")
+
+    cols_filtros = st.columns([1, 3])
+    periodo = cols_filtros[0].radio("Período", ["Anual", "Trimestral"], horizontal=True, key="screening_periodo")
+    try:
+        # Matriz (empresa × data × indicador) pré-calculada para o mercado inteiro
+        matriz = get_indicadores_store().get(engine, periodo.upper())
+    except Exception as e:
+        st.error(f"Erro ao carregar indicadores: {e}")
+        return
+    if len(matriz.empresas) == 0:
+        st.info("Nenhum dado financeiro disponível. Execute o pipeline ETL.")
+        return
+
+    selecionados = cols_filtros[1].multiselect(
+        "Filtrar por indicadores", options=list(INDICADORES), format_func=INDICADORES.get,
+        default=["roe"],
+    )
+    limites = {}
+    for nome in selecionados:
+        cols = st.columns([2, 1, 1])
+        cols[0].markdown(f"**{INDICADORES[nome]}**")
+        minimo = cols[1].number_input("Mínimo", value=None, key=f"min_{nome}", placeholder="sem limite")
+        maximo = cols[2].number_input("Máximo", value=None, key=f"max_{nome}", placeholder="sem limite")
+        limites[nome] = (minimo, maximo)
+
+    df_resultado = matriz.filtrar(limites)
+    ordenar_por = selecionados[0] if selecionados else "roe"
+    # Melhores primeiro: alavancagem em ordem crescente, os demais em decrescente
+    df_resultado = df_resultado.sort_values(ordenar_por, ascending=ordenar_por in MENOR_MELHOR)
+
+    empresas_index = get_empresas_index(engine)
+    df_resultado.insert(0, "Tickers", [", ".join(empresas_index.tickers(e)) for e in df_resultado.index])
+    df_display = df_resultado.reset_index().rename(columns={"denom_cia": "Empresa", "data": "Data", **INDICADORES})
+
+    st.subheader(f"{len(df_display)} de {len(matriz.empresas)} empresas atendem aos filtros")
+    st.dataframe(
+        df_display,
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            "Data": st.column_config.DateColumn("Data", format="DD/MM/YYYY"),
+            **{rotulo: st.column_config.NumberColumn(rotulo, format="%.2f") for rotulo in INDICADORES.values()},
+        },
+    )
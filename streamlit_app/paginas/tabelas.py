@@ -0,0 +1,94 @@
+# streamlit_app/paginas/tabelas.py
+# Renderização das tabelas numéricas das páginas.
+#
+# O caminho padrão manda o DataFrame numérico como está e descreve o formato
+# de cada coluna em `st.column_config.NumberColumn`; a formatação acontece no
+# navegador e o payload é só o Arrow dos valores. O Styler do pandas fica como
+# fallback para a cor por sinal (que o column_config não oferece), e só em
+# tabelas pequenas: ele serializa uma segunda cópia da tabela como texto e um
+# estilo por célula. As cores são calculadas de uma vez com NumPy.
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+COR_POSITIVO = '#22c55e'
+COR_NEGATIVO = '#ef4444'
+
+# Acima deste número de células a cor por sinal é descartada e vale o caminho rápido
+LIMITE_STYLER = 2500
+
+
+@dataclass(frozen=True)
+class Formato:
+    """Formato de uma coluna numérica: casas decimais, '%' no fim, cor pelo sinal e prefixo (ex.: 'R$ ')."""
+    casas: int = 2
+    percentual: bool = False
+    sinal: bool = False
+    prefixo: str = ""
+
+    def column_config(self, rotulo=None):
+        # Mesmo texto do Styler: prefixo, separador de milhar, casas e '%' (os percentuais já vêm × 100)
+        formato = f"{self.prefixo}%,.{self.casas}f" + ("%%" if self.percentual else "")
+        return st.column_config.NumberColumn(rotulo, format=formato, step=10.0 ** -self.casas)
+
+    def padrao_styler(self):
+        return self.prefixo + f"{{:,.{self.casas}f}}" + ("%" if self.percentual else "")
+
+
+MOEDA = Formato(2, prefixo="R$ ")
+PERCENTUAL = Formato(2, percentual=True)
+PERCENTUAL_SINAL = Formato(2, percentual=True, sinal=True)
+INTEIRO = Formato(0)
+INTEIRO_SINAL = Formato(0, sinal=True)
+
+
+def _formatos_por_coluna(df, formatos):
+    if isinstance(formatos, Formato):
+        return {coluna: formatos for coluna in df.columns if pd.api.types.is_numeric_dtype(df[coluna])}
+    return {coluna: formato for coluna, formato in formatos.items() if coluna in df.columns}
+
+
+def cores_por_sinal(df, colunas):
+    """DataFrame de CSS (cor verde/vermelha pelo sinal) nas `colunas`, vazio no resto."""
+    css = np.full(df.shape, "", dtype=object)
+    for coluna in colunas:
+        j = df.columns.get_loc(coluna)
+        valores = pd.to_numeric(df[coluna], errors="coerce").to_numpy(dtype=float)
+        css[:, j] = np.where(
+            np.isnan(valores), "", np.where(valores < 0, f"color: {COR_NEGATIVO}", f"color: {COR_POSITIVO}")
+        )
+    return pd.DataFrame(css, index=df.index, columns=df.columns)
+
+
+def estilizar(df, formatos):
+    """Fallback com Styler: formato por coluna e cor por sinal calculada em bloco."""
+    formatos = _formatos_por_coluna(df, formatos)
+    colunas_sinal = [c for c, f in formatos.items() if f.sinal]
+    styler = df.style.format({c: f.padrao_styler() for c, f in formatos.items()}, na_rep="")
+    if colunas_sinal:
+        styler = styler.apply(cores_por_sinal, axis=None, colunas=colunas_sinal)
+    return styler
+
+
+def tabela(df, formatos, colorir=True, column_config=None, **kwargs):
+    """Exibe `df` com os `formatos` ({coluna: Formato} ou um Formato para todas as colunas numéricas).
+
+    Com `colorir`, tabelas de até LIMITE_STYLER células que tenham colunas
+    com `sinal` passam pelo Styler; as demais vão só com column_config.
+    """
+    por_coluna = _formatos_por_coluna(df, formatos)
+    config = {coluna: formato.column_config() for coluna, formato in por_coluna.items()}
+    config.update(column_config or {})
+    if colorir and df.size <= LIMITE_STYLER and any(f.sinal for f in por_coluna.values()):
+        return st.dataframe(estilizar(df, por_coluna), column_config=column_config, **kwargs)
+    return st.dataframe(df, column_config=config, **kwargs)
+
+
+def demonstrativo(df, casas=0, **kwargs):
+    """Demonstração pivotada (contas × datas): datas viram rótulos DD/MM/AAAA e valores usam column_config."""
+    if isinstance(df.columns, pd.DatetimeIndex):
+        df = df.set_axis(df.columns.strftime("%d/%m/%Y"), axis=1)
+    return tabela(df, Formato(casas), colorir=False, **kwargs)
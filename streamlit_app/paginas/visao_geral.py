@@ -0,0 +1,122 @@
+# streamlit_app/paginas/visao_geral.py
+# Página Visão Geral da Empresa (Overview).
+
+import logging
+
+import plotly.graph_objects as go
+import streamlit as st
+
+from empresas_index import get_empresas_index
+from insiders import get_radar_insiders
+from market_data import get_market_data_store
+from shared_cache import get_portfolio_snapshot
+
+logger = logging.getLogger(__name__)
+
+
+def _abrir_radar(empresa):
+    # Callback: troca a página da barra lateral antes do próximo rerun
+    st.session_state["navegacao"] = "Radar de Insiders (CVM 44)"
+    if empresa:
+        st.session_state["radar_empresa"] = empresa
+
+
+# =================================================================
+# PÁGINA 2: Visão Geral da Empresa (Overview)
+# =================================================================
+def visao_geral_empresa_page(engine):
+    st.title("Visão Geral da Empresa (Overview)")
+
+    market_data = get_market_data_store()
+
+    # --- Widget de Seleção de Ativo ---
+    # Lista de exemplo acrescida dos ativos da carteira, pré-carregados em lote e em segundo plano
+    lista_tickers = ["HAPV3.SA", "PETR4.SA", "VALE3.SA", "ITUB4.SA", "NFLX"]
+    try:
+        df_config = get_portfolio_snapshot().get(engine).config
+        tickers_carteira = [f"{t.strip().upper()}.SA" for t in df_config['ticker'].dropna()]
+        lista_tickers = list(dict.fromkeys(lista_tickers + tickers_carteira))
+        market_data.schedule(tickers_carteira)
+    except Exception:
+        logger.warning("carteira indisponível para a lista de ativos", exc_info=True)
+    ticker_selecionado = st.selectbox("Pesquisar por Ações, ETFs, Notícias e mais", options=lista_tickers)
+
+    if not ticker_selecionado:
+        st.info("Por favor, selecione um ativo para começar a análise.")
+        return
+
+    try:
+        # --- Busca de Dados no armazenamento local (atualizado do yfinance só quando vencido) ---
+        info = market_data.info(ticker_selecionado)
+        hist = market_data.history(ticker_selecionado, period_days=365)
+    except Exception as e:
+        st.error(f"Não foi possível buscar os dados para {ticker_selecionado}. Verifique o ticker. Erro: {e}")
+        return
+
+    # --- Cabeçalho com Informações Principais ---
+    nome_empresa = info.get('longName', ticker_selecionado)
+    preco_atual = info.get('currentPrice', 0)
+    variacao_dia = info.get('regularMarketChange', 0)
+    variacao_perc = info.get('regularMarketChangePercent', 0) * 100
+    
+    st.subheader(nome_empresa)
+    cols_header = st.columns(4)
+    with cols_header[0]:
+        st.metric("Preço Atual", f"{info.get('currency', '')} {preco_atual:,.2f}", f"{variacao_dia:,.2f} ({variacao_perc:.2f}%)")
+    with cols_header[1]:
+        st.metric("Capitalização de Mercado", f"{info.get('marketCap', 0) / 1e9:,.2f} Bi")
+    with cols_header[2]:
+        st.metric("P/L", f"{info.get('trailingPE', 0):,.2f}")
+    with cols_header[3]:
+        st.metric("DY (12M)", f"{info.get('dividendYield', 0) * 100:,.2f}%")
+
+    st.markdown("---")
+    
+    # --- Layout Principal ---
+    cols_main = st.columns([2, 1]) # Coluna esquerda maior para gráficos e dados
+
+    with cols_main[0]:
+        # --- Gráfico de Preços ---
+        st.subheader("Gráfico de Preços (1 Ano)")
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(x=hist.index, y=hist['Close'], mode='lines', name='Fechamento'))
+        st.plotly_chart(fig, use_container_width=True)
+
+        # --- Resumo: Dados Históricos ---
+        st.subheader("Dados Históricos (Fundamentalistas)")
+        st.info("Esta seção será preenchida com os dados do balanço, DRE, etc., que virão da página 'Dados Históricos'.")
+        # Exemplo de como poderia ser:
+        # df_dre = pd.read_sql(f"SELECT * FROM dre_table WHERE ticker = '{ticker_selecionado}'", engine)
+        # st.dataframe(df_dre.head(3))
+        st.button("Ver Análise Histórica Completa →", key="btn_hist")
+
+
+    with cols_main[1]:
+        # --- Resumo: Radar de Insiders ---
+        st.subheader("Radar de Insiders (CVM 44)")
+        empresa_cvm = None
+        try:
+            # Empresa da CVM pelo ticker; as transações saem do índice do radar, sem consulta
+            empresa_cvm = get_empresas_index(engine).empresa(ticker_selecionado.removesuffix(".SA"))
+            radar = get_radar_insiders(engine)
+            df_insiders = radar.ultimas(empresa_cvm, 5) if empresa_cvm else None
+            if df_insiders is not None and not df_insiders.empty:
+                fluxo_30d = radar.ranking(30, empresas=[empresa_cvm])['liquido'].sum()
+                st.metric("Fluxo líquido dos insiders (30 dias)", f"R$ {fluxo_30d:,.0f}")
+                st.dataframe(df_insiders[['data', 'descricao', 'categoria', 'valor']], hide_index=True)
+            else:
+                 st.info(f"Nenhum dado de insider encontrado para '{nome_empresa}' no banco de dados. Execute o pipeline ETL.")
+        except Exception as e:
+            st.warning(f"Não foi possível buscar dados de insiders. O pipeline ETL precisa ser executado. Erro: {e}")
+        st.button("Ver Radar de Insiders Completo →", key="btn_insider", on_click=_abrir_radar, args=(empresa_cvm,))
+
+        # --- Resumo: Documentos e Notícias ---
+        st.subheader("Documentos e Notícias")
+        st.info("Aqui entrará um resumo dos últimos fatos relevantes e notícias da empresa.")
+        st.button("Ver Todas as Notícias e Documentos →", key="btn_news")
+
+        st.subheader("Dados do Sell Side")
+        st.info("Aqui entrará um resumo das recomendações de analistas (preço-alvo, etc.).")
+        st.button("Ver Dados Completos do Sell Side →", key="btn_sellside")
+
+        st.write("Funcionalidade completa da Visão Geral da Empresa.")
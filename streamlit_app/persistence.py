@@ -0,0 +1,108 @@
+# streamlit_app/persistence.py
+# Gravação incremental da carteira e das métricas diárias.
+#
+# Em vez de TRUNCATE + reinserção completa, a carteira editada é comparada
+# com a carregada e só as linhas inseridas, alteradas ou removidas são
+# gravadas, em lote e numa única transação: leitores concorrentes veem a
+# carteira antiga ou a nova, nunca uma tabela vazia.
+
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+COLUNAS_CARTEIRA = ['ticker', 'quantidade', 'posicao_alvo']
+
+
+@dataclass
+class DiffCarteira:
+    """Alterações entre a carteira carregada e a editada."""
+    inserts: list = field(default_factory=list)
+    updates: list = field(default_factory=list)
+    deletes: list = field(default_factory=list)
+
+    @property
+    def vazio(self):
+        return not (self.inserts or self.updates or self.deletes)
+
+    def resumo(self):
+        return f"{len(self.inserts)} inclusão(ões), {len(self.updates)} alteração(ões), {len(self.deletes)} exclusão(ões)"
+
+
+def _normalizar(df):
+    df = df[COLUNAS_CARTEIRA].copy()
+    df['ticker'] = df['ticker'].astype('string').str.strip().str.upper()
+    df['quantidade'] = pd.to_numeric(df['quantidade'], errors='coerce')
+    df['posicao_alvo'] = pd.to_numeric(df['posicao_alvo'], errors='coerce')
+    return df
+
+
+def diff_portfolio(original, editado):
+    """Compara carteiras indexadas por `id`. Linhas novas do editor não têm id (índice nulo)."""
+    original = _normalizar(original)
+    editado = _normalizar(editado).dropna(subset=['ticker'])
+    editado = editado[editado['ticker'] != '']
+
+    tem_id = editado.index.notna() & editado.index.isin(original.index)
+    novos = editado[~tem_id]
+    existentes = editado[tem_id]
+    existentes.index = existentes.index.astype('int64')
+    base = original.loc[existentes.index]
+
+    mudou_ticker = (existentes['ticker'] != base['ticker']).to_numpy(dtype=bool)
+    mudou_num = ~np.isclose(
+        existentes[['quantidade', 'posicao_alvo']].to_numpy(dtype=float),
+        base[['quantidade', 'posicao_alvo']].to_numpy(dtype=float),
+        equal_nan=True,
+    ).all(axis=1)
+    alterados = existentes[mudou_ticker | mudou_num]
+
+    def registros(df):
+        df = df.astype(object).where(df.notna(), None)
+        return df.to_dict('records')
+
+    return DiffCarteira(
+        inserts=registros(novos),
+        updates=[{**r, 'id': int(i)} for i, r in zip(alterados.index, registros(alterados))],
+        deletes=[int(i) for i in original.index.difference(existentes.index)],
+    )
+
+
+def save_portfolio_diff(engine, diff):
+    """Aplica o diff numa única transação, com cada tipo de alteração em lote."""
+    if diff.vazio:
+        return
+    with engine.begin() as conn:
+        if diff.deletes:
+            conn.execute(text("DELETE FROM portfolio_config WHERE id = ANY(:ids)"), {"ids": diff.deletes})
+        if diff.updates:
+            conn.execute(text("""
+                UPDATE portfolio_config
+                SET ticker = :ticker, quantidade = :quantidade, posicao_alvo = :posicao_alvo
+                WHERE id = :id
+            """), diff.updates)
+        if diff.inserts:
+            conn.execute(text("""
+                INSERT INTO portfolio_config (ticker, quantidade, posicao_alvo)
+                VALUES (:ticker, :quantidade, :posicao_alvo)
+            """), diff.inserts)
+
+
+def upsert_metrics(engine, novas, atuais=None):
+    """Grava as métricas alteradas num único comando em lote. Retorna as chaves gravadas.
+
+    Uma métrica ausente ou nula (NULL) em `atuais` conta como alterada.
+    """
+    atuais = atuais or {}
+    alteradas = [
+        {"k": chave, "v": valor} for chave, valor in novas.items()
+        if pd.isna(atuais.get(chave)) or not np.isclose(float(atuais[chave]), float(valor))
+    ]
+    if alteradas:
+        with engine.begin() as conn:
+            conn.execute(text("""
+                INSERT INTO portfolio_metrics (metric_key, metric_value) VALUES (:k, :v)
+                ON CONFLICT (metric_key) DO UPDATE SET metric_value = EXCLUDED.metric_value
+            """), alteradas)
+    return [item["k"] for item in alteradas]
@@ -0,0 +1,240 @@
+# streamlit_app/portfolio_analytics.py
+# Motor de cálculo da carteira (P&L, exposição e cota), independente do Streamlit.
+#
+# Todas as métricas são calculadas em uma única passada sobre arrays NumPy.
+# As entradas por ativo têm formato (..., n): as dimensões à esquerda
+# permitem avaliar várias carteiras ou cenários de preço numa só chamada.
+# O rebalanceamento segue o mesmo formato: milhares de cenários de preço,
+# alvo ou caixa viram ordens em lotes numa chamada.
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass(frozen=True)
+class PortfolioResult:
+    """Resultado do cálculo. Arrays por ativo têm formato (..., n); totais, (...)."""
+    preco: np.ndarray
+    posicao_rs: np.ndarray
+    posicao_rs_d1: np.ndarray
+    var_dia_perc: np.ndarray
+    contrib_rs: np.ndarray
+    posicao_perc: np.ndarray
+    contrib_perc: np.ndarray
+    posicao_alvo_perc: np.ndarray
+    diferenca_perc: np.ndarray
+    ajuste_qtd: np.ndarray
+    caixa_liquido: np.ndarray
+    total_acoes: np.ndarray
+    patrimonio_liquido: np.ndarray
+    pl_d1: np.ndarray
+    posicao_comprada_perc: np.ndarray
+    posicao_vendida_perc: np.ndarray
+    net_long: np.ndarray
+    exposicao_total: np.ndarray
+    cota_atual: np.ndarray
+    variacao_cota_dia: np.ndarray
+
+
+def _div(num, den):
+    """Divisão elemento a elemento que devolve 0 onde o denominador é 0."""
+    num, den = np.broadcast_arrays(np.asarray(num, dtype=float), np.asarray(den, dtype=float))
+    return np.divide(num, den, out=np.zeros(num.shape), where=den != 0)
+
+
+def compute_portfolio(quantidade, last_price, previous_close, posicao_alvo,
+                      caixa_liquido=0.0, qtd_cotas=1.0, cota_d1=1.0):
+    """Calcula todas as métricas da carteira.
+
+    Preços ausentes (NaN) ou zerados são tratados por ativo: sem cotação,
+    o ativo é avaliado pelo fechamento anterior e sua variação do dia é 0;
+    sem fechamento anterior, a variação do dia também é 0.
+    """
+    q, last, prev, alvo = np.broadcast_arrays(
+        *(np.nan_to_num(np.asarray(a, dtype=float)) for a in (quantidade, last_price, previous_close, posicao_alvo))
+    )
+    # Escalares por carteira/cenário: formato (...) e (..., 1) para operar com os ativos
+    caixa = np.asarray(caixa_liquido, dtype=float)
+    cotas = np.asarray(qtd_cotas, dtype=float)
+    cota_d1 = np.asarray(cota_d1, dtype=float)
+
+    preco = np.where(last > 0, last, prev)
+    preco_d1 = np.where(prev > 0, prev, preco)
+
+    posicao_rs = q * preco
+    posicao_rs_d1 = q * preco_d1
+    contrib_rs = (preco - preco_d1) * q
+
+    total_acoes = posicao_rs.sum(axis=-1)
+    pl = total_acoes + caixa
+    pl_d1 = posicao_rs_d1.sum(axis=-1) + caixa
+    comprada = np.where(posicao_rs > 0, posicao_rs, 0.0).sum(axis=-1)
+    vendida = np.where(posicao_rs < 0, posicao_rs, 0.0).sum(axis=-1)
+
+    pl_b = pl[..., None]
+    posicao_perc = _div(posicao_rs, pl_b) * 100
+    posicao_alvo_perc = alvo * 100
+    posicao_comprada_perc = _div(comprada, pl)
+    posicao_vendida_perc = _div(vendida, pl)
+    cota_atual = np.where(cotas > 0, _div(pl, cotas), 0.0)
+
+    return PortfolioResult(
+        preco=preco,
+        posicao_rs=posicao_rs,
+        posicao_rs_d1=posicao_rs_d1,
+        var_dia_perc=np.where(preco_d1 > 0, _div(preco, preco_d1) - 1, 0.0) * 100,
+        contrib_rs=contrib_rs,
+        posicao_perc=posicao_perc,
+        contrib_perc=_div(contrib_rs, pl_d1[..., None]) * 100,
+        posicao_alvo_perc=posicao_alvo_perc,
+        diferenca_perc=posicao_perc - posicao_alvo_perc,
+        ajuste_qtd=_div(alvo * pl_b - posicao_rs, preco),
+        caixa_liquido=caixa,
+        total_acoes=total_acoes,
+        patrimonio_liquido=pl,
+        pl_d1=pl_d1,
+        posicao_comprada_perc=posicao_comprada_perc,
+        posicao_vendida_perc=posicao_vendida_perc,
+        net_long=posicao_comprada_perc + posicao_vendida_perc,
+        exposicao_total=posicao_comprada_perc - posicao_vendida_perc,
+        cota_atual=cota_atual,
+        variacao_cota_dia=np.where(cota_d1 > 0, _div(cota_atual, cota_d1) - 1, 0.0),
+    )
+
+
+@dataclass(frozen=True)
+class Rebalanceamento:
+    """Ordens e carteira depois delas. Arrays por ativo têm formato (..., n); totais, (...)."""
+    ordem: np.ndarray  # ações a comprar (+) ou vender (-), múltiplas do lote
+    quantidade_final: np.ndarray
+    posicao_perc_final: np.ndarray
+    caixa_final: np.ndarray
+    giro: np.ndarray  # volume financeiro das ordens
+    erro_alvo: np.ndarray  # soma de |posição final - alvo|, em pontos percentuais
+
+
+def lote_padrao(tickers):
+    """Lote padrão da B3 por ticker: 100 ações, ou 1 no mercado fracionário (sufixo F)."""
+    tickers = pd.Series(tickers, dtype=object).fillna('').astype(str).str.strip().str.upper()
+    return np.where(tickers.str.endswith('F'), 1.0, 100.0)
+
+
+def _devolver_sobra(ordem, linhas, falta_qtd, p, lote, negociavel, sobra, custo):
+    """Compra, um lote por rodada, o ativo mais abaixo do alvo que ainda caiba na sobra de caixa.
+
+    Só as `linhas` (cenários) marcadas entram; cada uma sai quando nada mais cabe
+    ou nenhum ativo está mais de meio lote abaixo do alvo.
+    """
+    forma, n = ordem.shape, ordem.shape[-1]
+    ordem = ordem.reshape(-1, n).copy()
+    ativas = np.flatnonzero(linhas.reshape(-1))
+    p, lote = p.reshape(-1, n)[ativas], lote.reshape(-1, n)[ativas]
+    valor_lote = lote * p * (1 + custo)
+    abaixo = np.where(negociavel.reshape(-1, n)[ativas], (falta_qtd.reshape(-1, n)[ativas] - ordem[ativas]) * p, -np.inf)
+    sobra = sobra.reshape(-1)[ativas]
+    while len(ativas):
+        candidato = (valor_lote <= sobra[:, None]) & (abaixo > lote * p / 2)
+        continua = candidato.any(axis=-1)
+        if not continua.all():
+            ativas, p, lote, valor_lote, abaixo, sobra, candidato = (
+                a[continua] for a in (ativas, p, lote, valor_lote, abaixo, sobra, candidato)
+            )
+        melhor = np.argmax(np.where(candidato, abaixo, -np.inf), axis=-1)
+        k = np.arange(len(ativas))
+        ordem[ativas, melhor] += lote[k, melhor]
+        abaixo[k, melhor] -= lote[k, melhor] * p[k, melhor]
+        sobra -= valor_lote[k, melhor]
+    return ordem.reshape(forma)
+
+
+def rebalancear(quantidade, preco, posicao_alvo, caixa_liquido=0.0, lote=100, caixa_minimo=0.0, custo=0.0):
+    """Ordens em lotes que aproximam a carteira dos pesos alvo, com compras que não levam o caixa abaixo de `caixa_minimo`.
+
+    Cada ordem vai primeiro ao lote mais próximo do alvo. Nos cenários em que
+    as compras não cabem no caixa (mais as vendas, menos `custo` sobre o giro),
+    elas são arredondadas para baixo e reduzidas na mesma proporção; o que
+    sobra volta, um lote por vez, para os ativos mais abaixo do alvo. Ativos
+    sem preço não recebem ordem.
+    """
+    caixa = np.asarray(caixa_liquido, dtype=float)[..., None]
+    minimo = np.asarray(caixa_minimo, dtype=float)[..., None]
+    arrays = [np.nan_to_num(np.asarray(a, dtype=float)) for a in (quantidade, preco, posicao_alvo, lote)]
+    forma = np.broadcast_shapes(*(a.shape for a in arrays), caixa.shape, minimo.shape)
+    q, p, alvo, lote = (np.broadcast_to(a, forma) for a in arrays)
+    caixa, minimo = np.broadcast_to(caixa, forma[:-1] + (1,))[..., 0], np.broadcast_to(minimo, forma[:-1] + (1,))[..., 0]
+
+    negociavel = (p > 0) & (lote > 0)
+    lote = np.where(negociavel, lote, 1.0)
+    pl = (q * p).sum(axis=-1) + caixa
+    alvo_qtd = _div(alvo * pl[..., None], p)
+    # "+ 0.0" troca o -0.0 do arredondamento de ordens pequenas por 0
+    ordem = np.where(negociavel, np.round((alvo_qtd - q) / lote) * lote, 0.0) + 0.0
+
+    def caixa_apos(ordem):
+        fluxo = ordem * p
+        return caixa - fluxo.sum(axis=-1) - custo * np.abs(fluxo).sum(axis=-1)
+
+    falta = caixa_apos(ordem) < minimo
+    if falta.any():
+        compras = ordem > 0
+        vendas = np.where(compras, 0.0, ordem) * p
+        disponivel = caixa - vendas.sum(axis=-1) - custo * np.abs(vendas).sum(axis=-1) - minimo
+        valor_compras = (np.where(compras, ordem, 0.0) * p).sum(axis=-1) * (1 + custo)
+        fator = np.clip(_div(disponivel, valor_compras), 0.0, 1.0)
+        reduzidas = np.floor(ordem * fator[..., None] / lote) * lote
+        ordem = np.where(falta[..., None] & compras, reduzidas, ordem)
+        ordem = _devolver_sobra(ordem, falta, alvo_qtd - q, p, lote, negociavel, caixa_apos(ordem) - minimo, custo)
+
+    quantidade_final = q + ordem
+    caixa_final = caixa_apos(ordem)
+    posicao = quantidade_final * p
+    posicao_perc_final = _div(posicao, (posicao.sum(axis=-1) + caixa_final)[..., None]) * 100
+    return Rebalanceamento(
+        ordem=ordem,
+        quantidade_final=quantidade_final,
+        posicao_perc_final=posicao_perc_final,
+        caixa_final=caixa_final,
+        giro=np.abs(ordem * p).sum(axis=-1),
+        erro_alvo=np.abs(posicao_perc_final - alvo * 100).sum(axis=-1),
+    )
+
+
+def parse_metrics(metrics):
+    """Extrai do dicionário de `portfolio_metrics` os parâmetros do cálculo."""
+    caixa_liquido = (
+        metrics.get('caixa_bruto', 0.0) + metrics.get('outros', 0.0) + metrics.get('outras_despesas', 0.0)
+    )
+    return {
+        'caixa_liquido': caixa_liquido,
+        'qtd_cotas': metrics.get('quantidade_cotas', 1),
+        'cota_d1': metrics.get('cota_d1', 1.0),
+    }
+
+
+def build_portfolio(df_config, df_quotes, metrics):
+    """Junta configuração e cotações e calcula a carteira.
+
+    Retorna (df_portfolio, resultado): o DataFrame traz as colunas por ativo
+    usadas na página RTD; o resultado traz também os totais.
+    """
+    cols_quotes = [c for c in ('ticker', 'last_price', 'previous_close') if c in df_quotes.columns]
+    df = pd.merge(df_config, df_quotes[cols_quotes], on='ticker', how='left')
+    for col in ('quantidade', 'posicao_alvo', 'last_price', 'previous_close'):
+        if col not in df.columns:
+            df[col] = 0.0
+    resultado = compute_portfolio(
+        df['quantidade'].to_numpy(), df['last_price'].to_numpy(), df['previous_close'].to_numpy(),
+        df['posicao_alvo'].to_numpy(), **parse_metrics(metrics)
+    )
+    df = df.fillna({'quantidade': 0, 'posicao_alvo': 0, 'last_price': 0, 'previous_close': 0})
+    for col in ('posicao_rs', 'posicao_rs_d1', 'var_dia_perc', 'contrib_rs', 'posicao_perc',
+                'contrib_perc', 'posicao_alvo_perc', 'diferenca_perc'):
+        df[col] = getattr(resultado, col)
+    # O ajuste exibido é a ordem executável (em lotes, dentro do caixa), não a diferença bruta para o alvo
+    df['ajuste_qtd'] = rebalancear(
+        df['quantidade'].to_numpy(), resultado.preco, df['posicao_alvo'].to_numpy(),
+        resultado.caixa_liquido, lote=lote_padrao(df['ticker']),
+    ).ordem
+    return df, resultado
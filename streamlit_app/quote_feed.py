@@ -0,0 +1,215 @@
+# streamlit_app/quote_feed.py
+# Detecção de cotações novas em segundo plano para o modo ao vivo da página RTD.
+#
+# Uma única thread por processo observa `realtime_quotes` e avisa o snapshot
+# compartilhado quando há cotações novas; os fragmentos da página (tabela de
+# posições e resumo) só releem o snapshot, sem rerun do script inteiro.
+#
+# Modos (env RTD_FEED ou [rtd] feed nos secrets):
+#   "poll"   - consulta leve a cada `intervalo` segundos (padrão);
+#   "notify" - LISTEN/NOTIFY do Postgres (exige o gatilho NOTIFY_TRIGGER_SQL);
+#   "fake"   - passeio aleatório local nos preços, para testar sem feed real.
+
+import abc
+import logging
+import os
+import select
+import threading
+import time
+
+import numpy as np
+import streamlit as st
+from sqlalchemy import text
+
+from shared_cache import QUOTES_WATERMARK_COL, get_portfolio_snapshot
+
+logger = logging.getLogger("dashaws.quote_feed")
+
+CANAL = "realtime_quotes"
+
+# Gatilho que publica no canal a cada escrita em realtime_quotes (uma vez por comando)
+NOTIFY_TRIGGER_SQL = f"""
+CREATE OR REPLACE FUNCTION notify_realtime_quotes() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify('{CANAL}', '');
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_notify_realtime_quotes ON realtime_quotes;
+CREATE TRIGGER trg_notify_realtime_quotes
+AFTER INSERT OR UPDATE OR DELETE ON realtime_quotes
+FOR EACH STATEMENT EXECUTE FUNCTION notify_realtime_quotes();
+"""
+
+
+class QuoteFeed(abc.ABC):
+    """Thread que chama `poll()` a cada `intervalo` segundos e avisa o snapshot quando ele retorna True."""
+
+    # Se True, o snapshot relê o incremento do banco; o feed simulado já entrega as cotações
+    RELER_BANCO = True
+
+    def __init__(self, snapshot, intervalo=2.0):
+        self.snapshot = snapshot
+        self.intervalo = intervalo
+        self.version = 0
+        self.updated_at = None
+        self._parar = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name=type(self).__name__, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._parar.set()
+
+    @abc.abstractmethod
+    def poll(self):
+        """Se há cotações novas desde a chamada anterior."""
+
+    def _loop(self):
+        while not self._parar.is_set():
+            try:
+                if self.poll():
+                    self._publicar()
+            except Exception as e:
+                logger.warning("feed de cotações: %s", e)
+            self._parar.wait(self.intervalo)
+
+    def _publicar(self):
+        if self.RELER_BANCO:
+            self.snapshot.mark_quotes_changed()
+        self.version += 1
+        self.updated_at = time.time()
+
+
+class QuotePoller(QuoteFeed):
+    """Compara a maior marca d'água e a contagem de `realtime_quotes` a cada ciclo.
+
+    Sem a coluna de marca d'água, usa os contadores do pg_stat_user_tables.
+    """
+
+    CONSULTAS = (
+        f"SELECT COUNT(*), MAX({QUOTES_WATERMARK_COL}) FROM realtime_quotes",
+        "SELECT n_tup_ins, n_tup_upd, n_tup_del FROM pg_stat_user_tables WHERE relname = 'realtime_quotes'",
+    )
+
+    def __init__(self, engine, snapshot, intervalo=2.0):
+        super().__init__(snapshot, intervalo)
+        self.engine = engine
+        self._consulta = 0
+        self._ultimo = None
+
+    def poll(self):
+        try:
+            with self.engine.connect() as conn:
+                atual = tuple(conn.execute(text(self.CONSULTAS[self._consulta])).one())
+        except Exception:
+            if self._consulta + 1 >= len(self.CONSULTAS):
+                raise
+            self._consulta += 1
+            return False
+        mudou = self._ultimo is not None and atual != self._ultimo
+        self._ultimo = atual
+        return mudou
+
+
+class PgNotifyListener(QuoteFeed):
+    """Escuta o canal de `NOTIFY_TRIGGER_SQL` numa conexão dedicada; várias notificações viram um aviso."""
+
+    def __init__(self, engine, snapshot, intervalo=1.0, canal=CANAL):
+        super().__init__(snapshot, intervalo)
+        self.engine = engine
+        self.canal = canal
+        self._conexao = None
+
+    def poll(self):
+        """Espera até `intervalo` segundos por notificações na conexão dedicada (aberta no primeiro uso)."""
+        if self._conexao is None:
+            conexao = self.engine.raw_connection()
+            try:
+                dbapi = conexao.driver_connection
+                dbapi.autocommit = True
+                dbapi.cursor().execute(f"LISTEN {self.canal}")
+            except Exception:
+                conexao.invalidate()
+                raise
+            self._conexao = conexao
+        dbapi = self._conexao.driver_connection
+        if not select.select([dbapi], [], [], self.intervalo)[0]:
+            return False
+        dbapi.poll()
+        if not dbapi.notifies:
+            return False
+        dbapi.notifies.clear()
+        return True
+
+    def _loop(self):
+        # Sem a espera entre ciclos da classe base: o próprio poll espera no select
+        while not self._parar.is_set():
+            try:
+                if self.poll():
+                    self._publicar()
+            except Exception as e:
+                logger.warning("LISTEN %s: %s; reconectando", self.canal, e)
+                self._fechar()
+                self._parar.wait(5)
+        self._fechar()
+
+    def _fechar(self):
+        if self._conexao is not None:
+            self._conexao.invalidate()
+            self._conexao = None
+
+
+class FakeQuoteNotifier(QuoteFeed):
+    """Feed simulado: move os preços do snapshot por passeio aleatório, sem tocar no banco."""
+
+    RELER_BANCO = False
+
+    def __init__(self, snapshot, intervalo=1.0, volatilidade=0.002, fracao=0.3, seed=None):
+        super().__init__(snapshot, intervalo)
+        self.volatilidade = volatilidade
+        self.fracao = fracao
+        self._rng = np.random.default_rng(seed)
+
+    def poll(self):
+        cotacoes = self.snapshot.latest_quotes()
+        if cotacoes is None or cotacoes.empty or "last_price" not in cotacoes.columns:
+            return False
+        sorteados = cotacoes[self._rng.random(len(cotacoes)) < self.fracao]
+        if sorteados.empty:
+            return False
+        choque = np.exp(self._rng.normal(0, self.volatilidade, len(sorteados)))
+        novos = sorteados.assign(last_price=sorteados["last_price"].astype(float) * choque)
+        self.snapshot.push_quotes(novos)
+        return True
+
+
+def feed_config():
+    """(modo, intervalo do feed, intervalo dos fragmentos) de env RTD_FEED* ou [rtd] nos secrets."""
+    try:
+        secrets = dict(st.secrets.get("rtd", {}))
+    except Exception:
+        secrets = {}
+    modo = os.environ.get("RTD_FEED") or secrets.get("feed", "poll")
+    intervalo = float(os.environ.get("RTD_FEED_INTERVAL") or secrets.get("intervalo", 2))
+    intervalo_tela = float(os.environ.get("RTD_LIVE_INTERVAL") or secrets.get("intervalo_tela", 5))
+    return modo, intervalo, intervalo_tela
+
+
+@st.cache_resource
+def get_quote_feed(_engine):
+    """Feed de cotações do processo, iniciado na primeira chamada."""
+    modo, intervalo, _ = feed_config()
+    snapshot = get_portfolio_snapshot()
+    if modo == "notify":
+        feed = PgNotifyListener(_engine, snapshot, intervalo=intervalo)
+    elif modo == "fake":
+        feed = FakeQuoteNotifier(snapshot, intervalo=intervalo)
+    else:
+        feed = QuotePoller(_engine, snapshot, intervalo=intervalo)
+    return feed.start()
@@ -0,0 +1,176 @@
+# streamlit_app/retorno_acumulado.py
+# Série de retorno acumulado da Cota e do Ibovespa (gráfico da página RTD).
+#
+# A série fica em memória no processo e só recebe as linhas novas de
+# `portfolio_history` (data >= última data carregada); os retornos são
+# calculados apenas para o trecho acrescentado. Para o gráfico, `lttb`
+# reduz a série a um número fixo de pontos preservando a forma, de modo que
+# o tamanho do payload não cresce com os anos de histórico.
+
+import threading
+import time
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from sqlalchemy import text
+
+from db import read_sql
+from instrumentation import record_cache
+from shared_cache import get_table_watcher
+
+QUERY_COMPLETA = "SELECT data, cota, ibov FROM portfolio_history ORDER BY data ASC"
+QUERY_INCREMENTO = "SELECT data, cota, ibov FROM portfolio_history WHERE data >= :ultima ORDER BY data ASC"
+
+
+@dataclass(frozen=True)
+class SerieRetorno:
+    """Arrays alinhados por data; retornos relativos à primeira linha do histórico."""
+    datas: np.ndarray
+    cota: np.ndarray
+    ibov: np.ndarray
+    cota_return: np.ndarray
+    ibov_return: np.ndarray
+
+    def __len__(self):
+        return len(self.datas)
+
+    def janela(self, inicio=None):
+        """Trecho da série a partir de `inicio` (data), sem copiar os arrays."""
+        if inicio is None:
+            return self
+        i = int(np.searchsorted(self.datas, np.datetime64(inicio, "ns")))
+        return SerieRetorno(self.datas[i:], self.cota[i:], self.ibov[i:], self.cota_return[i:], self.ibov_return[i:])
+
+
+def _vazia():
+    vazio = np.array([], dtype=float)
+    return SerieRetorno(np.array([], dtype="datetime64[ns]"), vazio, vazio, vazio, vazio)
+
+
+def _arrays(df):
+    datas = pd.to_datetime(df["data"]).to_numpy(dtype="datetime64[ns]")
+    return datas, df["cota"].to_numpy(dtype=float), df["ibov"].to_numpy(dtype=float)
+
+
+class RetornoAcumuladoCache:
+    """Mantém a série do processo, lendo só o final de `portfolio_history` quando a tabela muda.
+
+    A última data é sempre relida (a linha do dia pode ser regravada). Com
+    DELETEs, ou após `max_age` segundos, a série é recarregada inteira; isso
+    também cobre correções em datas antigas.
+    """
+
+    def __init__(self, watcher, max_age=3600):
+        self.watcher = watcher
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._serie = None
+        self._fingerprint = None
+        self._loaded_at = 0.0
+
+    def get(self, engine):
+        with self._lock:
+            fingerprint = self.watcher.fingerprints(engine, ["portfolio_history"])["portfolio_history"]
+            vencida = time.monotonic() - self._loaded_at >= self.max_age
+            mudou = fingerprint is None or fingerprint != self._fingerprint
+            if self._serie is None or vencida:
+                modo = "completa"
+            elif not mudou:
+                modo = None
+            elif self._pode_incrementar(fingerprint):
+                modo = "incremento"
+            else:
+                modo = "completa"
+            record_cache("retorno_acumulado", hit=modo is None)
+            if modo == "completa":
+                self._serie = self._montar(read_sql(QUERY_COMPLETA, engine, cache_ttl=self.max_age, versao=fingerprint))
+                self._loaded_at = time.monotonic()
+            elif modo == "incremento":
+                ultima = pd.Timestamp(self._serie.datas[-1]).to_pydatetime()
+                self._serie = self._acrescentar(read_sql(text(QUERY_INCREMENTO), engine, params={"ultima": ultima}))
+            self._fingerprint = fingerprint
+            return self._serie
+
+    def invalidate(self):
+        with self._lock:
+            self._serie = None
+
+    def _pode_incrementar(self, fingerprint):
+        # Linhas apagadas não aparecem pela data: exige recarga completa
+        return (
+            len(self._serie) > 0
+            and self._fingerprint is not None
+            and fingerprint is not None
+            and fingerprint[2] == self._fingerprint[2]
+        )
+
+    @staticmethod
+    def _montar(df):
+        if df.empty:
+            return _vazia()
+        datas, cota, ibov = _arrays(df)
+        return SerieRetorno(datas, cota, ibov, cota / cota[0] - 1, ibov / ibov[0] - 1)
+
+    def _acrescentar(self, novos):
+        serie = self._serie
+        if novos.empty:
+            return serie
+        datas, cota, ibov = _arrays(novos)
+        # Descarta o trecho relido (>= última data) e calcula só os retornos novos
+        corte = int(np.searchsorted(serie.datas, datas[0]))
+        return SerieRetorno(
+            datas=np.concatenate([serie.datas[:corte], datas]),
+            cota=np.concatenate([serie.cota[:corte], cota]),
+            ibov=np.concatenate([serie.ibov[:corte], ibov]),
+            cota_return=np.concatenate([serie.cota_return[:corte], cota / serie.cota[0] - 1]),
+            ibov_return=np.concatenate([serie.ibov_return[:corte], ibov / serie.ibov[0] - 1]),
+        )
+
+
+def lttb(x, y, n_out):
+    """Índices dos pontos escolhidos pelo Largest-Triangle-Three-Buckets.
+
+    Mantém o primeiro e o último ponto e, em cada um dos `n_out - 2` baldes
+    intermediários, o ponto que forma o maior triângulo com o ponto escolhido
+    no balde anterior e a média do balde seguinte. Retorna todos os índices
+    se a série já tiver até `n_out` pontos.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    limites = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    # Médias de cada balde (e do último ponto, que fecha a série) de uma vez
+    tamanhos = np.diff(np.append(limites, n))
+    medias_x = np.add.reduceat(x, limites) / tamanhos
+    medias_y = np.add.reduceat(y, limites) / tamanhos
+    indices = np.empty(n_out, dtype=np.int64)
+    indices[0], indices[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        inicio, fim = limites[i], limites[i + 1]
+        xs, ys = x[inicio:fim], y[inicio:fim]
+        areas = np.abs((x[a] - medias_x[i + 1]) * (ys - y[a]) - (x[a] - xs) * (medias_y[i + 1] - y[a]))
+        a = inicio + int(areas.argmax())
+        indices[i + 1] = a
+    return indices
+
+
+def reduzir(datas, valores, n_out):
+    """(datas, valores) reduzidos por LTTB a no máximo `n_out` pontos."""
+    indices = lttb(datas.astype("datetime64[ns]").astype(np.int64), valores, n_out)
+    return datas[indices], valores[indices]
+
+
+@st.cache_resource
+def get_retorno_acumulado_cache():
+    """Cache da série de retorno compartilhado pelo processo."""
+    return RetornoAcumuladoCache(get_table_watcher())
+
+
+def get_retorno_acumulado(engine):
+    """Série de retorno acumulado (Cota e Ibovespa) compartilhada por todas as sessões."""
+    return get_retorno_acumulado_cache().get(engine)
@@ -0,0 +1,381 @@
+# streamlit_app/risco.py
+# Métricas de risco da Cota contra o Ibovespa sobre `portfolio_history`.
+#
+# Para cada janela (em dias úteis) são mantidas as somas móveis de
+# r, r², r_ibov, r_ibov², r·r_ibov e da taxa livre de risco; delas saem
+# volatilidade, beta, correlação e Sharpe. A carga completa calcula todas as
+# datas e todas as janelas numa chamada (somas acumuladas). Depois disso,
+# cada linha nova atualiza as somas em O(1): entra o retorno do dia e sai o
+# que deixou cada janela, guardado num anel do tamanho da maior janela.
+# Drawdown e drawdown máximo seguem o pico corrente. O estado e o histórico
+# das métricas são persistidos, então um processo novo não refaz o cálculo.
+# Como o incremento não vê UPDATEs em linhas antigas, o cálculo completo é
+# refeito a cada `max_age`; e o Sharpe, calculado sem o CDI enquanto a série
+# ainda não foi sincronizada, é refeito assim que ela chega.
+
+import os
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from sqlalchemy import text
+
+from db import read_sql
+from instrumentation import record_cache
+from shared_cache import get_table_watcher
+
+RISCO_DIR = os.environ.get("RISCO_DIR", os.path.join(tempfile.gettempdir(), "dashaws_risco"))
+
+QUERY_COMPLETA = "SELECT data, cota, ibov FROM portfolio_history ORDER BY data ASC"
+QUERY_INCREMENTO = "SELECT data, cota, ibov FROM portfolio_history WHERE data >= :ultima ORDER BY data ASC"
+
+JANELAS = (21, 63, 126, 252)
+METRICAS = ("volatilidade", "beta", "correlacao", "sharpe")
+DIAS_ANO = 252
+
+# Colunas das somas móveis
+_C, _CC, _I, _II, _CI, _RF = range(6)
+
+
+def _termos(r_cota, r_ibov, rf):
+    """Matriz (dia, 6) dos termos somados nas janelas."""
+    return np.column_stack([r_cota, r_cota * r_cota, r_ibov, r_ibov * r_ibov, r_cota * r_ibov, rf])
+
+
+def metricas(somas, janelas):
+    """Volatilidade e Sharpe anualizados, beta e correlação a partir das somas (..., janela, 6)."""
+    w = np.asarray(janelas, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        media_c = somas[..., _C] / w
+        var_c = (somas[..., _CC] - somas[..., _C] * media_c) / (w - 1)
+        var_i = (somas[..., _II] - somas[..., _I] ** 2 / w) / (w - 1)
+        cov = (somas[..., _CI] - somas[..., _C] * somas[..., _I] / w) / (w - 1)
+        var_c, var_i = np.maximum(var_c, 0), np.maximum(var_i, 0)
+        desvio_c = np.sqrt(var_c)
+        return np.stack([
+            desvio_c * np.sqrt(DIAS_ANO),
+            cov / var_i,
+            cov / np.sqrt(var_c * var_i),
+            (media_c - somas[..., _RF] / w) / desvio_c * np.sqrt(DIAS_ANO),
+        ], axis=-1)
+
+
+@dataclass
+class EstadoRisco:
+    """Somas móveis por janela, anel dos últimos termos e pico da cota: tudo que a próxima linha precisa."""
+    janelas: np.ndarray
+    somas: np.ndarray  # (janela, 6)
+    anel: np.ndarray   # (maior janela, 6)
+    n: int             # retornos já acumulados
+    data: np.datetime64
+    cota: float
+    ibov: float
+    pico: float
+    max_drawdown: float
+
+    def copia(self):
+        return EstadoRisco(self.janelas, self.somas.copy(), self.anel.copy(), self.n, self.data,
+                           self.cota, self.ibov, self.pico, self.max_drawdown)
+
+    def atualizar(self, data, cota, ibov, rf=0.0):
+        """Aplica um dia novo em O(1); retorna (drawdown, métricas (janela, 4))."""
+        termos = _termos(np.array([cota / self.cota - 1]), np.array([ibov / self.ibov - 1]), np.array([rf]))[0]
+        tamanho = len(self.anel)
+        # O termo que sai de cada janela é lido antes de o anel ser sobrescrito
+        saindo = np.where((self.n >= self.janelas)[:, None], self.anel[(self.n - self.janelas) % tamanho], 0.0)
+        self.somas += termos - saindo
+        self.anel[self.n % tamanho] = termos
+        self.n += 1
+        self.data, self.cota, self.ibov = data, cota, ibov
+        self.pico = max(self.pico, cota)
+        drawdown = cota / self.pico - 1
+        self.max_drawdown = min(self.max_drawdown, drawdown)
+        valores = metricas(self.somas, self.janelas)
+        valores[self.n < self.janelas] = np.nan
+        return drawdown, valores
+
+
+def calcular_risco(datas, cota, ibov, rf=None, janelas=JANELAS):
+    """Histórico completo, vetorizado em datas e janelas.
+
+    `rf` é a taxa livre de risco diária de cada data (zero se omitida).
+    Retorna (HistoricoRisco, estado após a última linha, estado antes dela).
+    """
+    janelas = np.asarray(janelas, dtype=np.int64)
+    cota, ibov = np.asarray(cota, dtype=float), np.asarray(ibov, dtype=float)
+    rf = np.zeros(len(cota)) if rf is None else np.asarray(rf, dtype=float)
+    termos = _termos(cota[1:] / cota[:-1] - 1, ibov[1:] / ibov[:-1] - 1, rf[1:])
+    n = len(termos)
+
+    # Soma de cada janela terminando em cada dia = diferença das somas acumuladas
+    acumulado = np.vstack([np.zeros((1, 6)), np.cumsum(termos, axis=0)])
+    inicio = np.arange(1, n + 1)[:, None] - janelas[None, :]
+    somas = acumulado[1:, None, :] - acumulado[np.maximum(inicio, 0)]
+    valores = metricas(somas, janelas)
+    valores[inicio < 0] = np.nan
+
+    pico = np.maximum.accumulate(cota)
+    drawdown = cota / pico - 1
+    historico = HistoricoRisco(janelas, capacidade=len(cota) + 256)
+    historico.estender(datas, drawdown, np.concatenate([np.full((1, len(janelas), len(METRICAS)), np.nan), valores]))
+
+    def estado(k):
+        # Estado depois de k retornos (k + 1 linhas de preço)
+        anel = np.zeros((int(janelas.max()), 6))
+        ultimos = np.arange(max(0, k - len(anel)), k)
+        anel[ultimos % len(anel)] = termos[ultimos]
+        return EstadoRisco(
+            janelas=janelas, somas=somas[k - 1].copy() if k else np.zeros((len(janelas), 6)), anel=anel, n=k,
+            data=datas[k], cota=float(cota[k]), ibov=float(ibov[k]), pico=float(pico[k]),
+            max_drawdown=float(drawdown[:k + 1].min()),
+        )
+
+    return historico, estado(n), estado(n - 1) if n else None
+
+
+class HistoricoRisco:
+    """Drawdown e métricas por data, em arrays com capacidade dobrada (acréscimo em O(1) amortizado)."""
+
+    def __init__(self, janelas, capacidade=256):
+        self.janelas = np.asarray(janelas, dtype=np.int64)
+        self.n = 0
+        self._datas = np.empty(capacidade, dtype="datetime64[ns]")
+        self._drawdown = np.empty(capacidade)
+        self._valores = np.empty((capacidade, len(self.janelas), len(METRICAS)))
+
+    def __len__(self):
+        return self.n
+
+    def estender(self, datas, drawdown, valores):
+        fim = self.n + len(datas)
+        if fim > len(self._datas):
+            capacidade = max(fim, 2 * len(self._datas))
+            for nome in ("_datas", "_drawdown", "_valores"):
+                antigo = getattr(self, nome)
+                novo = np.empty((capacidade,) + antigo.shape[1:], dtype=antigo.dtype)
+                novo[:self.n] = antigo[:self.n]
+                setattr(self, nome, novo)
+        self._datas[self.n:fim] = datas
+        self._drawdown[self.n:fim] = drawdown
+        self._valores[self.n:fim] = valores
+        self.n = fim
+
+    def truncar(self, n):
+        self.n = min(self.n, n)
+
+    def risco(self, max_drawdown, rf_pendente=False):
+        """Visão somente leitura do que já foi calculado."""
+        return Risco(self.janelas, self._datas[:self.n], self._drawdown[:self.n], self._valores[:self.n],
+                     max_drawdown, rf_pendente)
+
+
+@dataclass(frozen=True)
+class Risco:
+    """O que as páginas leem: arrays por data e o drawdown máximo do histórico."""
+    janelas: np.ndarray
+    datas: np.ndarray
+    drawdown: np.ndarray
+    valores: np.ndarray  # (data, janela, métrica) na ordem de METRICAS
+    max_drawdown: float
+    rf_pendente: bool = False  # CDI ainda indisponível: o Sharpe não vale (vem como NaN)
+
+    def __len__(self):
+        return len(self.datas)
+
+    def metrica(self, nome):
+        """DataFrame data × janela de uma métrica."""
+        valores = self.valores[:, :, METRICAS.index(nome)]
+        if nome == "sharpe" and self.rf_pendente:
+            valores = np.full_like(valores, np.nan)
+        return pd.DataFrame(valores, index=pd.DatetimeIndex(self.datas, name="data"),
+                            columns=pd.Index(self.janelas, name="janela"))
+
+    def ultimos(self):
+        """DataFrame janela × métrica com os valores da última data."""
+        df = pd.DataFrame(self.valores[-1], index=pd.Index(self.janelas, name="janela"), columns=list(METRICAS))
+        if self.rf_pendente:
+            df["sharpe"] = np.nan
+        return df
+
+
+class RiscoStore:
+    """Estado e histórico de risco do processo, atualizados linha a linha e persistidos em disco.
+
+    A última data é sempre relida (a linha do dia pode ser regravada): o estado
+    de antes dela é guardado e reaplicado. DELETEs, linhas anteriores à última
+    data, `max_age` segundos desde o último recálculo completo (UPDATEs em linhas
+    antigas) ou a chegada do CDI levam ao recálculo completo (vetorizado). O
+    fingerprint e a hora do recálculo vão para o disco junto com o estado.
+    """
+
+    def __init__(self, watcher, taxa_livre=None, root=RISCO_DIR, janelas=JANELAS, max_age=3600):
+        self.watcher = watcher
+        self.taxa_livre = taxa_livre
+        self.root = root
+        self.janelas = tuple(janelas)
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._historico = None
+        self._estado = None
+        self._anterior = None
+        self._fingerprint = None
+        self._calculado_em = 0.0  # time.time() do último recálculo completo
+        self._rf_pendente = False
+        os.makedirs(root, exist_ok=True)
+
+    def get(self, engine):
+        """Risco atualizado."""
+        with self._lock:
+            fingerprint = self.watcher.fingerprints(engine, ["portfolio_history"])["portfolio_history"]
+            if self._estado is None:
+                self._load_disk()
+            if self._estado is None:
+                modo = "completa"
+            elif time.time() - self._calculado_em >= self.max_age or (self._rf_pendente and self._rf_disponivel()):
+                modo = "periodica"  # UPDATEs em linhas antigas ou Sharpe calculado sem o CDI
+            elif fingerprint == self._fingerprint:
+                modo = None
+            elif fingerprint is not None and self._fingerprint is not None and fingerprint[2] != self._fingerprint[2]:
+                modo = "completa"  # linhas apagadas não aparecem pela data
+            else:
+                modo = "incremento"
+            record_cache("risco", hit=modo is None)
+            if modo == "incremento" and not self._incrementar(engine):
+                modo = "completa"
+            if modo == "completa":
+                self._recalcular(read_sql(QUERY_COMPLETA, engine, cache_ttl=self.max_age, versao=fingerprint))
+            elif modo == "periodica":
+                # Mesmo fingerprint de antes: o L2 devolveria a leitura antiga
+                self._recalcular(read_sql(QUERY_COMPLETA, engine))
+            self._fingerprint = fingerprint
+            if modo:
+                self._save_disk()
+            return self._historico.risco(self._estado.max_drawdown if self._estado else np.nan, self._rf_pendente)
+
+    def _rf(self, datas):
+        """Taxa livre de risco diária; zero (e Sharpe pendente) enquanto a série não existe."""
+        rf = self.taxa_livre(datas) if self.taxa_livre is not None else np.zeros(len(datas))
+        if rf is None:
+            self._rf_pendente = True
+            return np.zeros(len(datas))
+        return np.asarray(rf, dtype=float)
+
+    def _rf_disponivel(self):
+        return self.taxa_livre(np.array([self._estado.data])) is not None
+
+    def _recalcular(self, df):
+        self._calculado_em = time.time()
+        self._rf_pendente = False
+        df = df.dropna(subset=["cota", "ibov"])
+        if df.empty:
+            self._historico, self._estado, self._anterior = HistoricoRisco(self.janelas), None, None
+            return
+        datas = pd.to_datetime(df["data"]).to_numpy(dtype="datetime64[ns]")
+        cota, ibov = df["cota"].to_numpy(dtype=float), df["ibov"].to_numpy(dtype=float)
+        # O estado de antes da última linha permite reaplicá-la se ela for regravada
+        self._historico, self._estado, self._anterior = calcular_risco(datas, cota, ibov, self._rf(datas), self.janelas)
+
+    def _incrementar(self, engine):
+        """Aplica as linhas a partir da última data; False se for preciso recalcular tudo."""
+        ultima = pd.Timestamp(self._estado.data).to_pydatetime()
+        df = read_sql(text(QUERY_INCREMENTO), engine, params={"ultima": ultima}).dropna(subset=["cota", "ibov"])
+        if df.empty:
+            return False  # a última data sumiu
+        datas = pd.to_datetime(df["data"]).to_numpy(dtype="datetime64[ns]")
+        if datas[0] != self._estado.data or self._anterior is None:
+            return False
+        # A última linha é refeita a partir do estado anterior a ela
+        estado = self._anterior.copia()
+        self._historico.truncar(len(self._historico) - 1)
+        cota, ibov = df["cota"].to_numpy(dtype=float), df["ibov"].to_numpy(dtype=float)
+        rf = self._rf(datas)
+        drawdowns, valores = [], []
+        for i in range(len(df)):
+            if i == len(df) - 1:
+                self._anterior = estado.copia()
+            drawdown, v = estado.atualizar(datas[i], cota[i], ibov[i], rf[i])
+            drawdowns.append(drawdown)
+            valores.append(v)
+        self._historico.estender(datas, drawdowns, np.stack(valores))
+        self._estado = estado
+        return True
+
+    # --- persistência ---
+    def _path(self):
+        return os.path.join(self.root, "risco.npz")
+
+    def _save_disk(self):
+        if self._estado is None:
+            return
+        risco = self._historico.risco(self._estado.max_drawdown)
+        dados = {
+            "janelas": np.asarray(self.janelas), "datas": risco.datas,
+            "drawdown": risco.drawdown, "valores": risco.valores,
+            "fingerprint": np.array(self._fingerprint or (), dtype=np.int64),
+            "calculado": np.array([self._calculado_em, self._rf_pendente], dtype=float),
+        }
+        for prefixo, estado in (("estado", self._estado), ("anterior", self._anterior)):
+            if estado is None:
+                continue
+            dados.update({
+                f"{prefixo}_somas": estado.somas, f"{prefixo}_anel": estado.anel,
+                f"{prefixo}_escalares": np.array([estado.n, estado.cota, estado.ibov, estado.pico, estado.max_drawdown]),
+                f"{prefixo}_data": np.array([estado.data], dtype="datetime64[ns]"),
+            })
+        # Grava num temporário e troca, para um leitor nunca ver um arquivo pela metade
+        temporario = self._path() + ".tmp.npz"
+        np.savez(temporario, **dados)
+        os.replace(temporario, self._path())
+
+    def _load_disk(self):
+        if not os.path.exists(self._path()):
+            return
+        with np.load(self._path()) as dados:
+            if tuple(dados["janelas"]) != self.janelas:
+                return
+            historico = HistoricoRisco(self.janelas, capacidade=len(dados["datas"]) + 256)
+            historico.estender(dados["datas"], dados["drawdown"], dados["valores"])
+            estados = {}
+            for prefixo in ("estado", "anterior"):
+                if f"{prefixo}_somas" not in dados:
+                    estados[prefixo] = None
+                    continue
+                n, cota, ibov, pico, max_drawdown = dados[f"{prefixo}_escalares"]
+                estados[prefixo] = EstadoRisco(
+                    janelas=np.asarray(self.janelas, dtype=np.int64), somas=dados[f"{prefixo}_somas"],
+                    anel=dados[f"{prefixo}_anel"], n=int(n), data=dados[f"{prefixo}_data"][0],
+                    cota=float(cota), ibov=float(ibov), pico=float(pico), max_drawdown=float(max_drawdown),
+                )
+            calculado_em, rf_pendente = dados["calculado"]
+            fingerprint = tuple(int(v) for v in dados["fingerprint"])
+        self._historico, self._estado, self._anterior = historico, estados["estado"], estados["anterior"]
+        self._fingerprint = fingerprint or None
+        self._calculado_em, self._rf_pendente = float(calculado_em), bool(rf_pendente)
+
+
+def taxa_cdi_diaria(datas):
+    """CDI diário (fração) de cada data, com o que o armazenamento macro já tem (sem esperar a rede).
+
+    None enquanto a série ainda não foi sincronizada.
+    """
+    from macro_data import SERIES, get_macro_store
+    cdi = get_macro_store().series([SERIES["cdi"].codigo])[SERIES["cdi"].codigo].dropna()
+    if cdi.empty:
+        return None
+    anual = cdi.reindex(pd.DatetimeIndex(datas).normalize(), method="ffill").fillna(0.0).to_numpy()
+    return (1 + anual / 100) ** (1 / DIAS_ANO) - 1
+
+
+@st.cache_resource
+def get_risco_store():
+    """Store de risco compartilhado pelo processo (Sharpe sobre o CDI)."""
+    return RiscoStore(get_table_watcher(), taxa_livre=taxa_cdi_diaria)
+
+
+def get_risco(engine):
+    """Métricas de risco da carteira compartilhadas por todas as sessões."""
+    return get_risco_store().get(engine)
@@ -0,0 +1,238 @@
+# streamlit_app/shared_cache.py
+# Snapshot único do banco compartilhado por todas as sessões do Streamlit.
+#
+# Cada aba aberta na página RTD reexecuta o script a cada 60 s. Em vez de
+# cada sessão repetir os mesmos SELECTs, todas leem o mesmo snapshot, que é
+# atualizado no máximo uma vez por intervalo e apenas para as tabelas que
+# de fato mudaram.
+
+import threading
+import time
+from dataclasses import dataclass, field
+from functools import partial
+
+import pandas as pd
+import streamlit as st
+from sqlalchemy import text
+
+from db import fetch_parallel, read_sql
+from instrumentation import record_cache
+
+# Consultas de carga completa de cada tabela do snapshot
+QUERIES = {
+    "portfolio_config": "SELECT * FROM portfolio_config",
+    "realtime_quotes": "SELECT * FROM realtime_quotes",
+    "portfolio_metrics": "SELECT * FROM portfolio_metrics",
+}
+
+QUOTES_WATERMARK_COL = "updated_at"
+
+
+class TableChangeWatcher:
+    """Detecta alterações em tabelas pelos contadores do pg_stat_user_tables.
+
+    Uma única consulta ao catálogo responde por todas as tabelas, e o
+    resultado é reaproveitado por `check_interval` segundos.
+    """
+
+    def __init__(self, check_interval=10):
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._fingerprints = {}
+        self._checked_at = 0.0
+
+    def fingerprints(self, engine, tabelas):
+        """Retorna {tabela: (n_ins, n_upd, n_del)}; None se o catálogo não puder ser lido."""
+        with self._lock:
+            faltando = [t for t in tabelas if t not in self._fingerprints]
+            if faltando or time.monotonic() - self._checked_at >= self.check_interval:
+                nomes = sorted(set(tabelas) | set(self._fingerprints))
+                try:
+                    with engine.connect() as conn:
+                        rows = conn.execute(text("""
+                            SELECT relname, n_tup_ins, n_tup_upd, n_tup_del
+                            FROM pg_stat_user_tables WHERE relname = ANY(:nomes)
+                        """), {"nomes": nomes}).fetchall()
+                except Exception:
+                    return {t: None for t in tabelas}
+                self._fingerprints = {nome: None for nome in nomes}
+                self._fingerprints.update({r[0]: tuple(r[1:]) for r in rows})
+                self._checked_at = time.monotonic()
+            return {t: self._fingerprints.get(t) for t in tabelas}
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """Visão imutável do snapshot. Os DataFrames são compartilhados: copie antes de alterar."""
+    config: pd.DataFrame
+    quotes: pd.DataFrame
+    metrics: pd.DataFrame
+    versions: dict = field(default_factory=dict)
+    refreshed_at: float = 0.0
+
+
+class PortfolioSnapshot:
+    """Cache de processo com as tabelas da página RTD.
+
+    - `realtime_quotes` é atualizada incrementalmente pela coluna `updated_at`
+      (recarga completa quando houver DELETEs ou a coluna não existir).
+    - As demais tabelas só são relidas quando seus contadores mudam, ou
+      após `max_age` segundos como garantia.
+    """
+
+    def __init__(self, watcher, min_interval=15, max_age=600):
+        self.watcher = watcher
+        self.min_interval = min_interval
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._frames = {}
+        self._fingerprints = {}
+        self._loaded_at = {}
+        self._versions = {tabela: 0 for tabela in QUERIES}
+        self._quotes_watermark = None
+        self._quotes_pendentes = False
+        self._refreshed_at = 0.0
+
+    def get(self, engine):
+        """Retorna o snapshot atual, atualizando-o se estiver vencido.
+
+        Sessões concorrentes esperam a atualização em andamento em vez de
+        repetir as consultas.
+        """
+        with self._lock:
+            vencido = (
+                not self._frames
+                or self._quotes_pendentes
+                or time.monotonic() - self._refreshed_at >= self.min_interval
+            )
+            record_cache("rtd_snapshot", hit=not vencido)
+            if vencido:
+                self._refresh(engine)
+            return Snapshot(
+                config=self._frames["portfolio_config"],
+                quotes=self._frames["realtime_quotes"],
+                metrics=self._frames["portfolio_metrics"],
+                versions=dict(self._versions),
+                refreshed_at=self._refreshed_at,
+            )
+
+    def invalidate(self, *tabelas):
+        """Força a recarga das tabelas informadas (todas, se nenhuma) na próxima leitura."""
+        with self._lock:
+            for tabela in tabelas or tuple(QUERIES):
+                self._loaded_at.pop(tabela, None)
+            self._refreshed_at = 0.0
+
+    def mark_quotes_changed(self):
+        """Aviso do feed de cotações: a próxima leitura busca as cotações novas sem esperar `min_interval`."""
+        with self._lock:
+            self._quotes_pendentes = True
+
+    def latest_quotes(self):
+        """Cotações em memória, sem consultar o banco (None antes da primeira carga)."""
+        with self._lock:
+            return self._frames.get("realtime_quotes")
+
+    def push_quotes(self, novos):
+        """Aplica cotações recebidas por fora do banco (feed simulado) como um incremento."""
+        with self._lock:
+            if "realtime_quotes" in self._frames:
+                self._apply_quotes_increment(novos)
+
+    def _refresh(self, engine):
+        agora = time.monotonic()
+        atuais = self.watcher.fingerprints(engine, list(QUERIES))
+        cargas = {}
+        for tabela in QUERIES:
+            anterior = self._fingerprints.get(tabela)
+            atual = atuais.get(tabela)
+            vencida = agora - self._loaded_at.get(tabela, float("-inf")) >= self.max_age
+            mudou = atual is None or atual != anterior
+            if tabela not in self._frames:
+                cargas[tabela] = partial(self._read_full, engine, tabela, atual)
+            elif vencida:
+                # Invalidada (gravação feita aqui) ou garantia de max_age: direto do banco. O
+                # fingerprint pode ainda ser o de antes da gravação, e a chave do L2 daria o valor antigo.
+                cargas[tabela] = partial(self._read_full, engine, tabela)
+            elif not mudou:
+                continue
+            elif tabela == "realtime_quotes" and self._can_increment(anterior, atual):
+                cargas[tabela] = partial(self._read_quotes_increment, engine)
+            else:
+                cargas[tabela] = partial(self._read_full, engine, tabela, atual)
+        if self._quotes_pendentes and "realtime_quotes" not in cargas:
+            # O feed viu cotações novas que o catálogo ainda pode não refletir
+            if self._quotes_watermark is not None:
+                cargas["realtime_quotes"] = partial(self._read_quotes_increment, engine)
+            else:
+                cargas["realtime_quotes"] = partial(self._read_full, engine, "realtime_quotes")
+        self._quotes_pendentes = False
+        for tabela in QUERIES:
+            record_cache(f"rtd_snapshot.{tabela}", hit=tabela not in cargas)
+
+        # As tabelas pendentes são lidas em paralelo; o estado só muda depois
+        for tabela, (modo, df) in fetch_parallel(engine, cargas).items():
+            if modo == "full":
+                self._apply_full(tabela, df)
+            else:
+                self._apply_quotes_increment(df)
+            self._fingerprints[tabela] = atuais.get(tabela)
+            self._loaded_at[tabela] = agora
+        self._refreshed_at = agora
+
+    def _can_increment(self, anterior, atual):
+        # Linhas apagadas não aparecem pela marca d'água: exige recarga completa.
+        # Sem fingerprint (catálogo ilegível), não há como saber: também recarrega.
+        return (
+            self._quotes_watermark is not None
+            and anterior is not None
+            and atual is not None
+            and atual[2] == anterior[2]
+        )
+
+    def _read_full(self, engine, tabela, versao=None):
+        # Com a versão da tabela conhecida, a leitura é compartilhada entre instâncias (cache L2);
+        # sem ela (versao=None), vai sempre ao banco
+        index_col = "id" if tabela == "portfolio_config" else None
+        cache_ttl = self.max_age if versao is not None else None
+        return "full", read_sql(QUERIES[tabela], engine, cache_ttl=cache_ttl, versao=versao, index_col=index_col)
+
+    def _apply_full(self, tabela, df):
+        if tabela == "realtime_quotes":
+            self._quotes_watermark = self._max_watermark(df)
+        self._frames[tabela] = df
+        self._versions[tabela] += 1
+
+    def _read_quotes_increment(self, engine):
+        # ">=" reprocessa as linhas do último instante, que podem ter sido
+        # gravadas após a leitura anterior; a deduplicação por ticker resolve.
+        query = text(f"SELECT * FROM realtime_quotes WHERE {QUOTES_WATERMARK_COL} >= :wm")
+        return "incremental", read_sql(query, engine, params={"wm": self._quotes_watermark})
+
+    def _apply_quotes_increment(self, novos):
+        if novos.empty:
+            return
+        atual = self._frames["realtime_quotes"]
+        mantidos = atual[~atual["ticker"].isin(novos["ticker"])]
+        self._frames["realtime_quotes"] = pd.concat([mantidos, novos], ignore_index=True)
+        marcas = [m for m in (self._quotes_watermark, self._max_watermark(novos)) if m is not None]
+        self._quotes_watermark = max(marcas) if marcas else None
+        self._versions["realtime_quotes"] += 1
+
+    @staticmethod
+    def _max_watermark(df):
+        if QUOTES_WATERMARK_COL not in df.columns or df.empty:
+            return None
+        return df[QUOTES_WATERMARK_COL].max()
+
+
+@st.cache_resource
+def get_table_watcher():
+    """Observador de alterações compartilhado pelo processo."""
+    return TableChangeWatcher()
+
+
+@st.cache_resource
+def get_portfolio_snapshot():
+    """Snapshot da página RTD compartilhado por todas as sessões."""
+    return PortfolioSnapshot(get_table_watcher())
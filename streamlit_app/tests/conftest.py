@@ -0,0 +1,60 @@
+# streamlit_app/tests/conftest.py
+# Fixtures compartilhadas: o diretório do app no sys.path (como no Streamlit)
+# e um banco SQLite com os dados sintéticos dos benchmarks, em escala pequena.
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+APP = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(APP))
+os.environ.setdefault("PERF_LOG_LEVEL", "WARNING")
+
+
+@pytest.fixture(scope="session")
+def tabelas():
+    from benchmarks.dados_sinteticos import gerar
+    return gerar(escala=0.25)
+
+
+def _criar_banco(tabelas, pasta):
+    from benchmarks.dados_sinteticos import carregar, criar_engine
+    engine = criar_engine(f"sqlite:///{pasta / 'dashaws.db'}")
+    carregar(engine, tabelas)
+    return engine
+
+
+@pytest.fixture(scope="session")
+def engine(tabelas, tmp_path_factory):
+    """Banco somente leitura, compartilhado pelos testes."""
+    return _criar_banco(tabelas, tmp_path_factory.mktemp("banco"))
+
+
+@pytest.fixture
+def engine_gravavel(tabelas, tmp_path):
+    """Banco próprio do teste, que pode ser alterado."""
+    return _criar_banco(tabelas, tmp_path)
+
+
+@pytest.fixture
+def l2_memoria(monkeypatch):
+    """Liga o cache L2 (em memória) para read_sql."""
+    import db
+    from l2_cache import L2Cache, MemoryBackend
+    l2 = L2Cache(MemoryBackend())
+    monkeypatch.setattr(db, "get_l2_cache", lambda: l2)
+    return l2
+
+
+class SemWatcher:
+    """Watcher de tabelas sem catálogo (como no SQLite): nenhum fingerprint."""
+
+    def fingerprints(self, engine, tabelas):
+        return {t: None for t in tabelas}
+
+
+@pytest.fixture
+def sem_watcher():
+    return SemWatcher()
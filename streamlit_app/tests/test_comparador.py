@@ -0,0 +1,31 @@
+# streamlit_app/tests/test_comparador.py
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from comparador import MAX_EMPRESAS, get_comparacao, montar_comparacao
+from demonstracoes_cache import pivotar
+
+
+def _demonstracoes(*linhas):
+    df = pd.DataFrame(linhas, columns=["tipo_demonstracao", "cd_conta", "ds_conta", "dt_fim_exerc", "vl_conta"])
+    return pivotar(df)
+
+
+def test_uniao_das_datas_e_das_contas():
+    comparacao = montar_comparacao({
+        "A": _demonstracoes(("DRE", "3.01", "Receita", "2022-12-31", 90.0), ("DRE", "3.01", "Receita", "2023-12-31", 100.0)),
+        "B": _demonstracoes(("DRE", "3.01", "Receita", "2021-12-31", 10.0), ("DRE", "3.11", "Lucro", "2023-12-31", 2.0)),
+    })
+    assert list(comparacao.datas) == list(pd.to_datetime(["2021-12-31", "2022-12-31", "2023-12-31"]))
+    receita = comparacao.conta("DRE", "3.01")
+    np.testing.assert_array_equal(receita.loc["A"], [np.nan, 90.0, 100.0])
+    np.testing.assert_array_equal(receita.loc["B"], [10.0, np.nan, np.nan])
+    assert comparacao.contas_disponiveis("DRE") == {"3.01": "3.01 - Receita", "3.11": "3.11 - Lucro"}
+    assert comparacao.conta("DRE", "9.99").empty
+
+
+def test_acima_do_limite_levanta_erro():
+    with pytest.raises(ValueError, match=str(MAX_EMPRESAS)):
+        get_comparacao(None, [f"EMPRESA {i}" for i in range(MAX_EMPRESAS + 1)], "ANUAL")
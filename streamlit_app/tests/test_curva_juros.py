@@ -0,0 +1,56 @@
+# streamlit_app/tests/test_curva_juros.py
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from curva_juros import DIAS_ANO, dias_uteis, feriados_nacionais, interpolar_flat_forward, montar_curva
+
+
+def test_interpolacao_nos_vertices_e_entre_eles():
+    du = np.array([[21, 63, 126]])
+    taxas = np.array([[10.0, 11.0, 12.0]])
+    obtido = interpolar_flat_forward(du, taxas, [21, 42, 63, 126, 200])[0]
+
+    # Nos vértices, a própria taxa
+    np.testing.assert_allclose(obtido[[0, 2, 3]], [10.0, 11.0, 12.0])
+    # Entre vértices, a taxa a termo do trecho é constante (log do fator linear)
+    fator = lambda d, t: (1 + t / 100) ** (d / DIAS_ANO)
+    termo = (fator(63, 11.0) / fator(21, 10.0)) ** (21 / 42)
+    assert obtido[1] == pytest.approx(((fator(21, 10.0) * termo) ** (DIAS_ANO / 42) - 1) * 100)
+    # Depois do último, segue a taxa a termo do último trecho
+    termo_final = (fator(126, 12.0) / fator(63, 11.0)) ** (1 / 63)
+    assert obtido[4] == pytest.approx(((fator(126, 12.0) * termo_final ** 74) ** (DIAS_ANO / 200) - 1) * 100)
+
+
+def test_antes_do_primeiro_vertice_e_prazo_zero():
+    obtido = interpolar_flat_forward([[21, 63]], [[10.0, 11.0]], [5, 0])[0]
+    assert obtido[0] == pytest.approx(10.0)
+    assert np.isnan(obtido[1])
+
+
+def test_prazos_por_data_igual_a_prazos_comuns():
+    rng = np.random.default_rng(0)
+    du = np.sort(rng.integers(15, 500, (50, 6)), axis=1) + np.arange(6)
+    taxas = 10 + rng.normal(0, 1, (50, 6))
+    alvo = np.arange(1, 600, 7)
+    comuns = interpolar_flat_forward(du, taxas, alvo)
+    por_data = interpolar_flat_forward(du, taxas, np.tile(alvo[::-1], (50, 1)))[:, ::-1]
+    np.testing.assert_allclose(comuns, por_data)
+
+
+def test_feriados_nacionais():
+    feriados = set(feriados_nacionais(2026, 2026).astype(str))
+    # Carnaval, Sexta-feira Santa e Corpus Christi de 2026 (Páscoa em 5/4)
+    assert {"2026-02-16", "2026-02-17", "2026-04-03", "2026-06-04"} <= feriados
+    assert {"2026-01-01", "2026-04-21", "2026-11-20", "2026-12-25"} <= feriados
+    # Consciência Negra só a partir de 2024
+    assert np.datetime64("2023-11-20") not in feriados_nacionais(2023, 2023)
+
+
+def test_dias_uteis_da_curva_descontam_feriados():
+    datas = pd.DatetimeIndex(["2025-12-19", "2026-02-13"])
+    curva = montar_curva(pd.DataFrame([[10.0, 11.0], [10.5, 11.5]], index=datas), [30, 60])
+    sem_feriados = dias_uteis(datas, [30, 60])
+    # Natal, 1º de janeiro e, em 60 dias, a segunda de Carnaval; Carnaval e, em 60 dias, a Sexta-feira Santa
+    np.testing.assert_array_equal(sem_feriados - curva.dias_uteis(), [[2, 3], [2, 3]])
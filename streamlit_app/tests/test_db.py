@@ -0,0 +1,69 @@
+# streamlit_app/tests/test_db.py
+
+import subprocess
+import sys
+import textwrap
+
+from conftest import APP
+
+# Mais cargas a frio simultâneas da RTD do que threads no pool de fetch_parallel.
+# Roda num processo à parte: com o pool travado, as threads nunca terminariam
+# e o pytest ficaria preso na saída.
+CENARIO = textwrap.dedent("""
+    import sys, threading, time
+    from functools import partial
+    from sqlalchemy import event
+    from benchmarks.dados_sinteticos import carregar, criar_engine, gerar
+    from db import MAX_WORKERS, fetch_parallel
+    from shared_cache import PortfolioSnapshot
+
+    class WatcherLento:
+        # A consulta ao catálogo demora: as outras sessões ocupam o pool enquanto isso
+        def fingerprints(self, engine, tabelas):
+            time.sleep(0.3)
+            return {t: None for t in tabelas}
+
+    engine = criar_engine(sys.argv[1])
+    carregar(engine, gerar(0.25))
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _lento(*args):
+        time.sleep(0.05)
+
+    snapshot = PortfolioSnapshot(WatcherLento(), min_interval=15)
+    sessoes = [
+        threading.Thread(target=fetch_parallel, args=(engine, {"snapshot": partial(snapshot.get, engine), "outra": "SELECT 1"}))
+        for _ in range(MAX_WORKERS + 4)
+    ]
+    for s in sessoes:
+        s.start()
+    for s in sessoes:
+        s.join()
+    print("ok")
+""")
+
+
+def test_fetch_parallel_aninhado_nao_trava(tmp_path):
+    resultado = subprocess.run(
+        [sys.executable, "-c", CENARIO, f"sqlite:///{tmp_path / 'rtd.db'}"],
+        cwd=APP, capture_output=True, text=True, timeout=30,
+    )
+    assert resultado.returncode == 0, resultado.stderr
+    assert resultado.stdout.strip().endswith("ok")
+
+
+def test_fetch_parallel_resultados_e_erro(engine):
+    from db import fetch_parallel
+    resultados = fetch_parallel(engine, {"a": "SELECT 1 AS x", "b": lambda: 2, "c": ("SELECT :v AS x", {"params": {"v": 3}})})
+    assert resultados["a"]["x"].tolist() == [1]
+    assert resultados["b"] == 2
+    assert resultados["c"]["x"].tolist() == [3]
+
+    def falha():
+        raise ValueError("boom")
+    try:
+        fetch_parallel(engine, {"a": "SELECT 1", "b": falha})
+    except ValueError as e:
+        assert str(e) == "boom"
+    else:
+        raise AssertionError("a exceção da tarefa deveria ser propagada")
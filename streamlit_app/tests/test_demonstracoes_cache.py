@@ -0,0 +1,58 @@
+# streamlit_app/tests/test_demonstracoes_cache.py
+
+import numpy as np
+import pandas as pd
+
+from demonstracoes_cache import ordem_contabil, pivotar, pivotar_varias
+
+
+def _linhas(*linhas):
+    return pd.DataFrame(linhas, columns=["denom_cia", "tipo_demonstracao", "cd_conta", "ds_conta", "dt_fim_exerc", "vl_conta"])
+
+
+DF = _linhas(
+    ("A", "DRE", "3.10", "Outras", "2023-12-31", 7.0),
+    ("A", "DRE", "3.2", "Custo", "2023-12-31", -40.0),
+    ("A", "DRE", "3.01", "Receita", "2022-12-31", 90.0),
+    ("A", "DRE", "3.01", "Receita Líquida", "2023-12-31", 100.0),
+    ("A", "BPA", "1", "Ativo", "2023-12-31", 500.0),
+    ("B", "DRE", "3.01", "Receita", "2021-12-31", 10.0),
+)
+
+
+def test_pivotar_varias_por_empresa_e_tipo():
+    resultado = pivotar_varias(DF)
+    assert set(resultado) == {"A", "B"}
+    assert set(resultado["A"]) == {"DRE", "BPA"}
+
+    dre = resultado["A"]["DRE"]
+    # Ordem contábil natural e a descrição do exercício mais recente
+    assert dre.cd_conta.tolist() == ["3.01", "3.2", "3.10"]
+    assert dre.ds_conta.tolist() == ["Receita Líquida", "Custo", "Outras"]
+    assert list(dre.datas) == [pd.Timestamp("2022-12-31"), pd.Timestamp("2023-12-31")]
+    np.testing.assert_array_equal(dre.valores, [[90.0, 100.0], [np.nan, -40.0], [np.nan, 7.0]])
+    assert dre.serie("3.01").tolist() == [90.0, 100.0]
+    assert dre.serie("9.99").empty
+
+    # Só as datas que a própria empresa e tipo têm
+    assert list(resultado["A"]["BPA"].datas) == [pd.Timestamp("2023-12-31")]
+    assert list(resultado["B"]["DRE"].datas) == [pd.Timestamp("2021-12-31")]
+
+
+def test_pivotar_varias_igual_a_pivotar_por_empresa():
+    varias = pivotar_varias(DF)
+    for empresa in ("A", "B"):
+        uma = pivotar(DF[DF["denom_cia"] == empresa].drop(columns="denom_cia"))
+        for tipo, demonstracao in varias[empresa].items():
+            np.testing.assert_array_equal(uma[tipo].valores, demonstracao.valores)
+            assert uma[tipo].cd_conta.tolist() == demonstracao.cd_conta.tolist()
+        # Tipos sem dados vêm vazios
+        assert uma["DFC"].empty
+
+
+def test_pivotar_varias_vazio():
+    assert pivotar_varias(DF.iloc[:0]) == {}
+
+
+def test_ordem_contabil():
+    assert sorted(["3.10", "3.2", "3.01.02", "3.01", "10"], key=ordem_contabil) == ["3.01", "3.01.02", "3.2", "3.10", "10"]
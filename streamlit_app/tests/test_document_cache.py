@@ -0,0 +1,97 @@
+# streamlit_app/tests/test_document_cache.py
+# Um http.server local faz o papel da CVM: ETag, 304 no GET condicional e contagem de downloads.
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from document_cache import DocumentCache, DocumentoGrande
+
+
+class Servidor:
+    def __init__(self):
+        self.documentos = {}  # caminho -> (etag, conteúdo)
+        self.respostas = []  # status de cada requisição
+        servidor = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path not in servidor.documentos:
+                    servidor.respostas.append(404)
+                    self.send_error(404)
+                    return
+                etag, conteudo = servidor.documentos[self.path]
+                if self.headers.get("If-None-Match") == etag:
+                    servidor.respostas.append(304)
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+                servidor.respostas.append(200)
+                self.send_response(200)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", str(len(conteudo)))
+                self.end_headers()
+                self.wfile.write(conteudo)
+
+            def log_message(self, *args):
+                pass
+
+        self._http = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self._http.server_port}"
+        threading.Thread(target=self._http.serve_forever, daemon=True).start()
+
+    def publicar(self, caminho, etag, conteudo):
+        self.documentos[caminho] = (etag, conteudo)
+        return self.url + caminho
+
+    def fechar(self):
+        self._http.shutdown()
+        self._http.server_close()
+
+
+@pytest.fixture
+def servidor():
+    s = Servidor()
+    yield s
+    s.fechar()
+
+
+def test_get_condicional(servidor, tmp_path):
+    cache = DocumentCache(root=str(tmp_path), revalidate_after=0)
+    url = servidor.publicar("/a.pdf", '"v1"', b"%PDF-1" * 1000)
+
+    assert cache.read(url) == b"%PDF-1" * 1000
+    assert cache.read(url) == b"%PDF-1" * 1000  # vencido: revalida, 304 não baixa
+    servidor.publicar("/a.pdf", '"v2"', b"%PDF-2")
+    assert cache.read(url) == b"%PDF-2"
+    assert servidor.respostas == [200, 304, 200]
+    assert cache.total_bytes == len(b"%PDF-2")
+
+
+def test_sem_rede_serve_a_copia_local(servidor, tmp_path):
+    cache = DocumentCache(root=str(tmp_path), revalidate_after=0)
+    url = servidor.publicar("/a.pdf", '"v1"', b"%PDF-1")
+    cache.fetch(url)
+    servidor.fechar()
+    assert cache.read(url) == b"%PDF-1"
+
+
+def test_lru_e_locks_por_url(servidor, tmp_path):
+    cache = DocumentCache(root=str(tmp_path), max_bytes=2500)
+    urls = [servidor.publicar(f"/{i}.pdf", f'"{i}"', bytes([i]) * 1000) for i in range(5)]
+    for url in urls:
+        cache.fetch(url)
+    # Só os dois mais recentes cabem; nenhum lock sobra depois dos downloads
+    assert [url in cache for url in urls] == [False, False, False, True, True]
+    assert cache.total_bytes == 2000
+    assert cache._url_locks == {}
+
+
+def test_read_recusa_documento_grande(servidor, tmp_path):
+    cache = DocumentCache(root=str(tmp_path))
+    url = servidor.publicar("/grande.pdf", '"g"', b"x" * 2048)
+    with pytest.raises(DocumentoGrande):
+        cache.read(url, limite=1024)
+    assert cache.read(url, limite=4096) == b"x" * 2048
@@ -0,0 +1,59 @@
+# streamlit_app/tests/test_empresas_index.py
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+from empresas_index import EmpresasIndex, EmpresasIndexCache
+
+DIM = pd.DataFrame({
+    "denom_cia": ["PETROBRAS", "VALE", "SEM TICKER", "LISTA VAZIA", "NOVA VALE"],
+    "tickers": [["PETR4", "petr3 ", "PETR4"], ["VALE3"], None, [], ["VALE3", ""]],
+})
+
+
+def test_uma_linha_por_ticker_e_empresa():
+    index = EmpresasIndex(DIM)
+    # Ticker repetido na mesma empresa aparece uma vez; vazios e empresas sem ticker ficam de fora
+    assert index.display_list == ["PETR3 - PETROBRAS", "PETR4 - PETROBRAS", "VALE3 - NOVA VALE", "VALE3 - VALE"]
+    assert len(index) == 4
+    assert index.tickers("PETROBRAS") == ["PETR3", "PETR4"]
+    assert index.tickers("SEM TICKER") == []
+    assert index.display_to_empresa["VALE3 - VALE"] == "VALE"
+    assert index.display_to_empresa["VALE3 - NOVA VALE"] == "NOVA VALE"
+
+
+def test_consultas_por_ticker():
+    index = EmpresasIndex(DIM)
+    assert index.empresa(" petr4") == "PETROBRAS"
+    assert index.empresa("XXXX3") is None
+    # Ticker em duas empresas: resolve para uma delas, sempre a mesma
+    assert index.empresa("VALE3") in {"VALE", "NOVA VALE"}
+    assert index.empresas_dos_tickers(["PETR3", "XXXX3", "PETR4", np.nan]) == ["PETROBRAS"]
+
+
+def test_indice_vazio():
+    index = EmpresasIndex(DIM.iloc[:0])
+    assert len(index) == 0
+    assert index.empresa("PETR4") is None
+
+
+class WatcherContador:
+    def __init__(self):
+        self.versao = (1, 0, 0)
+
+    def fingerprints(self, engine, tabelas):
+        return {t: self.versao for t in tabelas}
+
+
+def test_cache_reconstroi_quando_a_tabela_muda(engine_gravavel):
+    watcher = WatcherContador()
+    cache = EmpresasIndexCache(watcher)
+    index = cache.get(engine_gravavel)
+    assert cache.get(engine_gravavel) is index
+
+    with engine_gravavel.begin() as conn:
+        conn.execute(text("DELETE FROM dim_empresas WHERE denom_cia = :e"), {"e": index.display_to_empresa[index.display_list[0]]})
+    assert cache.get(engine_gravavel) is index
+    watcher.versao = (1, 0, 1)
+    assert len(cache.get(engine_gravavel)) < len(index)
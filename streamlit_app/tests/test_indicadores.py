@@ -0,0 +1,83 @@
+# streamlit_app/tests/test_indicadores.py
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy import text
+
+from indicadores import NOMES_CONTAS, NOMES_INDICADORES, IndicadoresStore, calcular_indicadores
+
+
+def _contas(**valores):
+    """Matriz (1 empresa × len(datas) × conta) com as contas dadas por nome."""
+    n = len(next(iter(valores.values())))
+    contas = np.full((1, n, len(NOMES_CONTAS)), np.nan)
+    for nome, serie in valores.items():
+        contas[0, :, NOMES_CONTAS.index(nome)] = serie
+    return contas
+
+
+def _indicador(resultado, nome):
+    return resultado[0, :, NOMES_INDICADORES.index(nome)]
+
+
+def test_calcular_indicadores():
+    datas = pd.DatetimeIndex(["2022-12-31", "2023-12-31", "2024-06-30"])
+    contas = _contas(
+        receita=[100.0, 120.0, 60.0], lucro_bruto=[40.0, 48.0, 30.0], ebit=[20.0, 30.0, 10.0],
+        lucro_liquido=[10.0, -5.0, 3.0], patrimonio_liquido=[50.0, 0.0, 60.0], ativo_total=[200.0, 220.0, 240.0],
+        caixa=[5.0, 5.0, np.nan], emprestimos_cp=[10.0, np.nan, np.nan], emprestimos_lp=[20.0, 15.0, np.nan],
+    )
+    r = calcular_indicadores(contas, datas)
+
+    np.testing.assert_allclose(_indicador(r, "roe"), [20.0, np.nan, 5.0])  # PL zero: sem divisão
+    np.testing.assert_allclose(_indicador(r, "margem_bruta"), [40.0, 40.0, 50.0])
+    np.testing.assert_allclose(_indicador(r, "margem_liquida"), [10.0, -5 / 120 * 100, 5.0])
+    # Dívida bruta só é NaN se as duas contas faltarem; o caixa ausente conta como zero
+    np.testing.assert_allclose(_indicador(r, "divida_bruta_pl"), [0.6, np.nan, np.nan])
+    np.testing.assert_allclose(_indicador(r, "divida_liquida_pl"), [0.5, np.nan, np.nan])
+    # Crescimento só contra a data exatamente um ano antes, sobre o valor absoluto
+    np.testing.assert_allclose(_indicador(r, "cresc_receita"), [np.nan, 20.0, np.nan])
+    np.testing.assert_allclose(_indicador(r, "cresc_lucro"), [np.nan, -150.0, np.nan])
+
+
+class WatcherFixo:
+    def fingerprints(self, engine, tabelas):
+        return {t: (1, 0, 0) for t in tabelas}
+
+
+def test_reapresentacao_e_relida(engine_gravavel, tmp_path):
+    store = IndicadoresStore(WatcherFixo(), root=str(tmp_path))
+    antes = store.get(engine_gravavel, "ANUAL").ultimos()
+    empresa, data = antes.index[0], antes["data"].iloc[0]
+
+    # Reapresentação: mesmo número de linhas e mesma última data, receita dobrada
+    with engine_gravavel.begin() as conn:
+        conn.execute(text("""
+            UPDATE cvm_dados_financeiros SET vl_conta = vl_conta * 2
+            WHERE denom_cia = :e AND periodo = 'ANUAL' AND tipo_demonstracao = 'DRE' AND cd_conta = '3.01'
+        """), {"e": empresa})
+    store._fingerprint["ANUAL"] = None  # o watcher acusa mudança na tabela
+    depois = store.get(engine_gravavel, "ANUAL").ultimos()
+    assert depois.loc[empresa, "data"] == data
+    assert depois.loc[empresa, "margem_bruta"] == pytest.approx(antes.loc[empresa, "margem_bruta"] / 2)
+    outra = antes.index[1]
+    assert depois.loc[outra, "margem_bruta"] == pytest.approx(antes.loc[outra, "margem_bruta"])
+
+    # O resumo (com a soma) volta do disco igual ao da memória
+    outro = IndicadoresStore(WatcherFixo(), root=str(tmp_path))
+    outro._load_disk("ANUAL")
+    assert outro._resumos["ANUAL"] == store._resumos["ANUAL"]
+
+
+def test_arquivo_truncado_e_carga_completa(engine_gravavel, tmp_path):
+    root = tmp_path / "indicadores"
+    esperado = IndicadoresStore(WatcherFixo(), root=str(root)).get(engine_gravavel, "ANUAL").ultimos()
+    assert sorted(os.listdir(root)) == ["anual_contas.parquet", "anual_resumo.parquet"]
+    path = root / "anual_resumo.parquet"
+    path.write_bytes(path.read_bytes()[:100])
+
+    ultimos = IndicadoresStore(WatcherFixo(), root=str(root)).get(engine_gravavel, "ANUAL").ultimos()
+    pd.testing.assert_frame_equal(ultimos, esperado)
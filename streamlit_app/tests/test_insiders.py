@@ -0,0 +1,57 @@
+# streamlit_app/tests/test_insiders.py
+
+import os
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+from insiders import InsidersStore, resolver_empresas, sinal_operacao
+
+
+def test_sinal_operacao():
+    descricoes = ["Compra à vista", "VENDA", "Alienação em bolsa", "Aquisição", "Subscrição", None, "compra"]
+    np.testing.assert_array_equal(sinal_operacao(descricoes), [1, -1, -1, 1, 0, 0, 1])
+    assert sinal_operacao([]).dtype == np.int8
+
+
+def test_resolver_empresas():
+    denominacoes = ["PETROLEO BRASILEIRO S.A. - PETROBRAS", "COMPANHIA XYZ S.A.", "ÁGUA VIVA SA", None]
+    nomes = ["Cia. XYZ S/A", "Agua Viva S.A.", "Companhia XYZ SA", "Desconhecida SA", None, ""]
+    resolvidos = resolver_empresas(nomes, denominacoes)
+    assert list(resolvidos) == ["COMPANHIA XYZ S.A.", "ÁGUA VIVA SA", "COMPANHIA XYZ S.A.", None, None, None]
+
+
+class WatcherFixo:
+    def fingerprints(self, engine, tabelas):
+        return {t: (1, 0, 0) for t in tabelas}
+
+
+def test_correcao_de_valor_e_relida(engine_gravavel, tmp_path):
+    store = InsidersStore(WatcherFixo(), root=str(tmp_path))
+    radar = store.get(engine_gravavel)
+    empresa = radar.empresas()[0]
+    nome = radar.ultimas(empresa, 1)["nome_companhia"].iloc[0]
+    antes = radar.transacoes.loc[radar.transacoes["nome_companhia"] == nome, "valor"].sum()
+
+    # Correção de valor: mesma contagem e mesma última data
+    with engine_gravavel.begin() as conn:
+        conn.execute(text("UPDATE transacoes SET valor = valor * 2 WHERE nome_companhia = :n"), {"n": nome})
+    store._fingerprint = None  # o watcher acusa mudança na tabela
+    radar = store.get(engine_gravavel)
+    depois = radar.transacoes.loc[radar.transacoes["nome_companhia"] == nome, "valor"].sum()
+    assert depois == 2 * antes
+
+
+def test_arquivo_truncado_e_carga_completa(engine_gravavel, tmp_path):
+    root = tmp_path / "insiders"
+    esperado = InsidersStore(WatcherFixo(), root=str(root)).get(engine_gravavel)
+    # Sem temporários sobrando
+    assert sorted(os.listdir(root)) == ["resumo.parquet", "transacoes.parquet"]
+    path = root / "transacoes.parquet"
+    path.write_bytes(path.read_bytes()[:100])
+
+    radar = InsidersStore(WatcherFixo(), root=str(root)).get(engine_gravavel)
+    assert len(radar.transacoes) == len(esperado.transacoes)
+    # E o arquivo é regravado inteiro
+    assert len(pd.read_parquet(path)) == len(esperado.transacoes)
@@ -0,0 +1,37 @@
+# streamlit_app/tests/test_instrumentation.py
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+import instrumentation
+from instrumentation import instrument_engine, panel_enabled
+
+
+def test_comando_com_erro_nao_deixa_inicio_na_pilha():
+    engine = instrument_engine(create_engine("sqlite://"))
+    with engine.connect() as conn:
+        for _ in range(3):
+            with pytest.raises(OperationalError):
+                conn.execute(text("SELECT * FROM tabela_que_nao_existe"))
+        assert conn.info.get("perf_inicio") == []
+        conn.execute(text("SELECT 1"))
+        assert conn.info["perf_inicio"] == []
+
+
+@pytest.mark.parametrize("ambiente, admin, perf, esperado", [
+    (None, {}, "1", False),  # ?perf=1 sozinho não abre o painel
+    ("1", {}, "", True),
+    (None, {"perf_panel": True}, "", True),
+    (None, {"perf_token": "s3gredo"}, "s3gredo", True),
+    (None, {"perf_token": "s3gredo"}, "outro", False),
+    (None, {"perf_token": ""}, "", False),
+])
+def test_painel_so_para_administracao(monkeypatch, ambiente, admin, perf, esperado):
+    if ambiente is None:
+        monkeypatch.delenv("PERF_PANEL", raising=False)
+    else:
+        monkeypatch.setenv("PERF_PANEL", ambiente)
+    monkeypatch.setattr(instrumentation.st, "secrets", {"admin": admin})
+    monkeypatch.setattr(instrumentation.st, "query_params", {"perf": perf} if perf else {})
+    assert panel_enabled() is esperado
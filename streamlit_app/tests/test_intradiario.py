@@ -0,0 +1,86 @@
+# streamlit_app/tests/test_intradiario.py
+
+import os
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+
+import numpy as np
+
+from intradiario import CAMPOS, SerieIntradiaria
+
+INICIO = datetime(2026, 10, 16, 10, 0)
+
+
+def _resultado(cota, contrib):
+    return SimpleNamespace(**{**dict.fromkeys(CAMPOS, 0.0), "cota_atual": cota}, contrib_rs=np.asarray(contrib, dtype=float))
+
+
+def _serie(root, **kwargs):
+    return SerieIntradiaria(intervalo=60, root=str(root), **{"gravar_a_cada": 3600, **kwargs})
+
+
+def test_um_ponto_por_intervalo_com_o_ultimo_calculo(tmp_path):
+    serie = _serie(tmp_path)
+    serie.registrar(_resultado(1.00, [10.0]), ["A"], INICIO)
+    serie.registrar(_resultado(1.01, [20.0]), ["A"], INICIO + timedelta(seconds=30))
+    # Ativo novo no dia; ticker repetido soma as contribuições
+    serie.registrar(_resultado(1.02, [5.0, 1.0, 2.0]), ["A", "B", "B"], INICIO + timedelta(seconds=70))
+
+    intradiario = serie.serie(INICIO.date())
+    assert len(intradiario) == 2
+    np.testing.assert_array_equal(intradiario.campo("cota_atual"), [1.01, 1.02])
+    assert intradiario.tickers == ("A", "B")
+    np.testing.assert_array_equal(intradiario.contribuicoes, [[20.0, 0.0], [5.0, 3.0]])
+    assert intradiario.instantes[0] == np.datetime64(INICIO + timedelta(seconds=30), "ns")
+
+
+def test_anel_cheio_mantem_os_mais_recentes_em_ordem(tmp_path):
+    serie = _serie(tmp_path, duracao=5 * 60)
+    for i in range(8):
+        serie.registrar(_resultado(float(i), [1.0]), ["A"], INICIO + timedelta(minutes=i))
+    intradiario = serie.serie(INICIO.date())
+    np.testing.assert_array_equal(intradiario.campo("cota_atual"), [3.0, 4.0, 5.0, 6.0, 7.0])
+    assert np.all(np.diff(intradiario.instantes) > np.timedelta64(0))
+
+
+def test_processo_novo_retoma_o_dia_gravado(tmp_path):
+    serie = _serie(tmp_path)
+    for i in range(3):
+        serie.registrar(_resultado(float(i), [1.0]), ["A"], INICIO + timedelta(minutes=i))
+    assert not os.listdir(tmp_path)
+    serie.gravar()
+
+    retomada = _serie(tmp_path).serie(INICIO.date())
+    np.testing.assert_array_equal(retomada.campo("cota_atual"), [0.0, 1.0, 2.0])
+    assert retomada.tickers == ("A",)
+
+
+def test_virada_do_dia_grava_os_pendentes(tmp_path):
+    serie = _serie(tmp_path)
+    serie.registrar(_resultado(1.0, [1.0]), ["A"], INICIO)
+    amanha = INICIO + timedelta(days=1)
+    serie.registrar(_resultado(2.0, [1.0]), ["B"], amanha)
+
+    hoje = serie.serie(amanha.date())
+    np.testing.assert_array_equal(hoje.campo("cota_atual"), [2.0])
+    assert hoje.tickers == ("B",)
+    # O pregão anterior foi gravado antes da virada e continua legível
+    anterior = _serie(tmp_path).serie(INICIO.date())
+    np.testing.assert_array_equal(anterior.campo("cota_atual"), [1.0])
+
+
+def test_so_o_dia_corrente_e_o_anterior_ficam_em_disco(tmp_path):
+    serie = _serie(tmp_path, gravar_a_cada=0)
+    for dias in range(4):
+        serie.registrar(_resultado(1.0, [1.0]), ["A"], INICIO + timedelta(days=dias))
+    assert sorted(os.listdir(tmp_path)) == ["intradiario-2026-10-18.npz", "intradiario-2026-10-19.npz"]
+    assert len(serie.serie(date(2026, 10, 19))) == 1
+
+
+def test_grava_mesmo_com_o_diretorio_apagado(tmp_path):
+    root = tmp_path / "intradiario"
+    serie = _serie(root)
+    serie.registrar(_resultado(1.0, [1.0]), ["A"], INICIO)
+    os.rmdir(root)
+    serie.gravar()
+    assert os.listdir(root) == ["intradiario-2026-10-16.npz"]
@@ -0,0 +1,52 @@
+# streamlit_app/tests/test_macro_data.py
+
+import os
+import shutil
+from datetime import date
+
+import pandas as pd
+
+import macro_data
+from macro_data import SERIES, FixtureProvider, MacroStore
+
+CDI = SERIES["cdi"].codigo
+
+
+def _store(root, hoje):
+    return MacroStore(FixtureProvider(today=hoje), root=str(root), ttl=0)
+
+
+def test_sync_grava_so_os_pontos_novos(tmp_path):
+    store = _store(tmp_path, date(2026, 9, 30))
+    store.sync([CDI])
+    store.provider.today = date(2026, 10, 16)
+    store.sync([CDI])
+
+    partes = store._partes(CDI)
+    assert len(partes) == 2
+    segunda = pd.read_parquet(partes[1])["valor"]
+    assert segunda.index.min() > pd.Timestamp("2026-09-30")
+    # Processo novo lê as partes e vê a série inteira, igual à da memória
+    pd.testing.assert_series_equal(_store(tmp_path, date(2026, 10, 16))._load(CDI), store._load(CDI), check_freq=False)
+
+
+def test_sync_recria_o_diretorio_apagado(tmp_path):
+    store = _store(tmp_path, date(2026, 9, 30))
+    store.sync([CDI])
+    tamanho = len(store._load(CDI))
+    shutil.rmtree(os.path.join(tmp_path, "series"))
+
+    store.provider.today = date(2026, 10, 16)
+    store.sync([CDI])
+    # O disco perdeu a série: ela volta inteira, não só os pontos novos
+    assert len(_store(tmp_path, date(2026, 10, 16))._load(CDI)) > tamanho
+
+
+def test_partes_sao_compactadas(tmp_path, monkeypatch):
+    monkeypatch.setattr(macro_data, "MAX_PARTES", 3)
+    store = _store(tmp_path, date(2026, 9, 1))
+    for dia in range(2, 12):
+        store.provider.today = date(2026, 9, dia)
+        store.sync([CDI])
+    assert len(store._partes(CDI)) <= 3
+    pd.testing.assert_series_equal(_store(tmp_path, date(2026, 9, 11))._load(CDI), store._load(CDI), check_freq=False)
@@ -0,0 +1,97 @@
+# streamlit_app/tests/test_market_data.py
+
+import sqlite3
+import threading
+from datetime import date, timedelta
+
+import pandas as pd
+
+from market_data import FixtureProvider, MarketDataStore
+
+HOJE = date.today()
+
+
+class ProviderEspiao(FixtureProvider):
+    """Provedor offline que guarda os pedidos de histórico."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.pedidos = []
+
+    def history(self, tickers, start):
+        self.pedidos.append((sorted(tickers), start))
+        return super().history(tickers, start)
+
+
+def test_prefetch_busca_so_as_barras_que_faltam(tmp_path):
+    provider = ProviderEspiao(today=HOJE - timedelta(days=10))
+    store = MarketDataStore(provider, root=str(tmp_path), history_ttl=0)
+    assert store.prefetch(["A.SA", "B.SA"]) == ["A.SA", "B.SA"]
+    ultima = store._load("A.SA").index.max().date()
+
+    provider.today = HOJE
+    store.prefetch(["A.SA", "B.SA"])
+    # Uma só chamada, a partir da última barra guardada (que pode ter sido parcial)
+    assert provider.pedidos[-1] == (["A.SA", "B.SA"], ultima)
+    # Os preços de um dia não dependem da janela pedida (o volume sintético depende)
+    completo = FixtureProvider(today=HOJE).history(["A.SA"], HOJE - timedelta(days=365))["A.SA"]
+    precos = ["Open", "High", "Low", "Close"]
+    pd.testing.assert_frame_equal(store.history("A.SA")[precos], completo[precos], check_freq=False)
+
+
+def test_prefetch_respeita_o_ttl(tmp_path):
+    provider = ProviderEspiao(today=HOJE)
+    store = MarketDataStore(provider, root=str(tmp_path), history_ttl=3600)
+    store.prefetch(["A.SA"])
+    assert store.prefetch(["A.SA"]) == []
+    assert store.pendentes(["A.SA", "B.SA"]) == {"B.SA": HOJE - timedelta(days=365)}
+
+    # Vencido: volta ao provedor
+    with sqlite3.connect(tmp_path / "market_data.sqlite") as db:
+        db.execute("UPDATE history_meta SET fetched_at = fetched_at - 3601")
+    assert store.prefetch(["A.SA"]) == ["A.SA"]
+    assert len(provider.pedidos) == 2
+
+
+def test_reabre_do_disco_sem_o_provedor(tmp_path):
+    store = MarketDataStore(FixtureProvider(today=HOJE), root=str(tmp_path))
+    store.prefetch(["A.SA"])
+    info = store.info("A.SA")
+
+    provider = ProviderEspiao(today=HOJE)
+    reaberto = MarketDataStore(provider, root=str(tmp_path))
+    pd.testing.assert_frame_equal(reaberto.history("A.SA"), store.history("A.SA"), check_freq=False)
+    assert reaberto.info("A.SA") == info
+    assert provider.calls == {"info": 0, "history": 0}
+
+
+def test_schedule_em_segundo_plano_sem_repetir(tmp_path):
+    liberar = threading.Event()
+
+    class ProviderLento(FixtureProvider):
+        def history(self, tickers, start):
+            liberar.wait(5)
+            return super().history(tickers, start)
+
+    provider = ProviderLento(today=HOJE)
+    store = MarketDataStore(provider, root=str(tmp_path))
+    assert store.schedule(["A.SA", "B.SA"]) == ["A.SA", "B.SA"]
+    # Ainda em andamento: nada é agendado de novo
+    assert store.schedule(["A.SA"]) == []
+    liberar.set()
+    store._executor.shutdown(wait=True)
+    assert provider.calls["history"] == 1
+    assert not store._load("B.SA").empty
+    assert store.pendentes(["A.SA", "B.SA"]) == {}
+
+
+def test_schedule_registra_a_falha(tmp_path, caplog):
+    class ProviderFora(FixtureProvider):
+        def history(self, tickers, start):
+            raise ConnectionError("sem rede")
+
+    store = MarketDataStore(ProviderFora(), root=str(tmp_path))
+    store.schedule(["A.SA"])
+    store._executor.shutdown(wait=True)
+    assert "pré-carga do histórico de mercado falhou" in caplog.text
+    assert store.pendentes(["A.SA"]) == {"A.SA": HOJE - timedelta(days=365)}
@@ -0,0 +1,73 @@
+# streamlit_app/tests/test_novos_documentos.py
+
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+
+from novos_documentos import FeedDocumentos
+
+AGORA = datetime.now().replace(microsecond=0)
+
+
+class WatcherFixo:
+    def fingerprints(self, engine, tabelas):
+        return {t: (1, 0, 0) for t in tabelas}
+
+
+def _inserir(engine, *documentos):
+    """Documentos (id, empresa, data_entrega) de empresas só do teste."""
+    with engine.begin() as conn:
+        for id_, empresa, data in documentos:
+            conn.execute(text("""
+                INSERT INTO cvm_documentos_ipe (id, data_entrega, nome_companhia, categoria, assunto, link_download)
+                VALUES (:id, :data, :empresa, 'Fato Relevante', 'Teste', NULL)
+            """), {"id": id_, "data": data.strftime("%Y-%m-%d %H:%M:%S.000000"), "empresa": empresa})
+
+
+def test_marca_dagua_por_data_e_id(engine_gravavel):
+    ontem = AGORA - timedelta(days=1)
+    _inserir(engine_gravavel, (9001, "TESTE A", ontem), (9002, "TESTE A", ontem))
+    feed = FeedDocumentos(WatcherFixo())
+    assert feed.get(engine_gravavel, ["TESTE A"])["id"].tolist() == [9002, 9001]
+    assert feed._marca[1] == 9002
+
+    # Mesma data da marca com id maior entra; data anterior à marca não é relida
+    _inserir(engine_gravavel, (9003, "TESTE A", ontem), (9004, "TESTE A", ontem - timedelta(hours=1)), (9005, "TESTE A", AGORA))
+    assert feed.get(engine_gravavel, ["TESTE A"])["id"].tolist() == [9002, 9001]  # catálogo igual: não busca
+    feed._fingerprint = None  # o watcher acusa mudança na tabela
+    assert feed.get(engine_gravavel, ["TESTE A"])["id"].tolist() == [9005, 9003, 9002, 9001]
+
+
+def test_carteira_nova_refaz_o_anel(engine_gravavel):
+    _inserir(engine_gravavel, (9001, "TESTE A", AGORA - timedelta(days=1)), (9002, "TESTE B", AGORA - timedelta(days=2)))
+    feed = FeedDocumentos(WatcherFixo(), tamanho=2)
+    assert feed.get(engine_gravavel, ["TESTE A"])["id"].tolist() == [9001]
+    assert feed.get(engine_gravavel, ["TESTE B"])["id"].tolist() == [9002]
+    # A marca recomeça com a carteira: o documento mais antigo de B não fica de fora
+    assert feed.get(engine_gravavel, ["TESTE B", "TESTE A"])["id"].tolist() == [9001, 9002]
+    assert feed.get(engine_gravavel, [])["id"].tolist() == []
+
+    # O anel guarda só os `tamanho` mais recentes
+    _inserir(engine_gravavel, (9003, "TESTE A", AGORA))
+    feed._fingerprint = None
+    assert feed.get(engine_gravavel, ["TESTE A", "TESTE B"])["id"].tolist() == [9003, 9001]
+
+
+def test_janela_de_dias(engine_gravavel):
+    _inserir(engine_gravavel, (9001, "TESTE A", AGORA - timedelta(days=10)), (9002, "TESTE A", AGORA - timedelta(days=3)))
+    feed = FeedDocumentos(WatcherFixo(), dias=7)
+    assert feed.get(engine_gravavel, ["TESTE A"])["id"].tolist() == [9002]
+    # O que já está no anel sai quando passa da janela
+    feed.dias = 2
+    assert feed.get(engine_gravavel, ["TESTE A"]).empty
+
+
+def test_sem_fingerprint_busca_apos_max_age(engine_gravavel, sem_watcher, l2_memoria):
+    _inserir(engine_gravavel, (9001, "TESTE A", AGORA - timedelta(days=1)))
+    feed = FeedDocumentos(sem_watcher, max_age=300)
+    assert feed.get(engine_gravavel, ["TESTE A"])["id"].tolist() == [9001]
+    _inserir(engine_gravavel, (9002, "TESTE A", AGORA))
+    assert feed.get(engine_gravavel, ["TESTE A"])["id"].tolist() == [9001]
+
+    feed._checked_at -= 301
+    assert feed.get(engine_gravavel, ["TESTE A"])["id"].tolist() == [9002, 9001]
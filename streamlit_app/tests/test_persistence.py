@@ -0,0 +1,67 @@
+# streamlit_app/tests/test_persistence.py
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+from persistence import diff_portfolio, save_portfolio_diff, upsert_metrics
+
+
+def _carteira(linhas, ids):
+    return pd.DataFrame(linhas, columns=["ticker", "quantidade", "posicao_alvo"], index=pd.Index(ids, name="id"))
+
+
+ORIGINAL = _carteira([("PETR4", 100, 0.1), ("VALE3", 200, 0.2), ("ITUB4", 300, 0.3)], [1, 2, 3])
+
+
+def test_diff_portfolio():
+    editado = _carteira(
+        [("petr4 ", 100, 0.1 + 1e-12), ("VALE3", 250, 0.2), ("WEGE3", 50, 0.05), ("", 10, 0.0), (None, 1, 0.0)],
+        [1, 2, np.nan, np.nan, np.nan],
+    )
+    diff = diff_portfolio(ORIGINAL, editado)
+    # Maiúsculas, espaços e diferenças de ponto flutuante não contam como alteração
+    assert diff.updates == [{"ticker": "VALE3", "quantidade": 250, "posicao_alvo": 0.2, "id": 2}]
+    assert diff.inserts == [{"ticker": "WEGE3", "quantidade": 50, "posicao_alvo": 0.05}]
+    assert diff.deletes == [3]
+    assert diff.resumo() == "1 inclusão(ões), 1 alteração(ões), 1 exclusão(ões)"
+
+
+def test_diff_portfolio_sem_mudanca_e_valores_nulos():
+    assert diff_portfolio(ORIGINAL, ORIGINAL.copy()).vazio
+    editado = ORIGINAL.copy()
+    editado.loc[3, "posicao_alvo"] = np.nan
+    diff = diff_portfolio(ORIGINAL, editado)
+    assert diff.updates == [{"ticker": "ITUB4", "quantidade": 300, "posicao_alvo": None, "id": 3}]
+
+
+def test_save_portfolio_diff(engine_gravavel):
+    original = pd.read_sql("SELECT id, ticker, quantidade, posicao_alvo FROM portfolio_config", engine_gravavel, index_col="id")
+    editado = original.iloc[1:].copy()
+    editado.iloc[0, editado.columns.get_loc("quantidade")] = 12345
+    editado = pd.concat([editado, _carteira([("NOVO3", 10, 0.01)], [np.nan])])
+
+    save_portfolio_diff(engine_gravavel, diff_portfolio(original, editado))
+    depois = pd.read_sql("SELECT ticker, quantidade FROM portfolio_config", engine_gravavel).set_index("ticker")["quantidade"]
+    assert original["ticker"].iloc[0] not in depois.index
+    assert depois[original["ticker"].iloc[1]] == 12345
+    assert depois["NOVO3"] == 10
+    assert len(depois) == len(original)
+
+
+def test_upsert_metrics_grava_so_as_alteradas(engine_gravavel):
+    def metricas():
+        return pd.read_sql("SELECT metric_key, metric_value FROM portfolio_metrics", engine_gravavel).set_index("metric_key")["metric_value"]
+
+    with engine_gravavel.begin() as conn:
+        # A chave primária do banco real, que o ON CONFLICT exige
+        conn.execute(text("CREATE UNIQUE INDEX ix_metric_key ON portfolio_metrics (metric_key)"))
+        conn.execute(text("UPDATE portfolio_metrics SET metric_value = NULL WHERE metric_key = 'outros'"))
+    # Do Postgres (coluna NUMERIC, dtype object), o NULL chega como None, não NaN
+    atuais = {**metricas().to_dict(), "outros": None}
+    novas = {"cota_d1": atuais["cota_d1"] + 1e-12, "caixa_bruto": atuais["caixa_bruto"] + 10, "outros": 5.0, "nova_metrica": 1.0}
+    # Diferença de ponto flutuante não conta; NULL no banco e chave nova contam
+    assert sorted(upsert_metrics(engine_gravavel, novas, atuais)) == ["caixa_bruto", "nova_metrica", "outros"]
+    depois = metricas()
+    assert depois["outros"] == 5.0 and depois["nova_metrica"] == 1.0
+    assert upsert_metrics(engine_gravavel, novas, depois.to_dict()) == []
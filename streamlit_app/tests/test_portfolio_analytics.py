@@ -0,0 +1,106 @@
+# streamlit_app/tests/test_portfolio_analytics.py
+
+import numpy as np
+import pytest
+
+from benchmarks.bench_portfolio_analytics import _carteira_sintetica, _referencia_pandas
+from portfolio_analytics import compute_portfolio, lote_padrao, rebalancear
+
+COLUNAS = ("quantidade", "last_price", "previous_close", "posicao_alvo")
+
+
+def _comparar_com_pandas(r, df, caixa, cotas, cenario=()):
+    """Compara o `cenario` (índice nas dimensões de lote) do resultado com a lógica pandas antiga."""
+    ref, net_long, exposicao, cota = _referencia_pandas(df, caixa, cotas)
+    for campo in ("posicao_rs", "posicao_rs_d1", "var_dia_perc", "contrib_rs", "posicao_perc",
+                  "contrib_perc", "diferenca_perc", "ajuste_qtd"):
+        np.testing.assert_allclose(getattr(r, campo)[cenario], ref[campo], rtol=1e-10, atol=1e-9, err_msg=campo)
+    assert r.net_long[cenario] == pytest.approx(net_long)
+    assert r.exposicao_total[cenario] == pytest.approx(exposicao)
+    assert r.cota_atual[cenario] == pytest.approx(cota)
+
+
+def test_compute_portfolio_igual_a_logica_pandas():
+    df = _carteira_sintetica(50, np.random.default_rng(1))
+    r = compute_portfolio(*(df[c].to_numpy() for c in COLUNAS), caixa_liquido=1e6, qtd_cotas=1e5, cota_d1=9.5)
+    _comparar_com_pandas(r, df, 1e6, 1e5)
+    assert r.variacao_cota_dia == pytest.approx(r.cota_atual / 9.5 - 1)
+
+
+def test_compute_portfolio_em_lote_igual_a_logica_pandas():
+    rng = np.random.default_rng(2)
+    df = _carteira_sintetica(30, rng)
+    precos = df["last_price"].to_numpy() * rng.normal(1, 0.05, (4, 3, 30))
+    caixa = rng.uniform(0, 1e6, (4, 3))
+    r = compute_portfolio(df["quantidade"], precos, df["previous_close"], df["posicao_alvo"], caixa, 1e5)
+    assert r.posicao_rs.shape == (4, 3, 30)
+    assert r.patrimonio_liquido.shape == r.cota_atual.shape == (4, 3)
+    for i, j in np.ndindex(4, 3):
+        _comparar_com_pandas(r, df.assign(last_price=precos[i, j]), caixa[i, j], 1e5, cenario=(i, j))
+
+
+def test_compute_portfolio_preco_ausente_so_afeta_a_linha():
+    # Sem cotação, sem fechamento anterior, ambos zerados, e um ativo normal
+    r = compute_portfolio([100, 200, 300, 400], [np.nan, 12.0, 0.0, 11.0], [10.0, 0.0, 0.0, 10.0], [0.25] * 4)
+    np.testing.assert_array_equal(r.preco, [10.0, 12.0, 0.0, 11.0])
+    # A variação do dia só zera nas linhas sem preço; antes, a coluna inteira zerava
+    np.testing.assert_allclose(r.var_dia_perc, [0.0, 0.0, 0.0, 10.0])
+    np.testing.assert_allclose(r.contrib_rs, [0.0, 0.0, 0.0, 400.0])
+    np.testing.assert_allclose(r.posicao_rs_d1, [1000.0, 2400.0, 0.0, 4000.0])
+    # Sem preço nenhum, o ajuste fica em 0 em vez de infinito
+    assert r.ajuste_qtd[2] == 0.0
+    assert np.all(np.isfinite(r.ajuste_qtd))
+
+
+def test_compute_portfolio_denominadores_zerados():
+    # PL zero (posição comprada igual ao caixa negativo), sem cotas e sem cota de D-1
+    r = compute_portfolio([100, 0], [10.0, 5.0], [10.0, 5.0], [0.5, 0.5], caixa_liquido=-1000.0, qtd_cotas=0.0, cota_d1=0.0)
+    assert r.patrimonio_liquido == 0.0
+    np.testing.assert_array_equal(r.posicao_perc, [0.0, 0.0])
+    assert r.posicao_comprada_perc == r.net_long == r.cota_atual == r.variacao_cota_dia == 0.0
+    np.testing.assert_array_equal(r.contrib_perc, [0.0, 0.0])
+
+
+def test_ordens_em_lotes_ate_o_alvo():
+    # PL de 100.000: 50% em A (R$ 10) e 50% em B (R$ 20), partindo só de caixa
+    r = rebalancear([0, 0], [10.0, 20.0], [0.5, 0.5], caixa_liquido=100_000, lote=100)
+    np.testing.assert_array_equal(r.ordem, [5000, 2500])
+    assert r.caixa_final == pytest.approx(0.0)
+    assert r.erro_alvo == pytest.approx(0.0)
+
+
+def test_arredonda_para_o_lote_mais_proximo_e_vende():
+    r = rebalancear([1000, 0], [10.0, 10.0], [0.0, 0.5], caixa_liquido=10_240, lote=[100, 100])
+    # Alvo de B = 1.012 ações (metade de R$ 20.240 a R$ 10): 1.000 é o lote mais próximo; A é vendida inteira
+    np.testing.assert_array_equal(r.ordem, [-1000, 1000])
+
+
+def test_compras_respeitam_o_caixa_minimo_com_custo():
+    quantidade, preco, alvo = [0, 0, 0], [10.0, 25.0, 7.0], [0.4, 0.4, 0.2]
+    r = rebalancear(quantidade, preco, alvo, caixa_liquido=50_000, lote=100, caixa_minimo=5_000, custo=0.001)
+    assert np.all(r.ordem % 100 == 0)
+    assert r.caixa_final >= 5_000 - 1e-6
+    # A sobra devolvida não deixa um lote inteiro sem uso abaixo do alvo
+    assert r.caixa_final - 5_000 < 100 * max(preco) * 1.001
+
+
+def test_ativo_sem_preco_nao_recebe_ordem():
+    r = rebalancear([100, 100], [np.nan, 10.0], [0.5, 0.5], caixa_liquido=10_000, lote=100)
+    assert r.ordem[0] == 0
+
+
+def test_lote_com_cenarios_igual_ao_laco():
+    rng = np.random.default_rng(0)
+    quantidade = rng.integers(0, 50, 8) * 100.0
+    precos = rng.uniform(5, 50, (20, 8))
+    alvos = rng.dirichlet(np.ones(8), 20) * 0.95
+    minimo = rng.uniform(0, 20_000, 20)
+    lote = rebalancear(quantidade, precos, alvos, 80_000, 100, minimo, custo=0.0005)
+    for k in range(20):
+        um = rebalancear(quantidade, precos[k], alvos[k], 80_000, 100, minimo[k], custo=0.0005)
+        np.testing.assert_array_equal(lote.ordem[k], um.ordem)
+        assert lote.caixa_final[k] == pytest.approx(um.caixa_final)
+
+
+def test_lote_padrao():
+    np.testing.assert_array_equal(lote_padrao(["PETR4", "petr4f ", None, "VALE3F"]), [100, 1, 100, 1])
@@ -0,0 +1,101 @@
+# streamlit_app/tests/test_quote_feed.py
+
+import pytest
+from sqlalchemy import text
+
+from quote_feed import FakeQuoteNotifier, QuoteFeed, QuotePoller
+from shared_cache import PortfolioSnapshot
+
+
+class WatcherFixo:
+    def fingerprints(self, engine, tabelas):
+        return {t: (1, 0, 0) for t in tabelas}
+
+
+class SnapshotEspiao:
+    """Guarda a versão do feed em cada aviso recebido."""
+
+    def __init__(self, feed=None):
+        self.feed = feed
+        self.avisos = []
+
+    def mark_quotes_changed(self):
+        self.avisos.append(self.feed.version)
+
+
+class FeedRoteiro(QuoteFeed):
+    """Feed falso: cada poll devolve (ou levanta) o próximo item do roteiro; para no fim."""
+
+    def __init__(self, snapshot, roteiro):
+        super().__init__(snapshot, intervalo=0)
+        self.roteiro = list(roteiro)
+
+    def poll(self):
+        item = self.roteiro.pop(0)
+        if not self.roteiro:
+            self.stop()
+        if isinstance(item, Exception):
+            raise item
+        return item
+
+
+def test_base_exige_poll():
+    with pytest.raises(TypeError):
+        QuoteFeed(SnapshotEspiao())
+
+
+def test_aviso_ao_snapshot_antes_da_nova_versao(caplog):
+    snapshot = SnapshotEspiao()
+    feed = FeedRoteiro(snapshot, [False, True, RuntimeError("conexão caiu"), False, True])
+    snapshot.feed = feed
+    feed._loop()
+    # O snapshot já está marcado quando a versão muda: o fragmento que vê a versão nova relê o banco
+    assert snapshot.avisos == [0, 1]
+    assert feed.version == 2 and feed.updated_at is not None
+    # Uma falha no poll não derruba a thread
+    assert "conexão caiu" in caplog.text
+
+
+def test_cotacoes_pendentes_chegam_ao_snapshot(engine_gravavel):
+    snapshot = PortfolioSnapshot(WatcherFixo(), min_interval=3600)
+    antes = snapshot.get(engine_gravavel)
+    ticker = antes.quotes["ticker"].iloc[0]
+    with engine_gravavel.begin() as conn:
+        conn.execute(text(
+            "UPDATE realtime_quotes SET last_price = 123.45, updated_at = '2099-01-01 00:00:00.000000' WHERE ticker = :t"
+        ), {"t": ticker})
+
+    # Dentro de min_interval e com o catálogo igual: nada muda sem o aviso
+    assert snapshot.get(engine_gravavel).versions == antes.versions
+    feed = QuotePoller(engine_gravavel, snapshot)
+    feed._publicar()
+    depois = snapshot.get(engine_gravavel)
+    assert depois.quotes.set_index("ticker").loc[ticker, "last_price"] == 123.45
+    assert len(depois.quotes) == len(antes.quotes)
+    assert depois.versions["realtime_quotes"] == antes.versions["realtime_quotes"] + 1
+    # O aviso é consumido: a leitura seguinte volta a respeitar min_interval
+    assert not snapshot._quotes_pendentes
+    assert snapshot.get(engine_gravavel).versions == depois.versions
+
+
+def test_poller_acusa_so_mudancas(engine_gravavel):
+    feed = QuotePoller(engine_gravavel, SnapshotEspiao())
+    # A primeira leitura só guarda a referência
+    assert feed.poll() is False
+    assert feed.poll() is False
+    with engine_gravavel.begin() as conn:
+        conn.execute(text("UPDATE realtime_quotes SET updated_at = '2099-01-01 00:00:00.000000' WHERE rowid = 1"))
+    assert feed.poll() is True
+    assert feed.poll() is False
+
+
+def test_feed_simulado_entrega_sem_reler_o_banco(engine_gravavel):
+    snapshot = PortfolioSnapshot(WatcherFixo(), min_interval=3600)
+    antes = snapshot.get(engine_gravavel)
+    feed = FakeQuoteNotifier(snapshot, fracao=1.0, seed=0)
+    assert feed.poll() is True
+    feed._publicar()
+    assert not snapshot._quotes_pendentes
+    depois = snapshot.get(engine_gravavel)
+    assert depois.versions["realtime_quotes"] == antes.versions["realtime_quotes"] + 1
+    assert not (depois.quotes["last_price"].to_numpy() == antes.quotes["last_price"].to_numpy()).all()
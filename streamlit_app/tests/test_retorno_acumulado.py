@@ -0,0 +1,39 @@
+# streamlit_app/tests/test_retorno_acumulado.py
+
+import numpy as np
+import pandas as pd
+
+from retorno_acumulado import lttb, reduzir
+
+
+def test_lttb_um_ponto_por_balde_com_as_pontas():
+    rng = np.random.default_rng(0)
+    y = np.cumsum(rng.normal(size=10_000))
+    indices = lttb(np.arange(len(y)), y, 500)
+    assert len(indices) == 500
+    assert indices[0] == 0 and indices[-1] == len(y) - 1
+    assert np.all(np.diff(indices) > 0)
+    # Cada ponto intermediário sai do seu balde
+    limites = np.linspace(1, len(y) - 1, 499).astype(np.int64)
+    assert np.all((indices[1:-1] >= limites[:-1]) & (indices[1:-1] < limites[1:]))
+
+
+def test_lttb_preserva_picos():
+    y = np.zeros(1_000)
+    y[[137, 612]] = [50.0, -80.0]
+    indices = lttb(np.arange(len(y)), y, 20)
+    assert {137, 612} <= set(indices.tolist())
+
+
+def test_lttb_serie_curta_ou_n_out_pequeno():
+    np.testing.assert_array_equal(lttb(np.arange(5), np.ones(5), 10), np.arange(5))
+    np.testing.assert_array_equal(lttb(np.arange(50), np.ones(50), 2), np.arange(50))
+
+
+def test_reduzir_datas():
+    datas = pd.bdate_range("2020-01-01", periods=3_000).to_numpy()
+    valores = np.sin(np.arange(3_000) / 50)
+    x, y = reduzir(datas, valores, 300)
+    assert len(x) == len(y) == 300
+    assert x[0] == datas[0] and x[-1] == datas[-1]
+    np.testing.assert_array_equal(y, valores[np.searchsorted(datas, x)])
@@ -0,0 +1,105 @@
+# streamlit_app/tests/test_risco.py
+
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy import text
+
+from risco import DIAS_ANO, RiscoStore, calcular_risco
+
+
+class WatcherContador:
+    """Fingerprint controlado pelo teste: (inserts, updates, deletes)."""
+
+    def __init__(self):
+        self.valor = (1, 0, 0)
+
+    def fingerprints(self, engine, tabelas):
+        return {t: self.valor for t in tabelas}
+
+
+class CDI:
+    """Taxa livre de risco que só existe depois de `disponivel = True`."""
+
+    def __init__(self):
+        self.disponivel = False
+
+    def __call__(self, datas):
+        return np.full(len(datas), 0.0004) if self.disponivel else None
+
+
+def _serie(n=400, seed=0):
+    rng = np.random.default_rng(seed)
+    datas = pd.bdate_range("2024-01-01", periods=n).to_numpy()
+    ibov = 100_000 * np.cumprod(1 + rng.normal(0, 0.01, n))
+    cota = np.cumprod(1 + 0.8 * (ibov / np.roll(ibov, 1) - 1) + rng.normal(0, 0.005, n))
+    cota[0] = 1.0
+    return datas, cota, ibov
+
+
+def test_calcular_risco_igual_ao_rolling_do_pandas():
+    datas, cota, ibov = _serie()
+    rf = np.full(len(cota), 0.0003)
+    historico, estado, _ = calcular_risco(datas, cota, ibov, rf, janelas=(21, 63))
+    risco = historico.risco(estado.max_drawdown)
+
+    r_c, r_i = pd.Series(cota).pct_change(), pd.Series(ibov).pct_change()
+    for j in (21, 63):
+        vol = r_c.rolling(j).std() * np.sqrt(DIAS_ANO)
+        beta = r_c.rolling(j).cov(r_i) / r_i.rolling(j).var()
+        correl = r_c.rolling(j).corr(r_i)
+        sharpe = (r_c - 0.0003).rolling(j).mean() / r_c.rolling(j).std() * np.sqrt(DIAS_ANO)
+        for nome, esperado in (("volatilidade", vol), ("beta", beta), ("correlacao", correl), ("sharpe", sharpe)):
+            np.testing.assert_allclose(risco.metrica(nome)[j].to_numpy(), esperado.to_numpy(), rtol=1e-6, equal_nan=True)
+    assert risco.max_drawdown == pytest.approx((cota / np.maximum.accumulate(cota) - 1).min())
+
+
+def test_estado_incremental_igual_ao_vetorizado():
+    datas, cota, ibov = _serie()
+    historico, _, _ = calcular_risco(datas, cota, ibov, janelas=(21, 63))
+    _, estado, _ = calcular_risco(datas[:300], cota[:300], ibov[:300], janelas=(21, 63))
+    for k in range(300, len(cota)):
+        _, valores = estado.atualizar(datas[k], cota[k], ibov[k])
+    np.testing.assert_allclose(valores, historico.risco(0.0).valores[-1], rtol=1e-9)
+
+
+def test_sharpe_pendente_ate_o_cdi_chegar(engine_gravavel, tmp_path):
+    cdi = CDI()
+    store = RiscoStore(WatcherContador(), taxa_livre=cdi, root=str(tmp_path))
+    risco = store.get(engine_gravavel)
+    assert risco.rf_pendente
+    assert risco.ultimos()["sharpe"].isna().all()
+    assert risco.ultimos()["volatilidade"].notna().any()
+
+    cdi.disponivel = True
+    risco = store.get(engine_gravavel)
+    assert not risco.rf_pendente
+    assert risco.ultimos()["sharpe"].notna().any()
+
+
+def test_fingerprint_persistido_evita_recalculo(engine_gravavel, tmp_path, monkeypatch):
+    watcher = WatcherContador()
+    antes = RiscoStore(watcher, root=str(tmp_path)).get(engine_gravavel)
+
+    # Processo novo, mesmo fingerprint: o estado do disco vale sem ir ao banco
+    import risco as modulo
+    monkeypatch.setattr(modulo, "read_sql", lambda *a, **k: pytest.fail("recalculou sem mudança"))
+    depois = RiscoStore(watcher, root=str(tmp_path)).get(engine_gravavel)
+    np.testing.assert_array_equal(depois.valores, antes.valores)
+
+
+def test_max_age_pega_update_em_linha_antiga(engine_gravavel, tmp_path):
+    store = RiscoStore(WatcherContador(), root=str(tmp_path), max_age=600)
+    antes = store.get(engine_gravavel)
+
+    # UPDATE no meio do histórico: nem o incremento (que relê só a última data)
+    # nem o fingerprint (catálogo atrasado) o veem
+    meio = pd.Timestamp(antes.datas[len(antes) // 2])
+    with engine_gravavel.begin() as conn:
+        alteradas = conn.execute(text("UPDATE portfolio_history SET cota = cota * 0.5 WHERE data = :d"),
+                                 {"d": meio.date().isoformat()}).rowcount
+    assert alteradas == 1
+    assert store.get(engine_gravavel).max_drawdown == antes.max_drawdown
+
+    store._calculado_em -= 601
+    assert store.get(engine_gravavel).max_drawdown < antes.max_drawdown
@@ -0,0 +1,65 @@
+# streamlit_app/tests/test_shared_cache.py
+
+from sqlalchemy import text
+
+from shared_cache import PortfolioSnapshot
+
+
+class WatcherFixo:
+    """Fingerprints que não mudam (catálogo atrasado em relação à gravação)."""
+
+    def fingerprints(self, engine, tabelas):
+        return {t: (1, 0, 0) for t in tabelas}
+
+
+def _tickers(snapshot, engine):
+    return set(snapshot.get(engine).config["ticker"])
+
+
+def test_invalidate_le_do_banco_mesmo_com_l2(engine_gravavel, l2_memoria):
+    snapshot = PortfolioSnapshot(WatcherFixo(), min_interval=0)
+    assert "NOVO3" not in _tickers(snapshot, engine_gravavel)
+
+    with engine_gravavel.begin() as conn:
+        conn.execute(text("INSERT INTO portfolio_config (id, ticker, quantidade, posicao_alvo) VALUES (999, 'NOVO3', 100, 0.01)"))
+    snapshot.invalidate("portfolio_config")
+    assert "NOVO3" in _tickers(snapshot, engine_gravavel)
+
+
+def test_max_age_le_do_banco_mesmo_com_l2(engine_gravavel, l2_memoria):
+    snapshot = PortfolioSnapshot(WatcherFixo(), min_interval=0, max_age=600)
+    _tickers(snapshot, engine_gravavel)
+    with engine_gravavel.begin() as conn:
+        conn.execute(text("UPDATE portfolio_metrics SET metric_value = 42 WHERE metric_key = 'cota_d1'"))
+    # Passaram-se `max_age` segundos desde a carga
+    snapshot._loaded_at = {tabela: instante - 601 for tabela, instante in snapshot._loaded_at.items()}
+    metricas = snapshot.get(engine_gravavel).metrics.set_index("metric_key")["metric_value"]
+    assert metricas["cota_d1"] == 42
+
+
+def test_primeira_carga_compartilhada_pelo_l2(engine_gravavel, l2_memoria):
+    PortfolioSnapshot(WatcherFixo()).get(engine_gravavel)
+    with engine_gravavel.begin() as conn:
+        conn.execute(text("DELETE FROM portfolio_config"))
+    # Outra instância, mesma versão das tabelas: vem do L2, sem ir ao banco
+    assert len(PortfolioSnapshot(WatcherFixo()).get(engine_gravavel).config) > 0
+
+
+class WatcherFalha:
+    """Fingerprints válidos na primeira consulta; depois o catálogo deixa de responder."""
+
+    def __init__(self):
+        self.chamadas = 0
+
+    def fingerprints(self, engine, tabelas):
+        self.chamadas += 1
+        return {t: (1, 0, 0) if self.chamadas == 1 else None for t in tabelas}
+
+
+def test_fingerprint_ausente_recarrega_as_cotacoes(engine_gravavel):
+    snapshot = PortfolioSnapshot(WatcherFalha(), min_interval=0)
+    antes = snapshot.get(engine_gravavel)
+    assert snapshot._quotes_watermark is not None
+    depois = snapshot.get(engine_gravavel)
+    assert depois.versions["realtime_quotes"] == antes.versions["realtime_quotes"] + 1
+    assert len(depois.quotes) == len(antes.quotes)
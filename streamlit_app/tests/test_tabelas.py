@@ -0,0 +1,27 @@
+# streamlit_app/tests/test_tabelas.py
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from paginas.tabelas import COR_NEGATIVO, COR_POSITIVO, MOEDA, Formato, cores_por_sinal
+
+
+@pytest.mark.parametrize("formato, printf, styler", [
+    (MOEDA, "R$ %,.2f", "R$ {:,.2f}"),
+    (Formato(4), "%,.4f", "{:,.4f}"),
+    (Formato(0), "%,.0f", "{:,.0f}"),
+    (Formato(1, percentual=True), "%,.1f%%", "{:,.1f}%"),
+])
+def test_column_config_tem_o_mesmo_formato_do_styler(formato, printf, styler):
+    config = formato.column_config("Valor")
+    assert config["type_config"]["format"] == printf
+    assert config["type_config"]["step"] == pytest.approx(10.0 ** -formato.casas)
+    assert formato.padrao_styler() == styler
+
+
+def test_cores_por_sinal():
+    df = pd.DataFrame({"a": [1.0, -2.0, np.nan], "b": ["x", "y", "z"]})
+    css = cores_por_sinal(df, ["a"])
+    assert css["a"].tolist() == [f"color: {COR_POSITIVO}", f"color: {COR_NEGATIVO}", ""]
+    assert css["b"].tolist() == ["", "", ""]